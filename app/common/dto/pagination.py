@@ -1,10 +1,18 @@
-from typing import Generic, TypeVar
+from typing import Generic, Optional, TypeVar
 
 from common.dto import BaseResult, CustomModel
+from pydantic import ConstrainedInt
 from pydantic.generics import GenericModel
 
 ResultType = TypeVar("ResultType", bound=BaseResult)
 
+MAX_PAGE_SIZE = 1000
+
+
+class PageSize(ConstrainedInt):
+    gt = 0
+    le = MAX_PAGE_SIZE
+
 
 class PaginationQuery(CustomModel):
     offset: int
@@ -20,3 +28,19 @@ class PaginationResult(GenericModel, CustomModel, Generic[ResultType]):
     items: list[ResultType]
     total_count: int
     page: PageInfo
+
+
+class CursorPaginationQuery(CustomModel):
+    limit: PageSize
+    cursor: Optional[str] = None  # Курсор следующей страницы из CursorPageInfo, None - первая страница
+
+
+class CursorPageInfo(CustomModel):
+    page_size: int
+    next_cursor: Optional[str] = None  # None - страница последняя
+
+
+class CursorPaginationResult(GenericModel, CustomModel, Generic[ResultType]):
+    items: list[ResultType]
+    page: CursorPageInfo
+    estimated_count: Optional[int] = None  # Оценка числа записей без COUNT(*), может отставать
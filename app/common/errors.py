@@ -59,6 +59,36 @@ class ExternalServiceBusinessError(BaseBusinessError):
     ...
 
 
+class CircuitBreakerOpenError(ExternalServiceBusinessError):
+    """
+    Запрос к внешнему сервису отклонен открытым circuit breaker'ом
+    """
+
+    def __init__(self, service: str):
+        super().__init__(
+            status="503",
+            detail=f"Circuit breaker is open for {service}",
+            error_type="",
+            data={"service": service},
+            raw_type=self.__class__.__name__,
+        )
+
+
+class KeyProviderUnavailableError(ExternalServiceBusinessError):
+    """
+    Ключи для проверки подписи токенов недоступны: JWKS еще ни разу не загружен
+    """
+
+    def __init__(self, source: str):
+        super().__init__(
+            status="503",
+            detail="Signing keys are unavailable",
+            error_type="",
+            data={"source": source},
+            raw_type=self.__class__.__name__,
+        )
+
+
 class BaseInternalBusinessError(BaseBusinessError):
     def __init__(
         self,
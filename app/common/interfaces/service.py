@@ -1,5 +1,5 @@
 import abc
-from typing import Generic, TypeVar
+from typing import Any, AsyncIterator, Generic, TypeVar
 
 from pydantic import BaseModel
 
@@ -25,3 +25,27 @@ class IHTTPService(Generic[ClientResponse], metaclass=abc.ABCMeta):
         :return: ClientResponse
         """
         ...
+
+    @abc.abstractmethod
+    def stream(self, *, method: str = "GET", url: str, headers: dict = None, **kwargs) -> AsyncIterator[bytes]:
+        """
+        Выполнить http запрос и читать тело ответа потоком, не загружая его в память целиком
+        :param method: http-метод (get, post, put, patch …)
+        :param url: ресурс к которму необходимо обратиться
+        :param headers: http-заголовки
+        :param kwargs:
+        :return: AsyncIterator[bytes]
+        """
+        ...
+
+    @abc.abstractmethod
+    def stream_records(self, *, method: str = "GET", url: str, headers: dict = None, **kwargs) -> AsyncIterator[Any]:
+        """
+        Выполнить http запрос и читать NDJSON ответ потоком по записям
+        :param method: http-метод (get, post, put, patch …)
+        :param url: ресурс к которму необходимо обратиться
+        :param headers: http-заголовки
+        :param kwargs:
+        :return: AsyncIterator[Any]
+        """
+        ...
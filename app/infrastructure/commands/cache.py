@@ -0,0 +1,26 @@
+from common.interfaces.command import ICommandHandler, TCommand, TResult
+from infrastructure.queries.cache import QueryCache, Tags
+
+
+class InvalidatingCommandHandler(ICommandHandler[TCommand, TResult]):
+    """
+    Обработчик команды, инвалидирующий после выполнения закэшированные результаты запросов с тегами
+    """
+
+    __slots__ = ("_handler", "_cache", "_tags")
+
+    def __init__(self, handler: ICommandHandler[TCommand, TResult], cache: QueryCache, *, tags: Tags):
+        """
+        :param handler: Обработчик
+        :param cache: Кэш результатов запросов
+        :param tags: Инвалидируемые теги, либо функция команды, возвращающая теги, например lambda c: [f"user:{c.user_id}"]
+        """
+        self._handler = handler
+        self._cache = cache
+        self._tags = tags
+
+    async def execute(self, command: TCommand) -> TResult:
+        result = await self._handler.execute(command)
+        # инвалидация только после успешного выполнения: при ошибке данные не изменились
+        await self._cache.invalidate(self._tags(command) if callable(self._tags) else self._tags)
+        return result
@@ -1,6 +1,6 @@
 import os
 import uuid
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 
 import hvac
 from infrastructure.log import LogFormat, LogLevel
@@ -101,6 +101,17 @@ class PostgresConfig(BaseProjectConfig):
     PASSWORD: str
     DB: str
     URI: Optional[_AsyncPostgresDsn] = None
+    POOL_SIZE: int = 5
+    POOL_MAX_OVERFLOW: int = 10  # Соединения сверх POOL_SIZE при пиковой нагрузке
+    POOL_TIMEOUT: float = 30.0  # Ожидание свободного соединения, секунды
+    POOL_RECYCLE: int = 30 * 60  # Время жизни соединения, секунды
+    POOL_PRE_PING: bool = False  # Лишний запрос на каждое получение соединения, с POOL_RECYCLE обычно не нужен
+    STATEMENT_CACHE_SIZE: int = 100  # Кэш подготовленных выражений asyncpg, 0 для pgbouncer в режиме transaction
+    PREPARED_STATEMENT_CACHE_SIZE: int = 100  # Кэш подготовленных выражений SQLAlchemy
+    COMMAND_TIMEOUT: Optional[float] = None  # Таймаут запроса, секунды
+    REPLICA_URIS: list[_AsyncPostgresDsn] = []  # Реплики для чтения, JSON список URI
+    REPLICA_BALANCING: Literal["round_robin", "least_connections"] = "round_robin"
+    REPLICA_EJECTION_TIME: float = 30.0  # Исключение реплики после ошибки подключения, секунды
 
     @validator("URI", pre=True, allow_reuse=True)
     def assemble_async_db_connection(cls, v: Optional[str], values: dict[str, Any]) -> Any:
@@ -128,6 +139,14 @@ class CORSConfig(BaseProjectConfig):
         env_prefix = "CORS_"
 
 
+class APICacheConfig(BaseProjectConfig):
+    ENABLED: bool = False  # Кэширование ответов endpoint'ов, отмеченных api_cache
+    MAXSIZE: int = 1024  # Количество ответов в памяти процесса
+
+    class Config(BaseProjectConfig.Config):
+        env_prefix = "API_CACHE_"
+
+
 class TracingConfig(BaseProjectConfig):
     JAEGER_HOST: Optional[str] = None
     JAEGER_PORT: Optional[int] = None
@@ -182,6 +201,10 @@ class KafkaConfig(BaseProjectConfig):
 class HealthCheckConfig(BaseProjectConfig):
     PERCENTAGE_MINIMUM_FOR_WORKING_CAPACITY: float = 80.0
     PERCENTAGE_MAXIMUM_FOR_WORKING_CAPACITY: float = 100.0
+    COMMAND_TIMEOUT: float = 3.0  # Таймаут одной проверки, секунды
+    TOTAL_TIMEOUT: float = 5.0  # Общий дедлайн всех проверок, секунды
+    PROBE_INTERVAL: float = 10.0  # Интервал фонового запуска проверок, секунды
+    SNAPSHOT_MAX_AGE: float = 30.0  # Возраст снимка, после которого статус Unhealthy, секунды
 
     class Config(BaseProjectConfig.Config):
         env_prefix = "HEALTHCHECK_"
@@ -191,7 +214,30 @@ class HTTPServiceConfig(BaseProjectConfig):
     REQUESTS_TIMEOUT: int = 5 * 60  # 5 минут
     ATTEMPTS: int = 5
     BACKOFF_FACTOR: float = 0.1
+    # Эти же статусы поднимаются как ошибки сервиса. Для ретраев по лимитам добавьте 429 и 503
     STATUSES_FOR_RETRY: list[int] = [401, 408]
+    BACKOFF_STRATEGY: Literal["expo", "adaptive"] = "expo"  # adaptive учитывает Retry-After и X-RateLimit-*
+    RETRY_AFTER_MAX_WAIT: float = 60.0  # Максимальное ожидание, запрошенное сервером, секунды
+    RETRY_SPAN_EVENTS: bool = True  # Писать ретраи событиями в span запроса
+    RETRY_BUDGET_RATIO: float = 0.2  # Не больше 1 ретрая на 5 успешных запросов к хосту
+    RETRY_BUDGET_MAX_TOKENS: float = 10.0
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_MINIMUM_CALLS: int = 20
+    CIRCUIT_BREAKER_WINDOW: float = 60.0  # Окно подсчета ошибок, секунды
+    CIRCUIT_BREAKER_OPEN_TIMEOUT: float = 30.0  # Время в открытом состоянии, секунды
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 3
+    HEDGE_ENABLED: bool = False  # Хеджирование по умолчанию, запрос может переопределить через hedge=
+    HEDGE_DELAY: float = 0.05  # Задержка перед повторным запросом, пока не набрана статистика, секунды
+    HEDGE_QUANTILE: float = 0.95  # Квантиль наблюдаемой латентности, используемый как задержка
+    HEDGE_BUDGET_RATIO: float = 0.1  # Не больше 1 хеджа на 10 запросов к хосту
+    HEDGE_BUDGET_MAX_TOKENS: float = 10.0
+    POOL_MAX_CONNECTIONS: int = 100
+    POOL_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    POOL_KEEPALIVE_EXPIRY: float = 5.0  # Время жизни простаивающего соединения, секунды
+    HTTP2: bool = False  # Требует пакет h2 (httpx[http2])
+    RESPONSE_CACHE_BACKEND: Literal["memory", "redis"] = "memory"
+    RESPONSE_CACHE_MAXSIZE: int = 1024  # Количество ответов в памяти процесса
+    RESPONSE_CACHE_REVALIDATION_TTL: float = 60 * 60  # Хранение ответов с ETag/Last-Modified, секунды
 
     class Config(BaseProjectConfig.Config):
         env_prefix = "HTTP_SERVICE_"
@@ -203,6 +249,18 @@ class KeycloakConfig(BaseProjectConfig):
     CLIENT_ID: str
     CLIENT_SECRET: str
     ALGORITHMS: list[str] = ["RS256"]
+    PUBLIC_KEY: Optional[str] = None  # Если задан, JWKS не используется
+    JWKS_URL: Optional[AnyHttpUrl] = None
+    JWKS_REFRESH_INTERVAL: int = 10 * 60  # 10 минут
+    JWKS_MIN_REFRESH_INTERVAL: int = 30  # Не чаще раза в 30 секунд при неизвестном kid
+    TOKEN_CACHE_SIZE: int = 1024  # 0 - кэш проверенных токенов отключен
+    TOKEN_CACHE_TTL: int = 5 * 60  # 5 минут, но не дольше exp токена
+
+    @validator("JWKS_URL", pre=True, always=True, allow_reuse=True)
+    def assemble_jwks_url(cls, v: Optional[str], values: dict[str, Any]) -> Any:
+        if isinstance(v, str):
+            return v
+        return f"{str(values.get('URL')).rstrip('/')}/realms/{values.get('REALM_NAME')}/protocol/openid-connect/certs"
 
     class Config(BaseProjectConfig.Config):
         env_prefix = "KEYCLOAK_"
@@ -218,6 +276,16 @@ class RedisConfig(BaseProjectConfig):
         env_prefix = "REDIS_"
 
 
+class QueryCacheConfig(BaseProjectConfig):
+    BACKEND: Literal["memory", "redis"] = "memory"  # redis - общий кэш и инвалидация для всех экземпляров
+    MAXSIZE: int = 1024  # Количество результатов в памяти процесса
+    TAG_VERSION_TTL: float = 1.0  # Кэширование версий тегов из Redis, задержка чужой инвалидации, секунды
+    EARLY_REFRESH_BETA: float = 1.0  # Агрессивность раннего обновления, 0 - отключено
+
+    class Config(BaseProjectConfig.Config):
+        env_prefix = "QUERY_CACHE_"
+
+
 class Config(BaseProjectConfig):
     PROJECT_NAME: str
     ENVIRONMENT: str = "dev"
@@ -225,6 +293,7 @@ class Config(BaseProjectConfig):
 
     LOG: LogConfig = LogConfig()
     CORS_CONFIG: CORSConfig = CORSConfig()
+    API_CACHE_CONFIG: APICacheConfig = APICacheConfig()
     TRACING_CONFIG: TracingConfig = TracingConfig()
     HEALTHCHECK_CONFIG: HealthCheckConfig = HealthCheckConfig()
     KEYCLOAK_CONFIG: KeycloakConfig = KeycloakConfig()
@@ -235,6 +304,7 @@ class Config(BaseProjectConfig):
 
     POSTGRES_CONFIG: PostgresConfig = PostgresConfig()
     REDIS_CONFIG: RedisConfig = RedisConfig()
+    QUERY_CACHE_CONFIG: QueryCacheConfig = QueryCacheConfig()
 
 
 config: Config = Config()
@@ -1,6 +1,84 @@
+from typing import Any, Iterable, Optional, Sequence
+
+from common.dto.pagination import CursorPaginationQuery
+from infrastructure.db.bulk import bulk_insert, bulk_upsert, copy_records
+from infrastructure.db.pagination import KeysetPage, SortKey, cached_count, estimated_count, paginate_keyset
+from sqlalchemy import Table
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
 
 
 class BaseRepository:
     def __init__(self, session: AsyncSession) -> None:
         self.session = session
+
+    async def paginate(
+        self, statement: Select, sort_key: Sequence[SortKey], query: CursorPaginationQuery
+    ) -> KeysetPage:
+        """
+        Курсорная пагинация: страница выбирается условием по ключу сортировки вместо OFFSET,
+        поэтому время запроса не зависит от номера страницы
+
+        :param statement: Запрос
+        :param sort_key: Уникальный ключ сортировки, покрытый индексом
+        :param query: Размер страницы и курсор
+        :return: KeysetPage
+        """
+        return await paginate_keyset(self.session, statement, sort_key, query.limit, query.cursor)
+
+    async def estimated_count(self, table: Table | str) -> Optional[int]:
+        """
+        Оценка числа строк таблицы без COUNT(*), см. infrastructure.db.pagination.estimated_count
+        """
+        return await estimated_count(self.session, table)
+
+    async def cached_count(self, statement: Select, ttl: float = 60) -> int:
+        """
+        Точное число строк запроса, кэшируемое на ttl секунд
+        """
+        return await cached_count(self.session, statement, ttl)
+
+    async def bulk_insert(
+        self,
+        model: Any,
+        rows: Iterable[dict[str, Any]],
+        *,
+        chunk_size: Optional[int] = 1000,
+        returning: Sequence[ColumnElement] = (),
+        ignore_conflicts: bool = False,
+    ) -> list[Any]:
+        """
+        Многострочная вставка вместо добавления объектов ORM по одному, см. infrastructure.db.bulk.bulk_insert
+        """
+        return await bulk_insert(
+            self.session, model, rows, chunk_size=chunk_size, returning=returning, ignore_conflicts=ignore_conflicts
+        )
+
+    async def bulk_upsert(
+        self,
+        model: Any,
+        rows: Iterable[dict[str, Any]],
+        *,
+        index_elements: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        chunk_size: Optional[int] = 1000,
+        returning: Sequence[ColumnElement] = (),
+    ) -> list[Any]:
+        """
+        Многострочный INSERT ... ON CONFLICT DO UPDATE, см. infrastructure.db.bulk.bulk_upsert
+        """
+        return await bulk_upsert(
+            self.session,
+            model,
+            rows,
+            index_elements=index_elements,
+            update_columns=update_columns,
+            chunk_size=chunk_size,
+            returning=returning,
+        )
+
+    async def copy_records(self, model: Any, records: Iterable[Sequence[Any]], *, columns: Sequence[str]) -> int:
+        """
+        Загрузка больших объемов через COPY, см. infrastructure.db.bulk.copy_records
+        """
+        return await copy_records(self.session, model, records, columns=columns)
@@ -0,0 +1,136 @@
+import itertools
+from typing import Any, Iterable, Iterator, Optional, Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement
+
+# Ограничение протокола Postgres на число параметров одного запроса
+MAX_BIND_PARAMS = 32767
+
+
+def _table(model: Any) -> Table:
+    return getattr(model, "__table__", model)
+
+
+def _chunks(rows: Iterable[dict[str, Any]], chunk_size: Optional[int]) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(rows)
+    first = next(iterator, None)
+    if first is None:
+        return
+    # число параметров запроса = строки * колонки
+    size = max(1, MAX_BIND_PARAMS // max(1, len(first)))
+    size = min(size, chunk_size) if chunk_size else size
+    yield [first, *itertools.islice(iterator, size - 1)]
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+async def bulk_insert(
+    session: AsyncSession,
+    model: Any,
+    rows: Iterable[dict[str, Any]],
+    *,
+    chunk_size: Optional[int] = 1000,
+    returning: Sequence[ColumnElement] = (),
+    ignore_conflicts: bool = False,
+) -> list[Any]:
+    """
+    Вставка строк многострочными INSERT ... VALUES по chunk_size строк
+
+    :param session: Сессия
+    :param model: ORM модель или таблица
+    :param rows: Строки, словари с одинаковым набором колонок
+    :param chunk_size: Строк в одном запросе. Не больше, чем позволяет лимит параметров Postgres
+    :param returning: Колонки вставленных строк, например первичный ключ
+    :param ignore_conflicts: Пропускать строки, нарушающие уникальность (ON CONFLICT DO NOTHING)
+    :return: Значения returning по вставленным строкам
+    """
+    table = _table(model)
+    inserted = []
+    for chunk in _chunks(rows, chunk_size):
+        statement = insert(table).values(chunk)
+        if ignore_conflicts:
+            statement = statement.on_conflict_do_nothing()
+        if returning:
+            statement = statement.returning(*returning)
+        result = await session.execute(statement)
+        if returning:
+            inserted.extend(result.all())
+    return inserted
+
+
+async def bulk_upsert(
+    session: AsyncSession,
+    model: Any,
+    rows: Iterable[dict[str, Any]],
+    *,
+    index_elements: Sequence[str],
+    update_columns: Optional[Sequence[str]] = None,
+    chunk_size: Optional[int] = 1000,
+    returning: Sequence[ColumnElement] = (),
+) -> list[Any]:
+    """
+    Вставка или обновление строк: INSERT ... ON CONFLICT (index_elements) DO UPDATE по chunk_size строк
+
+    :param session: Сессия
+    :param model: ORM модель или таблица
+    :param rows: Строки, словари с одинаковым набором колонок
+    :param index_elements: Колонки уникального индекса, по которому определяется конфликт
+    :param update_columns: Обновляемые колонки, по умолчанию все колонки строки кроме index_elements
+    :param chunk_size: Строк в одном запросе
+    :param returning: Колонки вставленных и обновленных строк
+    :return: Значения returning
+    """
+    table = _table(model)
+    upserted = []
+    for chunk in _chunks(rows, chunk_size):
+        # Postgres не обновляет одну строку дважды в одном запросе, из повторов ключа остается последний
+        chunk = list({tuple(row[name] for name in index_elements): row for row in chunk}.values())
+        statement = insert(table).values(chunk)
+        columns = update_columns if update_columns is not None else [c for c in chunk[0] if c not in index_elements]
+        if columns:
+            statement = statement.on_conflict_do_update(
+                index_elements=index_elements, set_={name: statement.excluded[name] for name in columns}
+            )
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=index_elements)
+        if returning:
+            statement = statement.returning(*returning)
+        result = await session.execute(statement)
+        if returning:
+            upserted.extend(result.all())
+    return upserted
+
+
+async def copy_records(
+    session: AsyncSession,
+    model: Any,
+    records: Iterable[Sequence[Any]],
+    *,
+    columns: Sequence[str],
+) -> int:
+    """
+    Загрузка строк через COPY (asyncpg copy_records_to_table) в транзакции сессии.
+    Самый быстрый путь для больших объемов, но без ON CONFLICT и RETURNING
+
+    :param session: Сессия
+    :param model: ORM модель или таблица
+    :param records: Строки, кортежи значений в порядке columns
+    :param columns: Колонки
+    :return: Число загруженных строк
+    """
+    table = _table(model)
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    # адаптер asyncpg открывает транзакцию лениво, на первом запросе. Если COPY первая операция в сессии,
+    # без явного начала транзакции строки запишутся в autocommit и не откатятся вместе с сессией
+    adapted_connection = raw_connection.dbapi_connection
+    if not adapted_connection._started:
+        await adapted_connection._start_transaction()
+    status = await raw_connection.driver_connection.copy_records_to_table(
+        table.name, records=records, columns=list(columns), schema_name=table.schema
+    )
+    # статус команды: "COPY <число строк>"
+    return int(status.split()[-1])
@@ -0,0 +1,83 @@
+from time import perf_counter
+from typing import Any, Callable, Iterable
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+meter = metrics.get_meter(__name__)
+
+checkout_wait_time = meter.create_histogram(
+    "db.client.connections.wait_time",
+    unit="s",
+    description="Time it took to obtain a connection from the pool, including opening a new one",
+)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, замеряющий время получения соединения и отдающий свою емкость для метрик
+    """
+
+    def __init__(self, creator: Callable[..., Any], pool_size: int = 5, max_overflow: int = 10, **kw: Any) -> None:
+        super().__init__(creator, pool_size=pool_size, max_overflow=max_overflow, **kw)
+        # max_overflow=-1 - без ограничения, тогда емкостью считается размер пула
+        self.max_connections = pool_size + max(0, max_overflow)
+
+    @property
+    def connections_in_use(self) -> int:
+        return int(self.checkedout())
+
+    def _do_get(self) -> Any:
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            checkout_wait_time.record(perf_counter() - started, {"pool.name": self.logging_name or "primary"})
+
+
+# Движки, по пулам которых экспортируется заполненность: основной и реплики.
+# Хранится движок, а не пул: dispose заменяет пул движка новым
+_engines: dict[str, AsyncEngine] = {}
+
+
+def observe_pool(engine: AsyncEngine, name: str) -> None:
+    """
+    Экспорт заполненности пула соединений в OpenTelemetry.
+    Число занятых и свободных соединений (db.client.connections.usage) экспортирует SQLAlchemyInstrumentor
+
+    :param engine: Движок с QueuePool
+    :param name: Имя пула в метриках
+    """
+    _engines[name] = engine
+
+
+def _pools() -> list[tuple[str, InstrumentedAsyncQueuePool]]:
+    pools = [(name, engine.sync_engine.pool) for name, engine in list(_engines.items())]
+    return [(name, pool) for name, pool in pools if isinstance(pool, InstrumentedAsyncQueuePool)]
+
+
+def _observe_max(_: CallbackOptions) -> Iterable[Observation]:
+    return [Observation(pool.max_connections, {"pool.name": name}) for name, pool in _pools()]
+
+
+def _observe_saturation(_: CallbackOptions) -> Iterable[Observation]:
+    return [
+        Observation(
+            pool.connections_in_use / pool.max_connections if pool.max_connections else 0.0, {"pool.name": name}
+        )
+        for name, pool in _pools()
+    ]
+
+
+meter.create_observable_gauge(
+    "db.client.connections.max",
+    callbacks=[_observe_max],
+    description="The maximum number of open connections, including overflow",
+)
+meter.create_observable_gauge(
+    "db.client.connections.saturation",
+    callbacks=[_observe_saturation],
+    description="Share of the maximum number of connections in use",
+)
@@ -0,0 +1,198 @@
+import base64
+import binascii
+from datetime import date, datetime, time
+from typing import Any, Generic, Optional, Sequence, TypeVar
+
+import orjson
+from common.errors import ValidationBusinessError
+from sqlalchemy import Table, and_, func, literal, or_, select, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import ColumnElement, Select
+from utils.cache import TTLCache
+
+T = TypeVar("T")
+
+# Точные COUNT(*) по запросам на время ttl
+_counts: TTLCache[str, int] = TTLCache(maxsize=1024)
+
+
+class SortKey:
+    """
+    Колонка ключа сортировки курсорной пагинации.
+
+    Колонки ключа должны быть NOT NULL, а весь ключ уникальным, например (created_at, id),
+    и покрываться индексом в том же порядке
+    """
+
+    __slots__ = ("column", "descending")
+
+    def __init__(self, column: ColumnElement, descending: bool = False):
+        """
+        :param column: Колонка
+        :param descending: Сортировка по убыванию
+        """
+        self.column = column
+        self.descending = descending
+
+    def order_by(self) -> ColumnElement:
+        return self.column.desc() if self.descending else self.column.asc()
+
+
+class KeysetPage(Generic[T]):
+    """
+    Страница курсорной пагинации
+    """
+
+    __slots__ = ("items", "next_cursor")
+
+    def __init__(self, items: list[T], next_cursor: Optional[str]):
+        """
+        :param items: Записи страницы
+        :param next_cursor: Курсор следующей страницы, None - страница последняя
+        """
+        self.items = items
+        self.next_cursor = next_cursor
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Курсор из значений ключа сортировки последней записи страницы
+
+    :param values: Значения ключа сортировки
+    :return: Непрозрачная для клиента строка
+    """
+    return base64.urlsafe_b64encode(orjson.dumps(list(values), default=str)).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort_key: Sequence[SortKey]) -> list[Any]:
+    """
+    Значения ключа сортировки из курсора с приведением к типам колонок
+
+    :param cursor: Курсор
+    :param sort_key: Ключ сортировки
+    :raises ValidationBusinessError: Курсор поврежден или выдан для другого ключа сортировки
+    :return: Значения ключа сортировки
+    """
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(sort_key):
+            raise ValueError("Cursor does not match the sort key")
+        return [_coerce(key.column, value) for key, value in zip(sort_key, values)]
+    except (ValueError, TypeError, ArithmeticError, binascii.Error) as e:
+        raise ValidationBusinessError(
+            status="400", detail="Invalid pagination cursor", data={"cursor": cursor, "reason": str(e)}
+        ) from e
+
+
+def _coerce(column: ColumnElement, value: Any) -> Any:
+    # asyncpg не приводит строки к типу колонки, поэтому datetime, UUID и Decimal восстанавливаются из JSON
+    if value is None:
+        return None
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    if isinstance(value, python_type):
+        return value
+    if python_type in (datetime, date, time):
+        return python_type.fromisoformat(value)
+    return python_type(value)
+
+
+def seek_predicate(sort_key: Sequence[SortKey], values: Sequence[Any]) -> ColumnElement:
+    """
+    Условие "после записи с ключом values" в порядке sort_key.
+
+    При одинаковом направлении всех колонок используется сравнение кортежей (a, b) > (x, y),
+    которое Postgres выполняет одним проходом по составному индексу
+
+    :param sort_key: Ключ сортировки
+    :param values: Значения ключа сортировки последней записи предыдущей страницы
+    :return: Условие для where
+    """
+    bound = [literal(value, key.column.type) for key, value in zip(sort_key, values)]
+    if len({key.descending for key in sort_key}) == 1:
+        if len(sort_key) == 1:
+            left, right = sort_key[0].column, bound[0]
+        else:
+            left, right = tuple_(*(key.column for key in sort_key)), tuple_(*bound)
+        return left < right if sort_key[0].descending else left > right
+
+    clauses = []
+    for index, key in enumerate(sort_key):
+        equal = [previous.column == value for previous, value in zip(sort_key[:index], bound)]
+        clauses.append(and_(*equal, key.column < bound[index] if key.descending else key.column > bound[index]))
+    return or_(*clauses)
+
+
+async def paginate_keyset(
+    session: AsyncSession,
+    statement: Select,
+    sort_key: Sequence[SortKey],
+    limit: int,
+    cursor: Optional[str] = None,
+) -> KeysetPage:
+    """
+    Страница запроса после курсора. Сортировка запроса заменяется сортировкой по ключу
+
+    :param session: Сессия
+    :param statement: Запрос
+    :param sort_key: Ключ сортировки
+    :param limit: Размер страницы
+    :param cursor: Курсор предыдущей страницы, None - первая страница
+    :raises ValidationBusinessError: Размер страницы не положительный или курсор поврежден
+    :return: Записи страницы: объекты, если выбрана одна сущность или колонка, иначе кортежи
+    """
+    if limit <= 0:
+        raise ValidationBusinessError(status="400", detail="Invalid page size", data={"limit": limit})
+    width = len(statement.column_descriptions)
+    if cursor is not None:
+        statement = statement.where(seek_predicate(sort_key, decode_cursor(cursor, sort_key)))
+    statement = (
+        statement.add_columns(*(key.column.label(f"_cursor_{index}") for index, key in enumerate(sort_key)))
+        .order_by(None)
+        .order_by(*(key.order_by() for key in sort_key))
+        .limit(limit + 1)
+    )
+
+    rows = (await session.execute(statement)).all()
+    has_next = len(rows) > limit
+    rows = rows[:limit]
+    items = [row[0] if width == 1 else tuple(row[:width]) for row in rows]
+    return KeysetPage(items, encode_cursor(rows[-1][width:]) if has_next else None)
+
+
+async def estimated_count(session: AsyncSession, table: Table | str) -> Optional[int]:
+    """
+    Оценка числа строк таблицы из статистики планировщика (pg_class.reltuples), без COUNT(*).
+    Обновляется autovacuum/ANALYZE и не учитывает фильтры запроса
+
+    :param session: Сессия
+    :param table: Таблица или ее имя со схемой
+    :return: Оценка, либо None, если таблица не найдена или еще не анализировалась
+    """
+    name = table if isinstance(table, str) else table.fullname
+    result = await session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:name)"), {"name": name}
+    )
+    count = result.scalar()
+    return count if count is not None and count >= 0 else None
+
+
+async def cached_count(session: AsyncSession, statement: Select, ttl: float = 60) -> int:
+    """
+    Точное число строк запроса, сохраняемое в памяти процесса на ttl
+
+    :param session: Сессия
+    :param statement: Запрос
+    :param ttl: Время хранения, секунды
+    :return: Число строк
+    """
+    count_statement = select(func.count()).select_from(statement.order_by(None).limit(None).offset(None).subquery())
+    compiled = count_statement.compile()
+    key = f"{compiled}:{sorted(compiled.params.items())!r}"
+    count = _counts.get(key)
+    if count is None:
+        count = (await session.execute(count_statement)).scalar_one()
+        _counts.set(key, count, expires_at=_counts.clock() + ttl)
+    return count
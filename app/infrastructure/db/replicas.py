@@ -0,0 +1,197 @@
+import itertools
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import monotonic
+from typing import Any, AsyncGenerator, Callable, Iterator, Literal, Optional
+
+import structlog
+from infrastructure.db.metrics import observe_pool
+from infrastructure.db.session import create_db_engine
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine, ExceptionContext
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session, SessionTransaction, sessionmaker
+
+logger = structlog.get_logger(__name__)
+
+BalancingStrategy = Literal["round_robin", "least_connections"]
+
+# До какого момента (по часам ReplicaRouter, monotonic) чтение в текущем контексте идет с primary
+_primary_reads_until: ContextVar[float] = ContextVar("primary_reads_until", default=0.0)
+
+
+@contextmanager
+def read_your_writes() -> Iterator[None]:
+    """
+    Чтение с primary внутри блока, когда запросу нужны только что записанные данные
+    """
+    token = _primary_reads_until.set(math.inf)
+    try:
+        yield
+    finally:
+        _primary_reads_until.reset(token)
+
+
+def stick_to_primary(seconds: float, clock: Callable[[], float] = monotonic) -> None:
+    """
+    Чтение с primary в текущем контексте (обычно запросе) в течение seconds после записи,
+    пока реплики не догонят primary
+
+    :param seconds: Ожидаемая задержка репликации, секунды
+    :param clock: Источник монотонного времени, тот же, что у ReplicaRouter
+    """
+    _primary_reads_until.set(max(_primary_reads_until.get(), clock() + seconds))
+
+
+class ReplicaRouter:
+    """
+    Выбор движка для чтения: реплика по round-robin или по наименьшему числу занятых соединений.
+
+    Реплика, на которой не удалось подключиться или соединение оборвалось, исключается на ejection_time.
+    Без реплик, либо когда все исключены, чтение идет с primary
+    """
+
+    __slots__ = ("_primary", "_replicas", "_strategy", "_ejection_time", "_clock", "_ejected_until", "_counter")
+
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: list[AsyncEngine],
+        *,
+        strategy: BalancingStrategy = "round_robin",
+        ejection_time: float = 30.0,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """
+        :param primary: Основной движок
+        :param replicas: Движки реплик
+        :param strategy: Балансировка между репликами
+        :param ejection_time: Время исключения неисправной реплики, секунды
+        :param clock: Источник монотонного времени
+        """
+        self._primary = primary
+        self._replicas = replicas
+        self._strategy = strategy
+        self._ejection_time = ejection_time
+        self._clock = clock
+        self._ejected_until: dict[AsyncEngine, float] = {}
+        self._counter = itertools.count()
+        for replica in replicas:
+            event.listen(replica.sync_engine, "handle_error", self._on_error(replica))
+
+    @property
+    def primary(self) -> AsyncEngine:
+        return self._primary
+
+    def healthy(self) -> list[AsyncEngine]:
+        now = self._clock()
+        return [replica for replica in self._replicas if self._ejected_until.get(replica, 0.0) <= now]
+
+    def choose(self) -> AsyncEngine:
+        """
+        :return: Движок для следующей транзакции чтения
+        """
+        if not self._replicas or _primary_reads_until.get() > self._clock():
+            return self._primary
+
+        healthy = self.healthy()
+        if not healthy:
+            return self._primary
+        if self._strategy == "least_connections":
+            return min(healthy, key=lambda replica: replica.sync_engine.pool.checkedout())
+        return healthy[next(self._counter) % len(healthy)]
+
+    def eject(self, replica: AsyncEngine) -> None:
+        self._ejected_until[replica] = self._clock() + self._ejection_time
+        logger.warning(
+            "Database replica ejected",
+            replica=replica.url.render_as_string(hide_password=True),
+            seconds=self._ejection_time,
+        )
+
+    def on_connect_error(self, engine: Engine) -> None:
+        for replica in self._replicas:
+            if replica.sync_engine is engine:
+                self.eject(replica)
+
+    def _on_error(self, replica: AsyncEngine) -> Callable[[ExceptionContext], None]:
+        def handle_error(context: ExceptionContext) -> None:
+            # без соединения - ошибка подключения
+            if context.is_disconnect or context.connection is None:
+                self.eject(replica)
+
+        return handle_error
+
+
+class ReadSession(Session):
+    """
+    Сессия чтения: каждая транзакция выполняется на движке, выбранном ReplicaRouter.
+    Транзакции только для чтения (BEGIN READ ONLY), в том числе на primary, поэтому запись отклоняет база
+    """
+
+    def __init__(self, *args: Any, router: ReplicaRouter, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._router = router
+        self._read_bind: Optional[Engine] = None
+        self._read_only_begun = False
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Engine:
+        if self._read_bind is None:
+            self._read_bind = self._router.choose().sync_engine
+        return self._read_bind
+
+    def _connection_for_bind(self, engine: Engine, execution_options: Any = None, **kwargs: Any) -> Any:
+        if not self._read_only_begun:
+            # режим задается до начала транзакции, для уже открытого соединения параметры не передаются
+            execution_options = {"postgresql_readonly": True, **(execution_options or {})}
+        try:
+            return super()._connection_for_bind(engine, execution_options, **kwargs)
+        except OSError:
+            # asyncpg не оборачивает ошибку подключения в DBAPIError, поэтому handle_error ее не видит
+            self._router.on_connect_error(engine)
+            self._read_bind = None
+            raise
+
+
+@event.listens_for(ReadSession, "after_begin")
+def _mark_read_only_begun(session: ReadSession, transaction: SessionTransaction, connection: Connection) -> None:
+    session._read_only_begun = True
+
+
+@event.listens_for(ReadSession, "after_transaction_end")
+def _forget_read_bind(session: ReadSession, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session._read_bind = None
+        session._read_only_begun = False
+
+
+async def init_db_replicas(uris: list[str], options: dict[str, Any]) -> AsyncGenerator[list[AsyncEngine], None]:
+    """
+    Движки реплик на время жизни приложения
+
+    :param uris: URI реплик
+    :param options: Параметры пула, см. create_db_engine
+    """
+    replicas = []
+    for index, uri in enumerate(uris):
+        name = f"replica-{index}"
+        replica = create_db_engine(uri, **{**options, "name": name})
+        observe_pool(replica, name=name)
+        replicas.append(replica)
+    try:
+        yield replicas
+    finally:
+        for replica in replicas:
+            await replica.dispose()
+
+
+def create_read_session_factory(router: ReplicaRouter) -> sessionmaker:
+    return sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        class_=AsyncSession,
+        sync_session_class=ReadSession,
+        router=router,
+    )
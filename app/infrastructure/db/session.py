@@ -1,21 +1,90 @@
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Optional
 
 import structlog
-from infrastructure.config import config
+from infrastructure.db.metrics import InstrumentedAsyncQueuePool, observe_pool
 from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
-from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.ext import asyncio as sqlalchemy_asyncio
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 
 logger = structlog.get_logger(__name__)
 
-_async_engine: AsyncEngine = create_async_engine(config.POSTGRES_CONFIG.URI, echo=config.DEBUG, pool_pre_ping=True)
-SQLAlchemyInstrumentor().instrument(engine=_async_engine.sync_engine)
 
-_async_session = sessionmaker(
-    autocommit=False, autoflush=True, bind=_async_engine, expire_on_commit=False, class_=AsyncSession
-)
+def create_db_engine(
+    uri: str,
+    *,
+    name: str = "primary",
+    echo: bool = False,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = -1,
+    pool_pre_ping: bool = False,
+    statement_cache_size: int = 100,
+    prepared_statement_cache_size: int = 100,
+    command_timeout: Optional[float] = None,
+) -> AsyncEngine:
+    """
+    Создание движка с пулом соединений
 
+    :param uri: URI базы данных
+    :param name: Имя пула в логах и метриках
+    :param echo: Логировать запросы
+    :param pool_size: Количество постоянных соединений пула
+    :param max_overflow: Количество соединений сверх pool_size при пиковой нагрузке
+    :param pool_timeout: Ожидание свободного соединения, секунды
+    :param pool_recycle: Время жизни соединения, секунды. -1 - без ограничения
+    :param pool_pre_ping: Проверять соединение запросом при каждом получении из пула
+    :param statement_cache_size: Размер кэша подготовленных выражений asyncpg. 0 - для pgbouncer в режиме transaction
+    :param prepared_statement_cache_size: Размер кэша подготовленных выражений SQLAlchemy на соединение
+    :param command_timeout: Таймаут запроса asyncpg, секунды
+    :return: AsyncEngine
+    """
+    connect_args: dict[str, Any] = {
+        "statement_cache_size": statement_cache_size,
+        "prepared_statement_cache_size": prepared_statement_cache_size,
+    }
+    if command_timeout is not None:
+        connect_args["command_timeout"] = command_timeout
 
-async def init_db_session() -> AsyncGenerator[AsyncSession, None]:
-    async with _async_session() as session:
+    instrumentor = SQLAlchemyInstrumentor()
+    if not instrumentor.is_instrumented_by_opentelemetry:
+        # оборачивает create_async_engine, поэтому трассируются все движки: основной и реплики
+        instrumentor.instrument()
+    engine = sqlalchemy_asyncio.create_async_engine(
+        uri,
+        echo=echo,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_logging_name=name,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        pool_pre_ping=pool_pre_ping,
+        connect_args=connect_args,
+    )
+    return engine
+
+
+async def init_db_engine(uri: str, options: dict[str, Any]) -> AsyncGenerator[AsyncEngine, None]:
+    """
+    Движок на время жизни приложения, соединения закрываются при остановке
+
+    :param uri: URI базы данных
+    :param options: Параметры пула, см. create_db_engine
+    """
+    engine = create_db_engine(uri, **options)
+    observe_pool(engine, name=options.get("name", "primary"))
+    try:
+        yield engine
+    finally:
+        await engine.dispose()
+
+
+def create_session_factory(engine: AsyncEngine) -> sessionmaker:
+    return sessionmaker(autocommit=False, autoflush=True, bind=engine, expire_on_commit=False, class_=AsyncSession)
+
+
+async def init_db_session(session_factory: sessionmaker) -> AsyncGenerator[AsyncSession, None]:
+    async with session_factory() as session:
         yield session
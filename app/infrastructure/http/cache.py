@@ -0,0 +1,324 @@
+import asyncio
+import base64
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from time import time
+from typing import Any, Awaitable, Callable, Mapping, Optional
+
+import orjson
+import structlog
+from httpx import Headers, Response
+from redis.asyncio import Redis
+from utils.cache import TTLCache
+
+logger = structlog.get_logger(__name__)
+
+# Заголовки ответа, которые хранятся в кэше
+STORED_HEADERS = ("content-type", "cache-control", "etag", "last-modified", "vary")
+# Заголовки запроса, при которых ответ не кэшируется: его условия задал вызывающий
+CONDITIONAL_REQUEST_HEADERS = ("if-none-match", "if-modified-since")
+
+
+def parse_cache_control(value: str) -> dict[str, Optional[str]]:
+    """
+    Разбор заголовка Cache-Control
+
+    :param value: Значение заголовка
+    :return: Директивы в нижнем регистре и их значения
+    """
+    directives: dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, argument = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = argument.strip('"') if argument else None
+    return directives
+
+
+def parse_vary(value: str) -> tuple[str, ...]:
+    """
+    Разбор заголовка Vary
+
+    :param value: Значение заголовка
+    :return: Имена заголовков запроса в нижнем регистре
+    """
+    return tuple(name.strip().lower() for name in value.split(",") if name.strip())
+
+
+def _seconds(value: Optional[str]) -> int:
+    try:
+        return max(0, int(value)) if value is not None else 0
+    except ValueError:
+        return 0
+
+
+class CachedResponse:
+    """
+    Сохраненный ответ сервиса со сроками свежести по Cache-Control
+    """
+
+    __slots__ = ("status_code", "headers", "content", "stored_at", "max_age", "stale_while_revalidate", "vary")
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: dict[str, str],
+        content: bytes,
+        stored_at: float,
+        max_age: float,
+        stale_while_revalidate: float,
+        vary: Optional[dict[str, str]] = None,
+    ):
+        """
+        :param status_code: Http статус ответа
+        :param headers: Сохраняемые заголовки ответа
+        :param content: Тело ответа
+        :param stored_at: Время сохранения
+        :param max_age: Время свежести ответа, секунды
+        :param stale_while_revalidate: Время после max_age, в течение которого отдается устаревший ответ,
+        пока он обновляется в фоне, секунды
+        :param vary: Значения заголовков запроса из Vary ответа, с которыми он был получен
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.stored_at = stored_at
+        self.max_age = max_age
+        self.stale_while_revalidate = stale_while_revalidate
+        self.vary = vary or {}
+
+    @classmethod
+    def from_response(
+        cls, response: Response, now: float, request_headers: Optional[Mapping[str, str]] = None
+    ) -> Optional["CachedResponse"]:
+        """
+        Создание записи из ответа сервиса
+
+        :param response: Ответ сервиса
+        :param now: Текущее время
+        :param request_headers: Заголовки запроса в нижнем регистре, по ним запоминаются значения из Vary
+        :return: Запись, либо None, если ответ нельзя кэшировать
+        """
+        directives = parse_cache_control(response.headers.get("cache-control", ""))
+        has_validators = "etag" in response.headers or "last-modified" in response.headers
+        vary = parse_vary(response.headers.get("vary", ""))
+        # кэш общий для всех вызывающих, а в Redis - и для процессов, поэтому private ответы в нем не хранятся
+        if response.status_code != 200 or "no-store" in directives or "private" in directives or "*" in vary:
+            return None
+        if "max-age" not in directives and not has_validators:
+            return None
+
+        max_age = 0 if "no-cache" in directives else _seconds(directives.get("max-age"))
+        return cls(
+            status_code=response.status_code,
+            headers={name: response.headers[name] for name in STORED_HEADERS if name in response.headers},
+            content=response.content,
+            stored_at=now,
+            max_age=max(0, max_age - _seconds(response.headers.get("age"))),
+            stale_while_revalidate=_seconds(directives.get("stale-while-revalidate")),
+            vary={name: (request_headers or {}).get(name, "") for name in vary},
+        )
+
+    @property
+    def has_validators(self) -> bool:
+        return "etag" in self.headers or "last-modified" in self.headers
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.stored_at + self.max_age
+
+    def matches(self, request_headers: Mapping[str, str]) -> bool:
+        """
+        Подходит ли запись запросу по заголовкам из Vary
+
+        :param request_headers: Заголовки запроса в нижнем регистре
+        """
+        return all(request_headers.get(name, "") == value for name, value in self.vary.items())
+
+    def is_usable_stale(self, now: float) -> bool:
+        return now < self.stored_at + self.max_age + self.stale_while_revalidate
+
+    def revalidated(self, response: Response, now: float) -> "CachedResponse":
+        """
+        Обновление записи по ответу 304 Not Modified
+
+        :param response: Ответ 304
+        :param now: Текущее время
+        :return: Запись с обновленными заголовками и сроками
+        """
+        headers = {**self.headers}
+        headers.update({name: response.headers[name] for name in STORED_HEADERS if name in response.headers})
+        directives = parse_cache_control(headers.get("cache-control", ""))
+        return CachedResponse(
+            status_code=self.status_code,
+            headers=headers,
+            content=self.content,
+            stored_at=now,
+            max_age=0
+            if "no-cache" in directives
+            else max(0, _seconds(directives.get("max-age")) - _seconds(response.headers.get("age"))),
+            stale_while_revalidate=_seconds(directives.get("stale-while-revalidate")),
+            vary=self.vary,
+        )
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if "etag" in self.headers:
+            headers["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["If-Modified-Since"] = self.headers["last-modified"]
+        return headers
+
+    def to_response(self) -> Response:
+        return Response(self.status_code, headers=Headers(self.headers), content=self.content)
+
+    def dumps(self) -> bytes:
+        return orjson.dumps(
+            {
+                "status_code": self.status_code,
+                "headers": self.headers,
+                "content": base64.b64encode(self.content).decode(),
+                "stored_at": self.stored_at,
+                "max_age": self.max_age,
+                "stale_while_revalidate": self.stale_while_revalidate,
+                "vary": self.vary,
+            }
+        )
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        fields = orjson.loads(data)
+        fields["content"] = base64.b64decode(fields["content"])
+        return cls(**fields)
+
+
+class BaseResponseCacheBackend(ABC):
+    """
+    Хранилище ответов сервисов
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        """
+        Сохранение записи
+
+        :param key: Ключ запроса
+        :param entry: Запись
+        :param ttl: Время хранения записи, секунды
+        """
+        ...
+
+
+class InMemoryResponseCacheBackend(BaseResponseCacheBackend):
+    """
+    Хранилище в памяти процесса с вытеснением по LRU
+    """
+
+    __slots__ = ("_cache",)
+
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time) -> None:
+        self._cache: TTLCache[str, CachedResponse] = TTLCache(maxsize=maxsize, clock=clock)
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        self._cache.set(key, entry, expires_at=self._cache.clock() + ttl)
+
+
+class RedisResponseCacheBackend(BaseResponseCacheBackend):
+    """
+    Хранилище в Redis, общее для всех экземпляров сервиса.
+    Размер ограничивается политикой вытеснения Redis (maxmemory-policy allkeys-lru)
+    """
+
+    __slots__ = ("_redis", "_prefix")
+
+    def __init__(self, redis: Redis, prefix: str = "http-cache:") -> None:
+        """
+        :param redis: Клиент Redis
+        :param prefix: Префикс ключей
+        """
+        self._redis = redis
+        self._prefix = prefix
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        try:
+            data = await self._redis.get(self._prefix + key)
+        except Exception as e:
+            logger.warning("Failed to read http response cache", error=str(e))
+            return None
+        return CachedResponse.loads(data) if data is not None else None
+
+    async def set(self, key: str, entry: CachedResponse, ttl: float) -> None:
+        try:
+            await self._redis.set(self._prefix + key, entry.dumps(), px=max(1, int(ttl * 1000)))
+        except Exception as e:
+            logger.warning("Failed to write http response cache", error=str(e))
+
+
+class ResponseCache:
+    """
+    Кэш ответов сервисов с учетом Cache-Control и условной перепроверкой по ETag/Last-Modified.
+    Считает попадания по сервисам
+    """
+
+    __slots__ = ("_backend", "_revalidation_ttl", "_clock", "_revalidations", "hits", "misses", "revalidated")
+
+    def __init__(
+        self, backend: BaseResponseCacheBackend, *, revalidation_ttl: float = 60 * 60, clock: Callable[[], float] = time
+    ):
+        """
+        :param backend: Хранилище
+        :param revalidation_ttl: Время хранения устаревшего ответа с ETag/Last-Modified для перепроверки, секунды
+        :param clock: Источник времени. В Redis записи общие для процессов, поэтому время не монотонное
+        """
+        self._backend = backend
+        self._revalidation_ttl = revalidation_ttl
+        self._clock = clock
+        self._revalidations: set[asyncio.Task] = set()
+        self.hits: defaultdict[str, int] = defaultdict(int)
+        self.misses: defaultdict[str, int] = defaultdict(int)
+        self.revalidated: defaultdict[str, int] = defaultdict(int)
+
+    @property
+    def clock(self) -> Callable[[], float]:
+        return self._clock
+
+    @property
+    def services(self) -> set[str]:
+        return {*self.hits, *self.misses, *self.revalidated}
+
+    def hit_ratio(self, service: str) -> float:
+        """
+        Доля ответов сервиса, полученных без загрузки тела: из кэша или после 304 Not Modified
+        """
+        hits = self.hits.get(service, 0) + self.revalidated.get(service, 0)
+        total = hits + self.misses.get(service, 0)
+        return hits / total if total else 0.0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return await self._backend.get(key)
+
+    async def store(self, key: str, entry: CachedResponse) -> None:
+        ttl = entry.max_age + entry.stale_while_revalidate
+        if entry.has_validators:
+            # запись с ETag/Last-Modified хранится дольше свежести, чтобы перепроверять ее запросом с 304
+            ttl = max(ttl, self._revalidation_ttl)
+        if ttl > 0:
+            await self._backend.set(key, entry, ttl)
+
+    def revalidate_in_background(self, revalidation: Awaitable[Any]) -> None:
+        """
+        Фоновое обновление устаревшей записи. Ссылка на задачу хранится до ее завершения
+        """
+        task = asyncio.ensure_future(revalidation)
+        self._revalidations.add(task)
+        task.add_done_callback(self._on_revalidated)
+
+    def _on_revalidated(self, task: asyncio.Task) -> None:
+        self._revalidations.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Failed to revalidate http response", error=str(task.exception()))
@@ -0,0 +1,59 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+import orjson
+from pydantic import BaseModel, parse_obj_as
+from utils.models import construct
+
+
+class BaseResponseDecoder(ABC):
+    """
+    Разбор тела ответа сервиса
+    """
+
+    @abstractmethod
+    def decode(self, content: bytes) -> Any:
+        """
+        :param content: Тело ответа
+        :return: Разобранный ответ
+        :raise: orjson.JSONDecodeError (наследник json.JSONDecodeError), pydantic.ValidationError
+        """
+        ...
+
+
+class JsonDecoder(BaseResponseDecoder):
+    """
+    Разбор JSON через orjson напрямую из байт ответа
+    """
+
+    __slots__ = ()
+
+    def decode(self, content: bytes) -> Any:
+        return orjson.loads(content) if content else None
+
+
+class ModelDecoder(BaseResponseDecoder):
+    """
+    Разбор JSON в pydantic модель ответа сервиса.
+
+    Без валидации модель собирается через construct: типы не проверяются и не приводятся,
+    поэтому режим подходит только для доверенных внутренних сервисов
+    """
+
+    __slots__ = ("_model", "_validate")
+
+    def __init__(self, model: Any, validate: bool = True):
+        """
+        :param model: Модель ответа, либо тип над моделями, например list[Model]
+        :param validate: Валидировать ответ
+        """
+        self._model = model
+        self._validate = validate
+
+    def decode(self, content: bytes) -> Any:
+        data = orjson.loads(content)
+        if not self._validate:
+            return construct(self._model, data)
+        if isinstance(self._model, type) and issubclass(self._model, BaseModel):
+            return self._model.parse_obj(data)
+        return parse_obj_as(self._model, data)
@@ -0,0 +1,199 @@
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+from httpx_backoff.hedging import HedgePolicy
+from httpx_backoff.hooks import RetryHooks, RetryOutcome
+from httpx_backoff.retry_budget import RetryBudget
+from infrastructure.http.cache import BaseResponseCacheBackend, ResponseCache
+from opentelemetry import metrics, trace
+from opentelemetry.metrics import CallbackOptions, Observation
+
+meter = metrics.get_meter(__name__)
+
+
+def create_retry_budget(ratio: float, max_tokens: float) -> RetryBudget:
+    """
+    Создание бюджета ретраев с экспортом метрик в OpenTelemetry
+
+    :param ratio: Доля ретраев от успешных запросов
+    :param max_tokens: Емкость бакета
+    :return: RetryBudget
+    """
+    budget = RetryBudget(ratio=ratio, max_tokens=max_tokens)
+
+    def observe_tokens(_: CallbackOptions) -> Iterable[Observation]:
+        return [Observation(budget.tokens(host), {"host": host}) for host in budget.keys]
+
+    def observe_depletions(_: CallbackOptions) -> Iterable[Observation]:
+        return [Observation(count, {"host": host}) for host, count in list(budget.depletions.items())]
+
+    def observe_suppressed(_: CallbackOptions) -> Iterable[Observation]:
+        return [Observation(count, {"host": host}) for host, count in list(budget.suppressed.items())]
+
+    meter.create_observable_gauge(
+        "http.client.retry_budget.tokens",
+        callbacks=[observe_tokens],
+        description="Tokens left in the retry budget",
+    )
+    meter.create_observable_counter(
+        "http.client.retry_budget.depletions",
+        callbacks=[observe_depletions],
+        description="Number of times the retry budget was depleted",
+    )
+    meter.create_observable_counter(
+        "http.client.retry_budget.suppressed_retries",
+        callbacks=[observe_suppressed],
+        description="Number of retries suppressed by the retry budget",
+    )
+
+    return budget
+
+
+class RetryMetricsHooks(RetryHooks):
+    """
+    Метрики ретраев в OpenTelemetry: число попыток, время ожидания и итог вызова по хостам.
+    Ретраи дополнительно пишутся событиями в текущий span запроса
+    """
+
+    __slots__ = ("_span_events", "_attempts", "_wait", "_outcomes")
+
+    def __init__(self, span_events: bool = True):
+        """
+        :param span_events: Писать события ретраев в текущий span
+        """
+        self._span_events = span_events
+        self._attempts = meter.create_histogram(
+            "http.client.retry.attempts",
+            description="Number of attempts made per request",
+        )
+        self._wait = meter.create_histogram(
+            "http.client.retry.wait",
+            unit="s",
+            description="Time spent waiting between attempts per request",
+        )
+        self._outcomes = meter.create_counter(
+            "http.client.retry.outcomes",
+            description="Number of requests by the way the retry loop ended",
+        )
+
+    def on_retry(self, key: Hashable, attempt: int, wait: float, outcome: Any) -> None:
+        if not self._span_events:
+            return
+        span = trace.get_current_span()
+        if span.is_recording():
+            status_code = getattr(outcome, "status_code", None)
+            span.add_event(
+                "http.retry",
+                {
+                    "http.retry.attempt": attempt,
+                    "http.retry.wait": wait,
+                    "http.retry.reason": type(outcome).__name__ if status_code is None else str(status_code),
+                },
+            )
+
+    def on_finish(
+        self,
+        key: Hashable,
+        attempts: int,
+        waited: float,
+        elapsed: float,
+        outcome: RetryOutcome,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        attributes = {"host": str(key), "outcome": outcome.value}
+        self._attempts.record(attempts, attributes)
+        self._wait.record(waited, attributes)
+        self._outcomes.add(1, attributes)
+
+
+def create_hedge_policy(delay: float, quantile: float, ratio: float, max_tokens: float) -> HedgePolicy:
+    """
+    Создание политики хеджирования запросов с экспортом метрик в OpenTelemetry
+
+    :param delay: Задержка перед повторным запросом, пока не набрана статистика латентности
+    :param quantile: Квантиль латентности, используемый как задержка
+    :param ratio: Доля хеджей от запросов
+    :param max_tokens: Емкость бакета
+    :return: HedgePolicy
+    """
+    policy = HedgePolicy(delay=delay, quantile=quantile, budget=RetryBudget(ratio=ratio, max_tokens=max_tokens))
+
+    def observe(counters: dict) -> Callable[[CallbackOptions], Iterable[Observation]]:
+        def callback(_: CallbackOptions) -> Iterable[Observation]:
+            return [Observation(count, {"host": host}) for host, count in list(counters.items())]
+
+        return callback
+
+    def observe_delay(_: CallbackOptions) -> Iterable[Observation]:
+        return [Observation(policy.delay(host), {"host": host}) for host in list(policy.hedged)]
+
+    meter.create_observable_counter(
+        "http.client.hedge.requests",
+        callbacks=[observe(policy.hedged)],
+        description="Number of hedged requests sent",
+    )
+    meter.create_observable_counter(
+        "http.client.hedge.wins",
+        callbacks=[observe(policy.wins)],
+        description="Number of hedged requests which responded before the original request",
+    )
+    meter.create_observable_counter(
+        "http.client.hedge.losses",
+        callbacks=[observe(policy.losses)],
+        description="Number of hedged requests which lost to the original request",
+    )
+    meter.create_observable_counter(
+        "http.client.hedge.suppressed",
+        callbacks=[observe(policy.budget.suppressed)],
+        description="Number of hedged requests suppressed by the hedge budget",
+    )
+    meter.create_observable_gauge(
+        "http.client.hedge.delay",
+        callbacks=[observe_delay],
+        unit="s",
+        description="Current hedge delay",
+    )
+
+    return policy
+
+
+def create_response_cache(backend: BaseResponseCacheBackend, revalidation_ttl: float) -> ResponseCache:
+    """
+    Создание кэша ответов сервисов с экспортом метрик в OpenTelemetry
+
+    :param backend: Хранилище
+    :param revalidation_ttl: Время хранения ответов с ETag/Last-Modified для перепроверки
+    :return: ResponseCache
+    """
+    cache = ResponseCache(backend, revalidation_ttl=revalidation_ttl)
+
+    def observe(counters: dict) -> Callable[[CallbackOptions], Iterable[Observation]]:
+        def callback(_: CallbackOptions) -> Iterable[Observation]:
+            return [Observation(count, {"service": service}) for service, count in list(counters.items())]
+
+        return callback
+
+    def observe_hit_ratio(_: CallbackOptions) -> Iterable[Observation]:
+        return [Observation(cache.hit_ratio(service), {"service": service}) for service in cache.services]
+
+    meter.create_observable_counter(
+        "http.client.cache.hits",
+        callbacks=[observe(cache.hits)],
+        description="Number of responses served from the cache",
+    )
+    meter.create_observable_counter(
+        "http.client.cache.revalidated",
+        callbacks=[observe(cache.revalidated)],
+        description="Number of cached responses revalidated with 304 Not Modified",
+    )
+    meter.create_observable_counter(
+        "http.client.cache.misses",
+        callbacks=[observe(cache.misses)],
+        description="Number of responses downloaded in full",
+    )
+    meter.create_observable_gauge(
+        "http.client.cache.hit_ratio",
+        callbacks=[observe_hit_ratio],
+        description="Share of responses served without downloading the body",
+    )
+
+    return cache
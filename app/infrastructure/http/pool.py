@@ -0,0 +1,68 @@
+from typing import AsyncGenerator
+
+import structlog
+from httpx import AsyncClient, Limits
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+logger = structlog.get_logger(__name__)
+
+
+class HTTPClientPool:
+    """
+    Общие для процесса httpx клиенты, по одному на base URL.
+
+    Клиент создается при первом запросе, инструментируется один раз и переиспользует соединения
+    между всеми сервисами, которые ходят на этот base URL.
+    """
+
+    __slots__ = ("_limits", "_http2", "_clients")
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+    ):
+        """
+        :param max_connections: Максимум соединений клиента
+        :param max_keepalive_connections: Максимум простаивающих соединений в пуле
+        :param keepalive_expiry: Время жизни простаивающего соединения, секунды
+        :param http2: Использовать HTTP/2, требует пакет h2 (httpx[http2])
+        """
+        self._limits = Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http2 = http2
+        self._clients: dict[str, AsyncClient] = {}
+
+    def get(self, base_url: str = "") -> AsyncClient:
+        """
+        Получение клиента
+
+        :param base_url: Base URL сервиса. Пустая строка - клиент для запросов по абсолютным URL
+        :return: AsyncClient
+        """
+        client = self._clients.get(base_url)
+        if client is None or client.is_closed:
+            client = self._clients[base_url] = AsyncClient(base_url=base_url, limits=self._limits, http2=self._http2)
+            HTTPXClientInstrumentor().instrument_client(client=client)
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = self._clients, {}
+        for base_url, client in clients.items():
+            try:
+                await client.aclose()
+            except Exception as e:
+                logger.warning("Failed to close http client", base_url=base_url, error=str(e))
+
+
+async def init_http_client_pool(pool: HTTPClientPool) -> AsyncGenerator[HTTPClientPool, None]:
+    try:
+        yield pool
+    finally:
+        await pool.aclose()
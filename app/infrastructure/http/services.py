@@ -1,27 +1,91 @@
+import hashlib
 from abc import ABC, abstractmethod
 from json import JSONDecodeError
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional
 
+import orjson
 from common.dto.errors import BusinessErrorDTO
 from common.errors import BaseInternalBusinessError, ValidationBusinessError
 from common.interfaces.service import ClientResponse, IHTTPService
 from dependency_injector.wiring import Provide, inject
-from httpx import Response
-from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx import QueryParams, Response
+from httpx_backoff.batch import BatchExecutor, BatchResult, RequestSpec
+from httpx_backoff.circuit_breaker import CircuitBreakerClient
+from infrastructure.http.cache import CONDITIONAL_REQUEST_HEADERS, CachedResponse, ResponseCache
+from infrastructure.http.decoders import BaseResponseDecoder, JsonDecoder
 from opentelemetry import trace
-from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
 from pydantic import ValidationError
+from utils.single_flight import SingleFlight
 
 tracer = trace.get_tracer(__name__)
 
+# Параметры request, которые не влияют на ответ: hedge меняет только момент отправки повторного запроса
+COALESCE_SAFE_KWARGS = frozenset({"hedge"})
+
 
 class BasehttpService(IHTTPService, ABC):
     DEFAULT_DETAIL = "Failed to validate a foreign service error response"
+    RESPONSE_DETAIL = "Failed to validate a foreign service response"
+    # Разбор тела успешного ответа, например ModelDecoder(ClientResponse) для типизированного ответа
+    DECODER: BaseResponseDecoder = JsonDecoder()
+    # Одновременные одинаковые запросы этими методами выполняются одним запросом к сервису
+    COALESCED_METHODS = frozenset({"GET", "HEAD"})
+    # Заголовки, от которых зависит ответ: запросы с разными значениями не схлопываются
+    COALESCE_KEY_HEADERS = ("accept", "accept-encoding", "accept-language", "authorization", "cookie")
+    # Кэширование GET ответов по Cache-Control и ETag/Last-Modified
+    CACHE_RESPONSES = False
+    # Имя сервиса в метриках кэша, по умолчанию имя класса
+    SERVICE_NAME: Optional[str] = None
+    # Base URL сервиса: клиент берется из общего пула gateways.http_client_pool по этому адресу
+    BASE_URL = ""
 
     @inject
-    def __init__(self, retry_client: PredicateClient = Provide["gateways.retry_client"]):
+    def __init__(
+        self,
+        retry_client: CircuitBreakerClient = Provide["gateways.retry_client"],
+        single_flight: SingleFlight = Provide["gateways.single_flight"],
+        response_cache: ResponseCache = Provide["gateways.response_cache"],
+        retry_client_factory: Callable[..., CircuitBreakerClient] = Provide["gateways.retry_client.provider"],
+    ):
+        if self.BASE_URL:
+            # base_url передается через retry_client -> hedging_client -> predicate_client в async_client
+            retry_client = retry_client_factory(client__client__client__base_url=self.BASE_URL)
         self._retry_client = retry_client
-        HTTPXClientInstrumentor().instrument_client(client=self._retry_client.client)
+        self._single_flight = single_flight
+        self._response_cache = response_cache
+
+    @property
+    def service_name(self) -> str:
+        return self.SERVICE_NAME or type(self).__name__
+
+    def _coalesce_key(
+        self, method: str, url: str, headers: dict, params: Optional[dict], kwargs: dict
+    ) -> Optional[tuple]:
+        """
+        Ключ схлопывания запроса
+
+        :param method: Метод вызова
+        :param url: URL
+        :param headers: Заголовки запроса
+        :param params: Query параметры
+        :param kwargs: Остальные параметры запроса: тело, cookies, timeout и т.д.
+        :return: Ключ, либо None, если запрос не схлопывается
+        """
+        method = method.upper()
+        if method not in self.COALESCED_METHODS:
+            return None
+        # параметры, не входящие в ключ, могут менять запрос или его результат, такие запросы не схлопываются
+        if any(value is not None and name not in COALESCE_SAFE_KWARGS for name, value in kwargs.items()):
+            return None
+
+        lowered = {name.lower(): value for name, value in headers.items()}
+        return (
+            method,
+            str(self._retry_client.client.base_url),
+            url,
+            tuple(sorted(QueryParams(params).multi_items())) if params else (),
+            tuple(lowered.get(name) for name in self.COALESCE_KEY_HEADERS),
+        )
 
     async def _parse_error(self, error: dict, status: str) -> BaseInternalBusinessError:
         """
@@ -34,7 +98,7 @@ class BasehttpService(IHTTPService, ABC):
         """
         with tracer.start_as_current_span("_parse_error"):
             try:
-                return BaseInternalBusinessError(**BusinessErrorDTO.parse_obj(error).dict())
+                return BaseInternalBusinessError(**dict(BusinessErrorDTO.parse_obj(error)))
             except ValidationError as e:
                 raise ValidationBusinessError(
                     status=status, detail=self.DEFAULT_DETAIL, data={"rawResponse": error, "reason": e.errors()}
@@ -50,7 +114,7 @@ class BasehttpService(IHTTPService, ABC):
         """
         with tracer.start_as_current_span("_process_error"):
             try:
-                return await self._parse_error(response.json(), str(response.status_code))
+                return await self._parse_error(orjson.loads(response.content), str(response.status_code))
             except JSONDecodeError as e:
                 raise ValidationBusinessError(
                     status=str(response.status_code),
@@ -76,6 +140,7 @@ class BasehttpService(IHTTPService, ABC):
         headers: Optional[dict] = None,
         data: Optional[dict] = None,
         params: Optional[dict] = None,
+        hedge: Optional[bool] = None,
         **kwargs: Any,
     ) -> Response:
         """
@@ -87,6 +152,8 @@ class BasehttpService(IHTTPService, ABC):
         :param headers: Headers
         :param data: multipart data
         :param params: Query параметры
+        :param hedge: Хеджирование запроса: при медленном ответе отправляется повторный запрос и берется
+        первый ответ. Применяется только к идемпотентным методам, None - значение из конфига
         :param kwargs: другие параметры, которые соответствуют интерфейсу клиента AsyncClient из httpx
         :return:
         """
@@ -94,13 +161,266 @@ class BasehttpService(IHTTPService, ABC):
             request_headers = {**self.http_headers}
             if headers:
                 request_headers.update(headers)
-            response = await self._retry_client.request(url, method=method, headers=request_headers, **kwargs)
+            if hedge is not None:
+                kwargs["hedge"] = hedge
+
+            def send(conditional_headers: Optional[dict] = None) -> Awaitable[Response]:
+                return self._retry_client.request(
+                    url,
+                    method=method,
+                    json=json,
+                    headers={**request_headers, **conditional_headers} if conditional_headers else request_headers,
+                    data=data,
+                    params=params,
+                    **kwargs,
+                )
+
+            key = self._coalesce_key(method, url, request_headers, params, {"json": json, "data": data, **kwargs})
+            # ответ общий для схлопнутых запросов, но разбирается каждым из них отдельно
+            if key is None:
+                response = await send()
+            elif self.CACHE_RESPONSES and method.upper() == "GET":
+                response = await self._cached_request(key, send, request_headers)
+            else:
+                response = await self._single_flight.do(key, send)
             if self._retry_client.predicate(response):
                 raise await self._process_error(response)
             return await self._process_response(response)
 
+    def request_many(
+        self,
+        requests: Iterable[RequestSpec],
+        *,
+        concurrency: int = 10,
+        per_host: Optional[int] = None,
+        ordered: bool = False,
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Пакетное выполнение запросов с ограничением параллельности.
+        Каждый запрос выполняется через request, его результат или исключение возвращается в BatchResult
+
+        :param requests: Запросы
+        :param concurrency: Максимум одновременных запросов
+        :param per_host: Максимум одновременных запросов к одному хосту
+        :param ordered: Возвращать результаты в порядке запросов, а не по мере выполнения
+        :return: Результаты запросов
+        """
+        executor = BatchExecutor(
+            lambda spec: self.request(**spec.as_kwargs()),
+            concurrency=concurrency,
+            per_host=per_host,
+            base_url=self._retry_client.client.base_url,
+        )
+        return executor.run(requests, ordered=ordered)
+
+    async def stream(
+        self,
+        *,
+        method: str = "GET",
+        url: str,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        chunk_size: Optional[int] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[bytes]:
+        """
+        Потоковое чтение тела ответа частями.
+
+        Следующая часть читается из сокета, только когда потребитель ее запрашивает, поэтому память
+        не зависит от размера ответа. Запрос повторяется только до получения ответа, после начала
+        чтения тела ошибки не повторяются. При выходе из цикла до конца ответа итератор нужно закрыть:
+        async with aclosing(service.stream(...)) as chunks
+
+        :param method: Метод вызова
+        :param url: URL
+        :param json: json request body
+        :param headers: Headers
+        :param data: multipart data
+        :param params: Query параметры
+        :param chunk_size: Размер части, по умолчанию части отдаются по мере получения
+        :param kwargs: другие параметры, которые соответствуют интерфейсу клиента AsyncClient из httpx
+        :return: Части тела ответа
+        """
+        response = await self._open_stream(
+            method=method, url=url, json=json, headers=headers, data=data, params=params, **kwargs
+        )
+        try:
+            async for chunk in response.aiter_bytes(chunk_size):
+                yield chunk
+        finally:
+            await response.aclose()
+
+    async def stream_records(
+        self,
+        *,
+        method: str = "GET",
+        url: str,
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        decoder: BaseResponseDecoder = JsonDecoder(),
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        """
+        Потоковое чтение NDJSON ответа по записям. Ограничения те же, что у stream
+
+        :param method: Метод вызова
+        :param url: URL
+        :param json: json request body
+        :param headers: Headers
+        :param data: multipart data
+        :param params: Query параметры
+        :param decoder: Разбор одной записи, например ModelDecoder(Record)
+        :param kwargs: другие параметры, которые соответствуют интерфейсу клиента AsyncClient из httpx
+        :return: Разобранные записи
+        """
+        headers = {"Accept": "application/x-ndjson", **(headers or {})}
+        response = await self._open_stream(
+            method=method, url=url, json=json, headers=headers, data=data, params=params, **kwargs
+        )
+        try:
+            buffer = bytearray()
+            # до этого смещения в буфере нет перевода строки, поиск продолжается с него
+            scanned = 0
+            async for chunk in response.aiter_bytes():
+                buffer += chunk
+                start = 0
+                while (end := buffer.find(b"\n", max(start, scanned))) != -1:
+                    line, start = bytes(buffer[start:end]), end + 1
+                    if line.strip():
+                        yield self._decode_record(decoder, line, response)
+                # в буфере остается только недочитанная запись
+                del buffer[:start]
+                scanned = len(buffer)
+            if buffer.strip():
+                yield self._decode_record(decoder, bytes(buffer), response)
+        finally:
+            await response.aclose()
+
+    def _decode_record(self, decoder: BaseResponseDecoder, line: bytes, response: Response) -> Any:
+        """
+        Разбор одной записи потокового ответа
+
+        :raises ValidationBusinessError: Запись не прошла валидацию
+        """
+        try:
+            return decoder.decode(line)
+        except ValidationError as e:
+            raise ValidationBusinessError(
+                status=str(response.status_code), detail=self.RESPONSE_DETAIL, data={"reason": e.errors()}
+            )
+
+    async def _open_stream(self, *, method: str, url: str, headers: Optional[dict], **kwargs: Any) -> Response:
+        """
+        Запрос без чтения тела ответа. Ошибка сервиса читается целиком и поднимается как исключение
+
+        :return: Ответ, тело которого еще не прочитано
+        """
+        with tracer.start_as_current_span("stream_request"):
+            request_headers = {**self.http_headers}
+            if headers:
+                request_headers.update(headers)
+
+            response = await self._retry_client.request(
+                url, method=method, headers=request_headers, stream=True, **kwargs
+            )
+            if self._retry_client.predicate(response):
+                try:
+                    await response.aread()
+                    raise await self._process_error(response)
+                finally:
+                    await response.aclose()
+            return response
+
+    async def _cached_request(
+        self, key: tuple, send: Callable[[Optional[dict]], Awaitable[Response]], headers: dict
+    ) -> Response:
+        """
+        Запрос через кэш ответов. Устаревший ответ в пределах stale-while-revalidate отдается сразу
+        и обновляется в фоне, остальные промахи перепроверяются условным запросом
+
+        :param key: Ключ схлопывания запроса
+        :param send: Отправка запроса с дополнительными заголовками
+        :param headers: Заголовки запроса
+        :return: Ответ сервиса
+        """
+        request_headers = {name.lower(): value for name, value in headers.items()}
+        if any(name in request_headers for name in CONDITIONAL_REQUEST_HEADERS):
+            # ответ на условный запрос вызывающего, в том числе 304, отдается ему как есть
+            return await self._single_flight.do(key, lambda: send(None))
+
+        with tracer.start_as_current_span("_cached_request") as span:
+            cache = self._response_cache
+            cache_key = hashlib.sha256(repr(key).encode()).hexdigest()
+            entry = await cache.get(cache_key)
+            if entry is not None and not entry.matches(request_headers):
+                # запись получена с другими значениями заголовков из Vary ответа
+                entry = None
+
+            now = cache.clock()
+            if entry is not None and entry.is_usable_stale(now):
+                cache.hits[self.service_name] += 1
+                span.set_attribute("http.cache", "hit" if entry.is_fresh(now) else "stale")
+                if not entry.is_fresh(now):
+                    cache.revalidate_in_background(
+                        self._single_flight.do(
+                            ("revalidate", key), lambda: self._fetch(cache_key, entry, send, request_headers)
+                        )
+                    )
+                return entry.to_response()
+
+            span.set_attribute("http.cache", "miss")
+            return await self._single_flight.do(key, lambda: self._fetch(cache_key, entry, send, request_headers))
+
+    async def _fetch(
+        self,
+        cache_key: str,
+        entry: Optional[CachedResponse],
+        send: Callable[[Optional[dict]], Awaitable[Response]],
+        request_headers: dict[str, str],
+    ) -> Response:
+        """
+        Загрузка ответа с условной перепроверкой сохраненной записи и сохранением нового ответа
+
+        :param cache_key: Ключ кэша
+        :param entry: Сохраненная запись
+        :param send: Отправка запроса с дополнительными заголовками
+        :param request_headers: Заголовки запроса в нижнем регистре
+        :raises ValidationBusinessError: Сервис ответил 304 на запрос без условных заголовков
+        :return: Ответ сервиса
+        """
+        cache = self._response_cache
+        response = await send(entry.conditional_headers() if entry is not None else None)
+
+        now = cache.clock()
+        if response.status_code == 304 and entry is None:
+            raise ValidationBusinessError(
+                status=str(response.status_code),
+                detail=self.RESPONSE_DETAIL,
+                data={"rawResponse": response.text, "reason": "Not Modified without a cached response"},
+            )
+        if response.status_code == 304 and entry is not None:
+            cache.revalidated[self.service_name] += 1
+            entry = entry.revalidated(response, now)
+        else:
+            cache.misses[self.service_name] += 1
+            entry = CachedResponse.from_response(response, now, request_headers)
+            if entry is None:
+                return response
+
+        await cache.store(cache_key, entry)
+        return entry.to_response()
+
 
 class SimpleJsonHTTPService(BasehttpService):
     async def _process_response(self, response: Response) -> ClientResponse:
         with tracer.start_as_current_span("_process_response"):
-            return response.json()
+            try:
+                return self.DECODER.decode(response.content)
+            except ValidationError as e:
+                raise ValidationBusinessError(
+                    status=str(response.status_code), detail=self.RESPONSE_DETAIL, data={"reason": e.errors()}
+                )
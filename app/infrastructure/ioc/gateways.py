@@ -1,29 +1,165 @@
+from common.errors import CircuitBreakerOpenError
 from dependency_injector import containers, providers
-from httpx import AsyncClient
-from httpx_backoff.backoff_options import Expo
+from httpx_backoff.backoff_options import Adaptive, Expo
+from httpx_backoff.circuit_breaker import CircuitBreakerClient, CircuitBreakerRegistry
 from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.hedging import HedgingClient
+from httpx_backoff.rate_limit import HostRateLimiter
 from infrastructure.config import config
-from infrastructure.db.session import init_db_session
+from infrastructure.db.replicas import ReplicaRouter, create_read_session_factory, init_db_replicas
+from infrastructure.db.session import create_session_factory, init_db_engine, init_db_session
+from infrastructure.http.cache import InMemoryResponseCacheBackend, RedisResponseCacheBackend
+from infrastructure.http.metrics import (
+    RetryMetricsHooks,
+    create_hedge_policy,
+    create_response_cache,
+    create_retry_budget,
+)
+from infrastructure.http.pool import HTTPClientPool, init_http_client_pool
 from infrastructure.http.services import SimpleJsonHTTPService
+from infrastructure.queries.cache import QueryCache
+from infrastructure.redis import init_redis
+from redis.asyncio import Redis
+from utils.single_flight import SingleFlight
 
 
 class Gateways(containers.DeclarativeContainer):
     config = providers.Configuration()
 
-    db_session = providers.Resource(init_db_session)
+    db_engine_options = providers.Dict(
+        echo=config.DEBUG,
+        pool_size=config.POSTGRES_CONFIG.POOL_SIZE,
+        max_overflow=config.POSTGRES_CONFIG.POOL_MAX_OVERFLOW,
+        pool_timeout=config.POSTGRES_CONFIG.POOL_TIMEOUT,
+        pool_recycle=config.POSTGRES_CONFIG.POOL_RECYCLE,
+        pool_pre_ping=config.POSTGRES_CONFIG.POOL_PRE_PING,
+        statement_cache_size=config.POSTGRES_CONFIG.STATEMENT_CACHE_SIZE,
+        prepared_statement_cache_size=config.POSTGRES_CONFIG.PREPARED_STATEMENT_CACHE_SIZE,
+        command_timeout=config.POSTGRES_CONFIG.COMMAND_TIMEOUT,
+    )
+    db_engine = providers.Resource(init_db_engine, uri=config.POSTGRES_CONFIG.URI, options=db_engine_options)
+    db_session_factory = providers.Singleton(create_session_factory, engine=db_engine)
+    db_session = providers.Resource(init_db_session, session_factory=db_session_factory)
+    db_replicas = providers.Resource(
+        init_db_replicas,
+        uris=config.POSTGRES_CONFIG.REPLICA_URIS,
+        options=db_engine_options,
+    )
+    db_replica_router = providers.Singleton(
+        ReplicaRouter,
+        primary=db_engine,
+        replicas=db_replicas,
+        strategy=config.POSTGRES_CONFIG.REPLICA_BALANCING,
+        ejection_time=config.POSTGRES_CONFIG.REPLICA_EJECTION_TIME,
+    )
+    db_read_session_factory = providers.Singleton(create_read_session_factory, router=db_replica_router)
+    db_read_session = providers.Resource(init_db_session, session_factory=db_read_session_factory)
 
-    expo_option = providers.Singleton(
-        Expo,
-        factor=config.HTTP_SERVICE_CONFIG.BACKOFF_FACTOR,
+    redis = providers.Singleton(
+        Redis,
+        host=config.REDIS_CONFIG.HOST,
+        port=config.REDIS_CONFIG.PORT.as_int(),
+        db=config.REDIS_CONFIG.DB.as_int(),
+        password=config.REDIS_CONFIG.PASSWORD,
     )
-    async_client = providers.Factory(AsyncClient)
-    retry_client = providers.Factory(
+    redis_connections = providers.Resource(init_redis, redis=redis)
+    query_cache = providers.Singleton(
+        QueryCache,
+        redis=providers.Selector(
+            config.QUERY_CACHE_CONFIG.BACKEND,
+            memory=providers.Object(None),
+            redis=redis,
+        ),
+        maxsize=config.QUERY_CACHE_CONFIG.MAXSIZE,
+        tag_version_ttl=config.QUERY_CACHE_CONFIG.TAG_VERSION_TTL,
+        beta=config.QUERY_CACHE_CONFIG.EARLY_REFRESH_BETA,
+    )
+
+    backoff_option = providers.Selector(
+        config.HTTP_SERVICE_CONFIG.BACKOFF_STRATEGY,
+        expo=providers.Factory(
+            Expo,
+            factor=config.HTTP_SERVICE_CONFIG.BACKOFF_FACTOR,
+        ),
+        adaptive=providers.Factory(
+            Adaptive,
+            factor=config.HTTP_SERVICE_CONFIG.BACKOFF_FACTOR,
+            max_wait=config.HTTP_SERVICE_CONFIG.RETRY_AFTER_MAX_WAIT,
+        ),
+    )
+    rate_limiter = providers.Singleton(
+        HostRateLimiter,
+        max_wait=config.HTTP_SERVICE_CONFIG.RETRY_AFTER_MAX_WAIT,
+    )
+    retry_budget = providers.Singleton(
+        create_retry_budget,
+        ratio=config.HTTP_SERVICE_CONFIG.RETRY_BUDGET_RATIO,
+        max_tokens=config.HTTP_SERVICE_CONFIG.RETRY_BUDGET_MAX_TOKENS,
+    )
+    retry_hooks = providers.Singleton(
+        RetryMetricsHooks,
+        span_events=config.HTTP_SERVICE_CONFIG.RETRY_SPAN_EVENTS,
+    )
+    circuit_breakers = providers.Singleton(
+        CircuitBreakerRegistry,
+        failure_rate_threshold=config.HTTP_SERVICE_CONFIG.CIRCUIT_BREAKER_FAILURE_RATE,
+        minimum_calls=config.HTTP_SERVICE_CONFIG.CIRCUIT_BREAKER_MINIMUM_CALLS,
+        window=config.HTTP_SERVICE_CONFIG.CIRCUIT_BREAKER_WINDOW,
+        open_timeout=config.HTTP_SERVICE_CONFIG.CIRCUIT_BREAKER_OPEN_TIMEOUT,
+        half_open_calls=config.HTTP_SERVICE_CONFIG.CIRCUIT_BREAKER_HALF_OPEN_CALLS,
+    )
+    hedge_policy = providers.Singleton(
+        create_hedge_policy,
+        delay=config.HTTP_SERVICE_CONFIG.HEDGE_DELAY,
+        quantile=config.HTTP_SERVICE_CONFIG.HEDGE_QUANTILE,
+        ratio=config.HTTP_SERVICE_CONFIG.HEDGE_BUDGET_RATIO,
+        max_tokens=config.HTTP_SERVICE_CONFIG.HEDGE_BUDGET_MAX_TOKENS,
+    )
+    http_client_pool = providers.Singleton(
+        HTTPClientPool,
+        max_connections=config.HTTP_SERVICE_CONFIG.POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=config.HTTP_SERVICE_CONFIG.POOL_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=config.HTTP_SERVICE_CONFIG.POOL_KEEPALIVE_EXPIRY,
+        http2=config.HTTP_SERVICE_CONFIG.HTTP2,
+    )
+    http_clients = providers.Resource(init_http_client_pool, pool=http_client_pool)
+    async_client = providers.Factory(HTTPClientPool.get, http_client_pool, base_url="")
+    predicate_client = providers.Factory(
         PredicateClient,
         predicate=lambda x: x.status_code in config.HTTP_SERVICE_CONFIG.STATUSES_FOR_RETRY,
         client=async_client,
-        backoff_option=expo_option,
+        backoff_option=backoff_option.provider,
         attempts=config.HTTP_SERVICE_CONFIG.ATTEMPTS,
         timeout=config.HTTP_SERVICE_CONFIG.REQUESTS_TIMEOUT,
+        retry_budget=retry_budget,
+        rate_limiter=rate_limiter,
+        hooks=retry_hooks,
+    )
+    hedging_client = providers.Factory(
+        HedgingClient,
+        client=predicate_client,
+        policy=hedge_policy,
+        enabled=config.HTTP_SERVICE_CONFIG.HEDGE_ENABLED,
+    )
+    retry_client = providers.Factory(
+        CircuitBreakerClient,
+        client=hedging_client,
+        registry=circuit_breakers,
+        error_factory=providers.Object(CircuitBreakerOpenError),
+    )
+    single_flight: providers.Singleton[SingleFlight] = providers.Singleton(SingleFlight)
+    response_cache_backend = providers.Selector(
+        config.HTTP_SERVICE_CONFIG.RESPONSE_CACHE_BACKEND,
+        memory=providers.Singleton(
+            InMemoryResponseCacheBackend,
+            maxsize=config.HTTP_SERVICE_CONFIG.RESPONSE_CACHE_MAXSIZE,
+        ),
+        redis=providers.Singleton(RedisResponseCacheBackend, redis=redis),
+    )
+    response_cache = providers.Singleton(
+        create_response_cache,
+        backend=response_cache_backend,
+        revalidation_ttl=config.HTTP_SERVICE_CONFIG.RESPONSE_CACHE_REVALIDATION_TTL,
     )
 
-    http_service: AsyncClient = providers.Factory(SimpleJsonHTTPService)
+    http_service = providers.Factory(SimpleJsonHTTPService)
@@ -6,4 +6,4 @@ from infrastructure.ioc.gateways import Gateways
 class QueriesContainer(containers.DeclarativeContainer):
     gateways: Gateways = providers.DependenciesContainer()
 
-    check_db_query_handler = providers.Factory(CheckDbQueryHandler, session=gateways.db_session)
+    check_db_query_handler = providers.Factory(CheckDbQueryHandler, session=gateways.db_read_session)
@@ -0,0 +1,215 @@
+import asyncio
+from abc import ABC, abstractmethod
+from contextlib import suppress
+from time import monotonic
+from typing import Awaitable, Callable, Optional
+
+import structlog
+from common.errors import KeyProviderUnavailableError
+from httpx import AsyncClient
+from infrastructure.config import KeycloakConfig
+from jose import JWTError, jwk
+from jose.backends.base import Key
+from jose.exceptions import JWKError
+from opentelemetry import trace
+
+logger = structlog.get_logger(__name__)
+tracer = trace.get_tracer(__name__)
+
+JWKSLoader = Callable[[], Awaitable[dict]]
+
+
+class BaseKeyProvider(ABC):
+    """
+    Поставщик ключей для проверки подписи JWT
+    """
+
+    @abstractmethod
+    async def get_key(self, kid: Optional[str], algorithm: Optional[str] = None) -> Key | str:
+        """
+        Получение ключа по kid и alg из заголовка токена
+
+        :param kid: Идентификатор ключа
+        :param algorithm: Алгоритм подписи токена
+        :return: Ключ для jwt.decode
+        :raise: JWTError - ключ не найден, KeyProviderUnavailableError - ключи не удалось загрузить
+        """
+        ...
+
+    async def aclose(self) -> None:
+        ...
+
+
+class StaticKeyProvider(BaseKeyProvider):
+    """
+    Один статический ключ из конфига. Ключ разбирается один раз при создании для каждого из алгоритмов
+    """
+
+    __slots__ = ("_public_key", "_keys")
+
+    def __init__(self, public_key: str, algorithms: Optional[list[str]] = None):
+        self._public_key = public_key
+        self._keys: dict[str, Key] = {}
+        for algorithm in algorithms or ():
+            try:
+                self._keys[algorithm] = jwk.construct(public_key, algorithm)
+            except JWKError:
+                # например, HMAC секрет для RS-алгоритма: ключ разбирается в jwt.decode
+                continue
+
+    async def get_key(self, kid: Optional[str], algorithm: Optional[str] = None) -> Key | str:
+        key = self._keys.get(algorithm) if algorithm is not None else None
+        return key if key is not None else self._public_key
+
+
+class JWKSKeyProvider(BaseKeyProvider):
+    """
+    Набор ключей realm'а из JWKS, проиндексированный по kid.
+
+    Ключи обновляются в фоне раз в refresh_interval и по запросу при неизвестном kid, но не чаще
+    min_refresh_interval. Одновременные обновления схлопываются в одну загрузку JWKS.
+    """
+
+    __slots__ = (
+        "_loader",
+        "_refresh_interval",
+        "_min_refresh_interval",
+        "_clock",
+        "_keys",
+        "_loaded_at",
+        "_refresh_future",
+        "_background_task",
+    )
+
+    def __init__(
+        self,
+        loader: JWKSLoader,
+        *,
+        refresh_interval: float = 10 * 60,
+        min_refresh_interval: float = 30,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """
+        :param loader: Корутина, возвращающая JWKS документ
+        :param refresh_interval: Интервал фонового обновления ключей
+        :param min_refresh_interval: Минимальный интервал между обновлениями по неизвестному kid
+        :param clock: Источник времени
+        """
+        self._loader = loader
+        self._refresh_interval = refresh_interval
+        self._min_refresh_interval = min_refresh_interval
+        self._clock = clock
+        self._keys: dict[str, Key] = {}
+        self._loaded_at: Optional[float] = None
+        self._refresh_future: Optional[asyncio.Future] = None
+        self._background_task: Optional[asyncio.Task] = None
+
+    @property
+    def kids(self) -> frozenset[str]:
+        return frozenset(self._keys)
+
+    async def get_key(self, kid: Optional[str], algorithm: Optional[str] = None) -> Key:
+        with tracer.start_as_current_span("JWKSKeyProvider.get_key"):
+            self._ensure_background_refresh()
+
+            if self._loaded_at is None:
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    # устаревшего набора ключей нет, проверить токен нечем
+                    logger.warning("Failed to load JWKS", error=str(e))
+                    raise KeyProviderUnavailableError("jwks") from e
+
+            key = self._find_key(kid)
+            if key is None and self._can_refresh():
+                try:
+                    await self.refresh()
+                except Exception as e:
+                    logger.warning("Failed to refresh JWKS on unknown kid", kid=kid, error=str(e))
+                key = self._find_key(kid)
+
+            if key is None:
+                raise JWTError(f"Unknown signing key: {kid}")
+
+            return key
+
+    async def refresh(self) -> None:
+        """
+        Загрузка JWKS. Если загрузка уже идет, ожидается ее результат
+        """
+        if self._refresh_future is None or self._refresh_future.done():
+            self._refresh_future = asyncio.ensure_future(self._load())
+        await asyncio.shield(self._refresh_future)
+
+    async def aclose(self) -> None:
+        if self._background_task is not None:
+            task, self._background_task = self._background_task, None
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+
+    def _can_refresh(self) -> bool:
+        return self._loaded_at is None or self._clock() - self._loaded_at >= self._min_refresh_interval
+
+    def _find_key(self, kid: Optional[str]) -> Optional[Key]:
+        if kid is None and len(self._keys) == 1:
+            return next(iter(self._keys.values()))
+        return self._keys.get(kid) if kid is not None else None
+
+    async def _load(self) -> None:
+        with tracer.start_as_current_span("JWKSKeyProvider._load"):
+            jwks = await self._loader()
+
+            keys = {}
+            for key_data in jwks.get("keys", []):
+                if key_data.get("use", "sig") != "sig" or "kid" not in key_data:
+                    continue
+                try:
+                    keys[key_data["kid"]] = jwk.construct(key_data)
+                except JWKError as e:
+                    logger.warning("Skipped unsupported JWK", kid=key_data["kid"], error=str(e))
+
+            self._keys = keys
+            self._loaded_at = self._clock()
+            logger.info("JWKS loaded", kids=list(keys))
+
+    def _ensure_background_refresh(self) -> None:
+        if self._background_task is None or self._background_task.done():
+            self._background_task = asyncio.create_task(self._refresh_periodically())
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self._refresh_interval)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("Failed to refresh JWKS, keeping previous keys", error=str(e))
+
+
+def http_jwks_loader(url: str, timeout: float = 5) -> JWKSLoader:
+    """
+    Загрузчик JWKS по http
+
+    :param url: Адрес JWKS (.../protocol/openid-connect/certs)
+    :param timeout: Таймаут запроса
+    :return: JWKSLoader
+    """
+
+    async def load() -> dict:
+        async with AsyncClient(timeout=timeout) as client:
+            response = await client.get(url)
+            response.raise_for_status()
+            return response.json()
+
+    return load
+
+
+def create_key_provider(keycloak_config: KeycloakConfig) -> BaseKeyProvider:
+    if keycloak_config.PUBLIC_KEY:
+        return StaticKeyProvider(keycloak_config.PUBLIC_KEY, keycloak_config.ALGORITHMS)
+
+    return JWKSKeyProvider(
+        http_jwks_loader(str(keycloak_config.JWKS_URL)),
+        refresh_interval=keycloak_config.JWKS_REFRESH_INTERVAL,
+        min_refresh_interval=keycloak_config.JWKS_MIN_REFRESH_INTERVAL,
+    )
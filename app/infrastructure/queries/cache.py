@@ -0,0 +1,256 @@
+import hashlib
+import math
+import random
+from time import time
+from typing import Any, Awaitable, Callable, Iterable, Optional, Sequence, Union, get_type_hints
+
+import orjson
+import structlog
+from common.dto import BaseQuery
+from common.interfaces.query import IQueryHandler, TQuery, TResult
+from pydantic import BaseModel
+from utils.cache import TTLCache
+from utils.models import construct
+from utils.single_flight import SingleFlight
+
+logger = structlog.get_logger(__name__)
+
+# Теги, либо функция запроса или команды, возвращающая теги
+Tags = Union[Sequence[str], Callable[[Any], Sequence[str]]]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.dict()
+    return str(value)
+
+
+class _Entry:
+    __slots__ = ("result", "versions", "expires_at", "delta")
+
+    def __init__(self, result: Any, versions: dict[str, int], expires_at: float, delta: float):
+        """
+        :param result: Результат запроса
+        :param versions: Версии тегов на момент вычисления результата
+        :param expires_at: Время истечения записи
+        :param delta: Время вычисления результата, секунды
+        """
+        self.result = result
+        self.versions = versions
+        self.expires_at = expires_at
+        self.delta = delta
+
+
+class QueryCache:
+    """
+    Двухуровневый кэш результатов запросов: LRU в памяти процесса и Redis, общий для экземпляров сервиса.
+
+    Инвалидация по тегам через версии: команда увеличивает версию тега, и записи,
+    вычисленные при старой версии, считаются промахом. С Redis версии тегов общие для процессов
+    и кэшируются в памяти на tag_version_ttl, поэтому чужая инвалидация видна с этой задержкой.
+
+    От лавины запросов при истечении записи защищают схлопывание одновременных промахов (SingleFlight)
+    и вероятностное раннее обновление (XFetch): чем ближе истечение и дольше вычисление,
+    тем вероятнее, что один из запросов обновит запись заранее
+    """
+
+    __slots__ = (
+        "_redis",
+        "_local",
+        "_versions",
+        "_tag_version_ttl",
+        "_beta",
+        "_prefix",
+        "_single_flight",
+        "_clock",
+        "hits",
+        "misses",
+    )
+
+    def __init__(
+        self,
+        redis: Any = None,
+        *,
+        maxsize: int = 1024,
+        tag_version_ttl: float = 1.0,
+        beta: float = 1.0,
+        prefix: str = "query-cache:",
+        clock: Callable[[], float] = time,
+    ):
+        """
+        :param redis: Клиент redis.asyncio.Redis. None - только память процесса
+        :param maxsize: Количество записей в памяти процесса
+        :param tag_version_ttl: Время кэширования версий тегов из Redis, секунды
+        :param beta: Агрессивность раннего обновления. 0 - обновление только после истечения
+        :param prefix: Префикс ключей Redis
+        :param clock: Источник времени. Записи в Redis общие для процессов, поэтому время не монотонное
+        """
+        self._redis = redis
+        self._local: TTLCache[str, _Entry] = TTLCache(maxsize=maxsize, clock=clock)
+        self._versions: dict[str, tuple[int, float]] = {}
+        self._tag_version_ttl = tag_version_ttl
+        self._beta = beta
+        self._prefix = prefix
+        self._single_flight: SingleFlight[tuple, Any] = SingleFlight()
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(namespace: str, query: Optional[BaseQuery]) -> str:
+        """
+        Ключ записи: имя обработчика и хэш сериализованного запроса
+        """
+        payload = orjson.dumps(query.dict() if query is not None else None, default=str, option=orjson.OPT_SORT_KEYS)
+        return f"{namespace}:{hashlib.sha1(payload).hexdigest()}"
+
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        *,
+        ttl: float,
+        tags: Sequence[str] = (),
+        decode: Callable[[Any], Any],
+    ) -> Any:
+        """
+        Результат из кэша, либо вычисленный и сохраненный
+
+        :param key: Ключ записи
+        :param compute: Вычисление результата
+        :param ttl: Время жизни записи, секунды
+        :param tags: Теги записи для инвалидации
+        :param decode: Сборка результата из JSON, сохраненного в Redis
+        :return: Результат. Объект из памяти процесса общий для вызовов и не должен изменяться
+        """
+        versions = await self._current_versions(tags)
+        entry = await self._get(key, decode)
+        if entry is not None and entry.versions == versions and not self._should_refresh(entry):
+            self.hits += 1
+            return entry.result
+
+        self.misses += 1
+        # вызов после инвалидации не присоединяется к вычислению, начатому при старых версиях тегов
+        flight_key = (key, tuple(sorted(versions.items())))
+        return await self._single_flight.do(flight_key, lambda: self._compute(key, compute, ttl, versions))
+
+    async def invalidate(self, tags: Iterable[str]) -> None:
+        """
+        Инвалидация записей с тегами
+
+        :param tags: Теги
+        """
+        for tag in set(tags):
+            version = self._versions.get(tag, (0, 0.0))[0] + 1
+            if self._redis is not None:
+                try:
+                    version = await self._redis.incr(self._tag_key(tag))
+                except Exception as e:
+                    logger.warning("Failed to invalidate query cache tag", tag=tag, error=str(e))
+            self._versions[tag] = (version, self._clock())
+
+    def _should_refresh(self, entry: _Entry) -> bool:
+        # XFetch: now - delta * beta * ln(rand) >= expires_at, ln(rand) < 0
+        return self._clock() - entry.delta * self._beta * math.log(1.0 - random.random()) >= entry.expires_at
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[Any]], ttl: float, versions: dict) -> Any:
+        started = self._clock()
+        result = await compute()
+        now = self._clock()
+        entry = _Entry(result, versions, now + ttl, now - started)
+        self._local.set(key, entry, expires_at=entry.expires_at)
+        if self._redis is not None:
+            payload = orjson.dumps(
+                {"result": result, "versions": versions, "expiresAt": entry.expires_at, "delta": entry.delta},
+                default=_default,
+            )
+            try:
+                await self._redis.set(self._prefix + key, payload, px=max(1, int(ttl * 1000)))
+            except Exception as e:
+                logger.warning("Failed to write query cache", error=str(e))
+        return result
+
+    async def _get(self, key: str, decode: Callable[[Any], Any]) -> Optional[_Entry]:
+        entry = self._local.get(key)
+        if entry is not None or self._redis is None:
+            return entry
+
+        try:
+            data = await self._redis.get(self._prefix + key)
+        except Exception as e:
+            logger.warning("Failed to read query cache", error=str(e))
+            return None
+        if data is None:
+            return None
+
+        fields = orjson.loads(data)
+        entry = _Entry(decode(fields["result"]), fields["versions"], fields["expiresAt"], fields["delta"])
+        self._local.set(key, entry, expires_at=entry.expires_at)
+        return entry
+
+    async def _current_versions(self, tags: Sequence[str]) -> dict[str, int]:
+        if not tags:
+            return {}
+        if self._redis is None:
+            # без Redis версии тегов только локальные и всегда актуальны
+            return {tag: self._versions.get(tag, (0, 0.0))[0] for tag in tags}
+
+        now = self._clock()
+        stale = [tag for tag in tags if now - self._versions.get(tag, (0, -math.inf))[1] >= self._tag_version_ttl]
+        if stale:
+            try:
+                values = await self._redis.mget([self._tag_key(tag) for tag in stale])
+            except Exception as e:
+                logger.warning("Failed to read query cache tags", error=str(e))
+            else:
+                for tag, value in zip(stale, values):
+                    self._versions[tag] = (int(value or 0), now)
+        return {tag: self._versions.get(tag, (0, now))[0] for tag in tags}
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self._prefix}tag:{tag}"
+
+
+class CachedQueryHandler(IQueryHandler[TQuery, TResult]):
+    """
+    Обработчик запроса с кэшированием результата в QueryCache
+    """
+
+    __slots__ = ("_handler", "_cache", "_ttl", "_tags", "_namespace", "_result_type")
+
+    def __init__(
+        self,
+        handler: IQueryHandler[TQuery, TResult],
+        cache: QueryCache,
+        *,
+        ttl: float = 60,
+        tags: Tags = (),
+        result_type: Any = None,
+    ):
+        """
+        :param handler: Обработчик
+        :param cache: Кэш
+        :param ttl: Время жизни результата, секунды
+        :param tags: Теги результата, либо функция запроса, возвращающая теги, например lambda q: [f"user:{q.user_id}"]
+        :param result_type: Тип результата для разбора из Redis. По умолчанию из аннотации handler.ask
+        """
+        self._handler = handler
+        self._cache = cache
+        self._ttl = ttl
+        self._tags = tags
+        self._namespace = f"{type(handler).__module__}.{type(handler).__qualname__}"
+        self._result_type = result_type or get_type_hints(type(handler).ask).get("return")
+
+    async def ask(self, query: TQuery) -> TResult:
+        tags = self._tags(query) if callable(self._tags) else self._tags
+        return await self._cache.get_or_compute(
+            self._cache.key(self._namespace, query),
+            lambda: self._handler.ask(query),
+            ttl=self._ttl,
+            tags=tags,
+            decode=self._decode,
+        )
+
+    def _decode(self, data: Any) -> TResult:
+        # результат записан этим же сервисом, поэтому собирается без повторной валидации
+        return construct(self._result_type, data)
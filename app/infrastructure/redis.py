@@ -0,0 +1,10 @@
+from typing import AsyncGenerator
+
+from redis.asyncio import Redis
+
+
+async def init_redis(redis: Redis) -> AsyncGenerator[Redis, None]:
+    try:
+        yield redis
+    finally:
+        await redis.aclose()
@@ -1,10 +1,48 @@
-from typing import Any, Optional, TypeVar
+import copy
+from typing import Any, Generator, Optional, TypeVar
 
-from httpx_backoff._typing import _BackoffGenerator, _Jitterer
+from httpx import URL, USE_CLIENT_DEFAULT, AsyncClient, Response
+from httpx_backoff._typing import _BackoffFactory, _BackoffGenerator, _Jitterer
 
 T = TypeVar("T")
 
 
+def _init_wait(backoff_option: _BackoffGenerator | _BackoffFactory) -> _BackoffGenerator:
+    """
+    Create a fresh backoff generator for a single request.
+
+    A factory (e.g. a backoff option class or partial) is called, a generator instance is used
+    as a prototype and copied, so retries of one request never advance the state of another.
+    """
+    if isinstance(backoff_option, Generator):
+        return copy.copy(backoff_option)
+    return backoff_option()
+
+
+def _host_key(client: AsyncClient, url: str) -> str:
+    return URL(url).host or client.base_url.host
+
+
+async def _send(
+    client: AsyncClient,
+    *,
+    stream: bool = False,
+    auth: Any = USE_CLIENT_DEFAULT,
+    follow_redirects: Any = USE_CLIENT_DEFAULT,
+    **kwargs: Any,
+) -> Response:
+    """
+    Send a request like `AsyncClient.request`. A streamed response is returned before its body is read
+    and must be closed by the caller.
+    """
+    request = client.build_request(**kwargs)
+    return await client.send(request, stream=stream, auth=auth, follow_redirects=follow_redirects)
+
+
+async def _close(response: Response) -> None:
+    await response.aclose()
+
+
 def _next_wait(
     wait: _BackoffGenerator,
     send_value: Any,
@@ -14,7 +52,8 @@ def _next_wait(
 ) -> float:
     value = wait.send(send_value)
 
-    if jitter is not None:
+    # options honouring server-driven waits jitter only their own fallback values
+    if jitter is not None and not getattr(wait, "jittered", False):
         seconds = jitter(value)
     else:
         seconds = value
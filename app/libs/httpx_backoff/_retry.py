@@ -0,0 +1,163 @@
+import asyncio
+from time import monotonic
+from typing import Awaitable, Callable, Hashable, Optional, Sequence, TypeVar
+
+from httpx import Response
+from httpx_backoff._common import _init_wait, _next_wait
+from httpx_backoff._typing import _BackoffFactory, _BackoffGenerator, _ExceptionGroup, _Jitterer
+from httpx_backoff.hooks import RetryHooks, RetryOutcome
+from httpx_backoff.rate_limit import HostRateLimiter
+from httpx_backoff.retry_budget import RetryBudget
+
+T = TypeVar("T")
+
+
+class RetryEngine:
+    """
+    Retry loop shared by backoff clients.
+
+    Every call gets its own backoff state, elapsed time is measured with a monotonic clock.
+    """
+
+    __slots__ = (
+        "_backoff_option",
+        "_attempts",
+        "_timeout",
+        "_jitter",
+        "_retry_budget",
+        "_rate_limiter",
+        "_hooks",
+        "_clock",
+        "_sleep",
+    )
+
+    def __init__(
+        self,
+        *,
+        backoff_option: _BackoffGenerator | _BackoffFactory,
+        attempts: int = 5,
+        timeout: Optional[float] = None,
+        jitter: Optional[_Jitterer] = None,
+        retry_budget: Optional[RetryBudget] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        hooks: Optional[RetryHooks] = None,
+        clock: Callable[[], float] = monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        """
+        :param backoff_option: A backoff option factory (e.g. `Expo` or `functools.partial(Expo, factor=0.1)`)
+            or a backoff option instance which is copied for every call.
+        :param attempts: The maximum number of attempts to make before giving up.
+        :param timeout: The maximum total amount of time to try for before giving up.
+        :param jitter: A function of the value yielded by backoff_option returning the actual time to wait.
+        :param retry_budget: A retry budget which suppresses retries when retried traffic exceeds its share.
+        :param rate_limiter: A per-host rate limiter which delays every attempt while the host asked to wait
+            and learns from the headers of every response.
+        :param hooks: Instrumentation of attempts, waits and outcomes, e.g. metrics or logging.
+        :param clock: Monotonic time source.
+        :param sleep: Coroutine function used to wait between attempts.
+        """
+        self._backoff_option = backoff_option
+        self._attempts = attempts
+        self._timeout = timeout
+        self._jitter = jitter
+        self._retry_budget = retry_budget
+        self._rate_limiter = rate_limiter
+        self._hooks = hooks
+        self._clock = clock
+        self._sleep = sleep
+
+    @property
+    def retry_budget(self) -> Optional[RetryBudget]:
+        return self._retry_budget
+
+    async def run(
+        self,
+        attempt: Callable[[], Awaitable[T]],
+        *,
+        retry_on_result: Optional[Callable[[T], bool]] = None,
+        retry_on_exception: _ExceptionGroup = (),
+        budget_key: Hashable = None,
+        discard: Optional[Callable[[T], Awaitable[None]]] = None,
+        max_attempts: Optional[int] = None,
+    ) -> T:
+        """
+        Call `attempt` until it succeeds or the retry limits are exceeded.
+
+        :param attempt: Coroutine function making a single attempt.
+        :param retry_on_result: A predicate on the result which triggers a retry when truthful.
+            The last result is returned when retries are exhausted.
+        :param retry_on_exception: An exception type (or sequence of types) which triggers a retry.
+            The last exception is raised when retries are exhausted.
+        :param budget_key: Retry budget and rate limiter bucket, e.g. the request host.
+        :param discard: Coroutine function releasing a result which is going to be retried,
+            e.g. closing a streamed response.
+        :param max_attempts: Overrides the maximum number of attempts for this call, e.g. 1 for a single attempt
+            which still goes through the rate limiter, the retry budget and the hooks.
+        :return: The result of the last attempt.
+        """
+        exceptions = tuple(retry_on_exception) if isinstance(retry_on_exception, Sequence) else retry_on_exception
+        hooks = self._hooks
+        max_attempts = self._attempts if max_attempts is None else max_attempts
+        wait: Optional[_BackoffGenerator] = None
+        attempts = 0
+        waited = 0.0
+        start = self._clock()
+
+        while True:
+            attempts += 1
+
+            if self._rate_limiter is not None:
+                await self._rate_limiter.acquire(budget_key)
+
+            error: Optional[BaseException] = None
+            try:
+                result = await attempt()
+            except exceptions as e:  # type: ignore
+                error, outcome = e, e
+            else:
+                if self._rate_limiter is not None and isinstance(result, Response):
+                    self._rate_limiter.update(budget_key, result)
+                if retry_on_result is None or not retry_on_result(result):
+                    if self._retry_budget is not None:
+                        self._retry_budget.on_success(budget_key)
+                    if hooks is not None:
+                        hooks.on_finish(budget_key, attempts, waited, self._clock() - start, RetryOutcome.SUCCESS)
+                    return result
+                outcome = result
+
+            elapsed_time = self._clock() - start
+
+            if attempts == max_attempts:
+                stop: Optional[RetryOutcome] = RetryOutcome.ATTEMPTS_EXHAUSTED
+            elif self._timeout is not None and elapsed_time >= self._timeout:
+                stop = RetryOutcome.TIMEOUT
+            elif self._retry_budget is not None and not self._retry_budget.try_acquire(budget_key):
+                stop = RetryOutcome.BUDGET_EXHAUSTED
+            else:
+                stop = None
+                if wait is None:
+                    # the backoff state is created on the first retry, most calls succeed without it
+                    wait = _init_wait(self._backoff_option)
+                try:
+                    seconds = _next_wait(wait, outcome, elapsed_time, self._jitter, self._timeout)
+                except StopIteration:
+                    stop = RetryOutcome.STOPPED
+
+            if stop is not None:
+                if hooks is not None:
+                    hooks.on_finish(budget_key, attempts, waited, elapsed_time, stop, error)
+                return self._give_up(outcome, error)
+
+            if hooks is not None:
+                hooks.on_retry(budget_key, attempts, seconds, outcome)
+            if error is None and discard is not None:
+                await discard(outcome)
+            await self._sleep(seconds)
+            waited += seconds
+
+    @staticmethod
+    def _give_up(outcome: T, error: Optional[BaseException]) -> T:
+        if error is not None:
+            raise error
+        return outcome
@@ -4,4 +4,5 @@ T = TypeVar("T")
 
 _ExceptionGroup = Union[BaseException, Sequence[BaseException | Type[BaseException]]]
 _BackoffGenerator = Generator[int, None, None]
+_BackoffFactory = Callable[[], _BackoffGenerator]
 _Jitterer = Callable[[float], float]
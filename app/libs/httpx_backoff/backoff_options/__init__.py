@@ -1,9 +1,11 @@
+from httpx_backoff.backoff_options.adaptive import Adaptive
 from httpx_backoff.backoff_options.constant import Constant
 from httpx_backoff.backoff_options.expo import Expo
 from httpx_backoff.backoff_options.fibo import Fibo
 from httpx_backoff.backoff_options.runtime import Runtime
 
 __all__ = [
+    "Adaptive",
     "Constant",
     "Expo",
     "Fibo",
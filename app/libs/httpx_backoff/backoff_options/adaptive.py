@@ -0,0 +1,64 @@
+from time import time
+from typing import Any, Callable, Generator, Optional
+
+from httpx import Response
+from httpx_backoff.backoff_options.jitter import use_full_jitter
+from httpx_backoff.rate_limit import retry_after
+
+
+class Adaptive(Generator):
+    """
+    Generator for server-driven waits.
+
+    The wait is taken from `Retry-After` (seconds or HTTP-date) of the retried 429/503 response,
+    or from `X-RateLimit-Reset` when `X-RateLimit-Remaining` is zero. Otherwise it falls back
+    to exponential decay with full jitter. The server's wait must not be shortened, so the jitter
+    is applied here and the client's `jitter` is skipped.
+    """
+
+    __slots__ = ("_base", "_factor", "_max_value", "_max_wait", "_clock", "_attempt")
+
+    # tells the retry engine not to jitter the yielded values again
+    jittered = True
+
+    def __init__(
+        self,
+        *,
+        max_value: Optional[float] = None,
+        base: int = 2,
+        factor: float = 1,
+        max_wait: Optional[float] = None,
+        clock: Callable[[], float] = time,
+    ):
+        """
+        :param max_value: The maximum value of the exponential fallback before jitter.
+        :param base: The mathematical base of the exponentiation operation.
+        :param factor: Factor to multiply the exponentiation by.
+        :param max_wait: The maximum wait the server may ask for. A longer one stops retrying,
+            since the result wouldn't be needed by then.
+        :param clock: Unix time source, HTTP-dates and reset timestamps are relative to it.
+        """
+        self._base = base
+        self._factor = factor
+        self._max_value = max_value
+        self._max_wait = max_wait
+        self._clock = clock
+        self._attempt = 0
+
+    def send(self, value: Optional[Any]) -> float:
+        if isinstance(value, Response):
+            seconds = retry_after(value, self._clock())
+            if seconds is not None:
+                if self._max_wait is not None and seconds > self._max_wait:
+                    raise StopIteration
+                return seconds
+
+        fallback = self._factor * self._base**self._attempt
+        if self._max_value is None or fallback < self._max_value:
+            self._attempt += 1
+        else:
+            fallback = self._max_value
+        return use_full_jitter(fallback)
+
+    def throw(self, typ: Any, val: Any = None, tb: Any = None) -> Any:
+        super().throw(typ, val, tb)
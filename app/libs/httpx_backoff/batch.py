@@ -0,0 +1,280 @@
+import asyncio
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+    TypeVar,
+    cast,
+)
+
+from httpx import URL, Response
+from httpx_backoff.clients.base import CustomClient
+
+T = TypeVar("T")
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class RequestSpec:
+    """
+    A single request of a batch.
+    """
+
+    __slots__ = ("url", "method", "json", "headers", "data", "params", "kwargs")
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ):
+        """
+        **Parameters**: See `httpx.request`.
+        """
+        self.url = url
+        self.method = method
+        self.json = json
+        self.headers = headers
+        self.data = data
+        self.params = params
+        self.kwargs = kwargs
+
+    def as_kwargs(self) -> dict[str, Any]:
+        return {
+            "url": self.url,
+            "method": self.method,
+            "json": self.json,
+            "headers": self.headers,
+            "data": self.data,
+            "params": self.params,
+            **self.kwargs,
+        }
+
+
+class BatchResult(Generic[T]):
+    """
+    Outcome of a single request of a batch: either a result or the raised exception.
+    """
+
+    __slots__ = ("index", "spec", "result", "error")
+
+    def __init__(self, index: int, spec: RequestSpec, result: Optional[T] = None, error: Optional[Exception] = None):
+        self.index = index
+        self.spec = spec
+        self.result = result
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def unwrap(self) -> T:
+        if self.error is not None:
+            raise self.error
+        return cast(T, self.result)
+
+
+class BatchExecutor(Generic[T]):
+    """
+    Runs many requests with bounded concurrency and streams their results back.
+
+    At most `concurrency` requests are in flight, and at most `per_host` of them to a single host.
+    Requests are pulled from the iterable lazily, so a long or endless iterable is never materialized.
+    Each request is retried by the underlying client, a failed request doesn't stop the batch:
+    its exception is captured in the `BatchResult`. At most `concurrency` finished results are buffered
+    for a slow consumer, further requests wait until the consumer catches up.
+    """
+
+    __slots__ = ("_send", "_concurrency", "_per_host", "_base_host")
+
+    def __init__(
+        self,
+        send: Callable[[RequestSpec], Awaitable[T]],
+        *,
+        concurrency: int = 10,
+        per_host: Optional[int] = None,
+        base_url: URL | str = "",
+    ):
+        """
+        :param send: Coroutine function sending a single request.
+        :param concurrency: The maximum number of requests in flight.
+        :param per_host: The maximum number of requests in flight to a single host. None means no limit.
+        :param base_url: Base URL relative request URLs are resolved against to find their host.
+        """
+        self._send = send
+        self._concurrency = concurrency
+        self._per_host = per_host
+        self._base_host = URL(str(base_url)).host
+
+    @staticmethod
+    def for_client(client: CustomClient, **options: Any) -> "BatchExecutor[Optional[Response]]":
+        """
+        Executor sending requests with a backoff client.
+
+        :param client: A backoff client, it retries every request on its own.
+        :param options: See `BatchExecutor`.
+        """
+        options.setdefault("base_url", client.client.base_url)
+        return BatchExecutor(lambda spec: client.request(**spec.as_kwargs()), **options)
+
+    async def run(self, specs: Iterable[RequestSpec], *, ordered: bool = False) -> AsyncIterator[BatchResult[T]]:
+        """
+        Run requests and yield their results.
+
+        :param specs: Requests to send.
+        :param ordered: Yield results in input order instead of completion order.
+            A slow request then holds back results of the requests after it, and no more than
+            `concurrency` requests are started past it.
+        :return: Async iterator of results. Close it (e.g. with `contextlib.aclosing`) to cancel
+            the remaining requests when leaving the loop early.
+        """
+        concurrency = max(1, self._concurrency)
+        pending = enumerate(specs)
+        # a full queue blocks the workers, so a slow consumer holds back new requests
+        results: asyncio.Queue[Optional[BatchResult[T]]] = asyncio.Queue(maxsize=concurrency)
+        hosts: dict[Optional[str], asyncio.Semaphore] = {}
+        # in ordered mode a request takes a slot until its result is yielded, which bounds the reorder buffer
+        window = asyncio.Semaphore(concurrency) if ordered else None
+        failure: Optional[Exception] = None
+
+        async def worker() -> None:
+            nonlocal failure
+            try:
+                # every worker pulls the next request when it's free, which bounds the concurrency
+                while True:
+                    if window is not None:
+                        await window.acquire()
+                    item = next(pending, None)
+                    if item is None:
+                        break
+                    await results.put(await self._run_one(*item, hosts))
+            except Exception as e:
+                # the requests iterable failed, the batch is stopped with its exception
+                failure = e
+            await results.put(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        try:
+            running, waiting, next_index = len(workers), {}, 0
+            while running:
+                result = await results.get()
+                if result is None:
+                    running -= 1
+                    continue
+                if window is None:
+                    yield result
+                    continue
+
+                waiting[result.index] = result
+                while next_index in waiting:
+                    yield waiting.pop(next_index)
+                    next_index += 1
+                    window.release()
+            if failure is not None:
+                raise failure
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _run_one(self, index: int, spec: RequestSpec, hosts: dict) -> BatchResult[T]:
+        if self._per_host is None:
+            return await self._capture(index, spec)
+
+        host = URL(spec.url).host or self._base_host
+        semaphore = hosts.get(host)
+        if semaphore is None:
+            semaphore = hosts[host] = asyncio.Semaphore(self._per_host)
+        async with semaphore:
+            return await self._capture(index, spec)
+
+    async def _capture(self, index: int, spec: RequestSpec) -> BatchResult[T]:
+        try:
+            return BatchResult(index, spec, result=await self._send(spec))
+        except Exception as e:
+            return BatchResult(index, spec, error=e)
+
+
+class BatchLoader(Generic[K, V]):
+    """
+    DataLoader-style collector merging individual loads into calls of a batch endpoint.
+
+    Keys requested during the same event loop iteration (or within `delay` seconds) are deduplicated
+    and sent with one `load_batch` call of at most `max_batch_size` keys.
+    """
+
+    __slots__ = ("_load_batch", "_max_batch_size", "_delay", "_queue", "_dispatch", "_calls")
+
+    def __init__(
+        self,
+        load_batch: Callable[[Sequence[K]], Awaitable[Mapping[K, V]]],
+        *,
+        max_batch_size: int = 100,
+        delay: float = 0,
+    ):
+        """
+        :param load_batch: Coroutine function loading values of many keys with one downstream call.
+            Keys missing from its result raise `KeyError` in their loads.
+        :param max_batch_size: The maximum number of keys of one downstream call.
+        :param delay: Seconds to wait for more keys before the call.
+        """
+        self._load_batch = load_batch
+        self._max_batch_size = max_batch_size
+        self._delay = delay
+        self._queue: dict[K, asyncio.Future] = {}
+        self._dispatch: Optional[asyncio.Task] = None
+        self._calls: set[asyncio.Task] = set()
+
+    async def load(self, key: K) -> V:
+        future = self._queue.get(key)
+        if future is None:
+            future = self._queue[key] = asyncio.get_running_loop().create_future()
+            if len(self._queue) >= self._max_batch_size:
+                self._flush()
+            elif self._dispatch is None:
+                self._dispatch = asyncio.ensure_future(self._dispatch_later())
+        return await asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[K]) -> list[V]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    async def _dispatch_later(self) -> None:
+        await asyncio.sleep(self._delay)
+        self._dispatch = None
+        self._flush()
+
+    def _flush(self) -> None:
+        batch, self._queue = self._queue, {}
+        if batch:
+            call = asyncio.ensure_future(self._call(batch))
+            self._calls.add(call)
+            call.add_done_callback(self._calls.discard)
+
+    async def _call(self, batch: dict[K, asyncio.Future]) -> None:
+        try:
+            values = await self._load_batch(list(batch))
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for key, future in batch.items():
+            if future.done():
+                continue
+            if key in values:
+                future.set_result(values[key])
+            else:
+                future.set_exception(KeyError(key))
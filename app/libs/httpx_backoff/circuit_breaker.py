@@ -0,0 +1,283 @@
+from enum import Enum
+from time import monotonic
+from typing import Any, Callable, Iterator, Optional
+
+from httpx import Response, TransportError
+from httpx_backoff._common import _host_key
+from httpx_backoff.clients.base import CustomClient
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised when a call is rejected by an open circuit.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(f"Circuit breaker is open: {name}")
+        self.name = name
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with a rolling window failure rate.
+
+    CLOSED: calls pass, outcomes are counted in a rolling window of `window` seconds. When at least
+        `minimum_calls` were made and the failure rate reaches `failure_rate_threshold`, the circuit opens.
+    OPEN: calls are rejected until `open_timeout` seconds pass, then the circuit becomes half-open.
+    HALF_OPEN: up to `half_open_calls` probe calls pass. If all of them succeed the circuit closes,
+        any failure opens it again.
+    """
+
+    __slots__ = (
+        "_name",
+        "_failure_rate_threshold",
+        "_minimum_calls",
+        "_bucket_width",
+        "_bucket_count",
+        "_open_timeout",
+        "_half_open_calls",
+        "_clock",
+        "_state",
+        "_opened_at",
+        "_buckets",
+        "_probes_in_flight",
+        "_probes_succeeded",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_rate_threshold: float = 0.5,
+        minimum_calls: int = 20,
+        window: float = 60,
+        buckets: int = 10,
+        open_timeout: float = 30,
+        half_open_calls: int = 3,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """
+        :param name: Circuit name, e.g. a host.
+        :param failure_rate_threshold: Failure rate (0..1) which opens the circuit.
+        :param minimum_calls: Calls in the window required before the failure rate is evaluated.
+        :param window: Rolling window length in seconds.
+        :param buckets: Number of buckets the window is split into.
+        :param open_timeout: Seconds the circuit stays open before letting probe calls through.
+        :param half_open_calls: Number of successful probe calls required to close the circuit.
+        :param clock: Monotonic time source.
+        """
+        self._name = name
+        self._failure_rate_threshold = failure_rate_threshold
+        self._minimum_calls = minimum_calls
+        self._bucket_width = window / buckets
+        self._bucket_count = buckets
+        self._open_timeout = open_timeout
+        self._half_open_calls = half_open_calls
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        # bucket index -> [calls, failures]
+        self._buckets: dict[int, list[int]] = {}
+        self._probes_in_flight = 0
+        self._probes_succeeded = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self._open_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        calls, failures = self._window_totals()
+        return failures / calls if calls else 0.0
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and self._probes_in_flight + self._probes_succeeded < self._half_open_calls:
+            self._probes_in_flight += 1
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            self._probes_succeeded += 1
+            if self._probes_succeeded >= self._half_open_calls:
+                self._transition(CircuitState.CLOSED)
+            return
+
+        self._record(failed=False)
+
+    def record_failure(self) -> None:
+        if self._state == CircuitState.HALF_OPEN:
+            self._transition(CircuitState.OPEN)
+            return
+
+        self._record(failed=True)
+        calls, failures = self._window_totals()
+        if (
+            self._state == CircuitState.CLOSED
+            and calls >= self._minimum_calls
+            and failures / calls >= self._failure_rate_threshold
+        ):
+            self._transition(CircuitState.OPEN)
+
+    def release(self) -> None:
+        """
+        Release a probe slot of a call which finished without an outcome (e.g. was cancelled).
+        """
+        if self._state == CircuitState.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _transition(self, state: CircuitState) -> None:
+        self._state = state
+        self._probes_in_flight = 0
+        self._probes_succeeded = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = self._clock()
+        elif state == CircuitState.CLOSED:
+            self._buckets.clear()
+
+    def _record(self, failed: bool) -> None:
+        index = int(self._clock() // self._bucket_width)
+        bucket = self._buckets.setdefault(index, [0, 0])
+        bucket[0] += 1
+        bucket[1] += failed
+
+    def _window_totals(self) -> tuple[int, int]:
+        oldest = int(self._clock() // self._bucket_width) - self._bucket_count
+        for index in [index for index in self._buckets if index <= oldest]:
+            del self._buckets[index]
+
+        calls = failures = 0
+        for bucket_calls, bucket_failures in self._buckets.values():
+            calls += bucket_calls
+            failures += bucket_failures
+        return calls, failures
+
+
+class CircuitBreakerRegistry:
+    """
+    Circuit breakers created on demand, one per name (a host by default).
+    """
+
+    __slots__ = ("_breakers", "_options")
+
+    def __init__(self, **options: Any):
+        """
+        :param options: `CircuitBreaker` options shared by every breaker.
+        """
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._options = options
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers[name] = CircuitBreaker(name, **self._options)
+        return breaker
+
+    def __iter__(self) -> Iterator[CircuitBreaker]:
+        return iter(list(self._breakers.values()))
+
+
+def _is_failure(response: Response) -> bool:
+    return response.status_code >= 500 or response.status_code == 408
+
+
+class CircuitBreakerClient(CustomClient):
+    """
+    Client which wraps another backoff client with a circuit breaker per host
+    """
+
+    __slots__ = ("_client", "_registry", "_is_failure", "_error_factory")
+
+    def __init__(
+        self,
+        client: CustomClient,
+        *,
+        registry: CircuitBreakerRegistry,
+        is_failure: Callable[[Response], bool] = _is_failure,
+        error_factory: Callable[[str], Exception] = CircuitOpenError,
+    ):
+        """
+        Constructor
+        :param client: A backoff client (PredicateClient or ExceptionClient) to wrap.
+        :param registry: Circuit breakers keyed by request host.
+        :param is_failure: A function of the final response which counts it as a failure.
+            Transport errors are always counted as failures.
+        :param error_factory: A function of the circuit name returning the exception raised
+            when a call is rejected by an open circuit.
+        """
+        self._client = client
+        self._registry = registry
+        self._is_failure = is_failure
+        self._error_factory = error_factory
+
+    @property
+    def client(self):
+        return self._client.client
+
+    @property
+    def predicate(self) -> Optional[Callable[[Response], bool]]:
+        return getattr(self._client, "predicate", None)
+
+    @property
+    def registry(self) -> CircuitBreakerRegistry:
+        return self._registry
+
+    async def _request(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        breaker = self._registry.get(_host_key(self.client, url))
+        if not breaker.allow_request():
+            raise self._error_factory(breaker.name)
+
+        try:
+            response = await self._client.request(
+                url,
+                method=method,
+                json=json,
+                headers=headers,
+                data=data,
+                params=params,
+                **kwargs,
+            )
+        except TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response is not None and self._is_failure(response):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def is_closed(self) -> bool:
+        return self._client.is_closed()
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self._client.__aexit__(*args)
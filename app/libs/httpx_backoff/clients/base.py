@@ -43,7 +43,9 @@ class CustomClient(AbstractAsyncContextManager, metaclass=ABCMeta):
         """
         It's a custom public request which encapsulates request with backoff behavior.
 
-        **Parameters**: See `httpx.request`.
+        **Parameters**: See `httpx.request`. Pass `stream=True` to get the response before its body is read,
+        then the request is retried only until a response is returned and the caller must close it.
+        Pass `max_attempts=` to override the client's number of attempts for this request.
         """
         return await self._request(
             url=url,
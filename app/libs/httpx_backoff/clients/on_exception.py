@@ -1,15 +1,14 @@
-import asyncio
-import datetime
-import logging
 from typing import Any, Optional
 
 from httpx import AsyncClient, Response
-from httpx_backoff._common import _next_wait
-from httpx_backoff._typing import _BackoffGenerator, _ExceptionGroup, _Jitterer
+from httpx_backoff._common import _close, _host_key, _send
+from httpx_backoff._retry import RetryEngine
+from httpx_backoff._typing import _BackoffFactory, _BackoffGenerator, _ExceptionGroup, _Jitterer
 from httpx_backoff.backoff_options.jitter import use_full_jitter
 from httpx_backoff.clients.base import CustomClient
-
-logger = logging.getLogger(__name__)
+from httpx_backoff.hooks import RetryHooks
+from httpx_backoff.rate_limit import HostRateLimiter
+from httpx_backoff.retry_budget import RetryBudget
 
 
 class ExceptionClient(CustomClient):
@@ -20,9 +19,7 @@ class ExceptionClient(CustomClient):
     __slots__ = (
         "_exception",
         "_client",
-        "_backoff_option",
-        "_timeout",
-        "_jitter",
+        "_retry_engine",
     )
 
     def __init__(
@@ -30,17 +27,22 @@ class ExceptionClient(CustomClient):
         exception: _ExceptionGroup,
         *,
         client: AsyncClient,
-        backoff_option: _BackoffGenerator,
+        backoff_option: _BackoffGenerator | _BackoffFactory,
         attempts: int = 5,
         timeout: Optional[float] = None,
         jitter: Optional[_Jitterer] = use_full_jitter,
+        retry_budget: Optional[RetryBudget] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        hooks: Optional[RetryHooks] = None,
     ):
         """
         Constructor
         :param client: AsyncClient from httpx
         :param exception: An exception type (or tuple of types) which triggers
             backoff.
-        :param backoff_option: Your backoff option which influences to retrying behaviour
+        :param backoff_option: Your backoff option which influences to retrying behaviour. Pass a factory
+            (e.g. `Expo` or `functools.partial(Expo, factor=0.1)`), an instance is used as a prototype
+            and copied, so every request gets its own backoff state.
         :param attempts: The maximum number of attempts to make before giving
             up. In the case of failure, the result of the last attempt
             will be returned. The default func of None means there
@@ -56,18 +58,33 @@ class ExceptionClient(CustomClient):
             concurrent clients. Wait times are jittered by default
             using the full_jitter function. Jittering may be disabled
             altogether by passing jitter=None.
+        :param retry_budget: A retry budget keyed by request host. When the host's bucket is empty,
+            the request fails fast instead of sleeping. Share one budget between clients to limit
+            retries to a host across all of them.
+        :param rate_limiter: A rate limiter keyed by request host which learns from `Retry-After` and
+            `X-RateLimit-*` headers. Share one limiter between clients, so all requests to a host slow down.
+        :param hooks: Retry instrumentation, see `httpx_backoff.hooks`. Nothing is logged or measured without it.
         """
         self._exception = exception
         self._client = client
-        self._backoff_option = backoff_option
-        self._attempts = attempts
-        self._timeout = timeout
-        self._jitter = jitter
+        self._retry_engine = RetryEngine(
+            backoff_option=backoff_option,
+            attempts=attempts,
+            timeout=timeout,
+            jitter=jitter,
+            retry_budget=retry_budget,
+            rate_limiter=rate_limiter,
+            hooks=hooks,
+        )
 
     @property
     def client(self):
         return self._client
 
+    @property
+    def retry_engine(self) -> RetryEngine:
+        return self._retry_engine
+
     async def _request(
         self,
         url: str,
@@ -77,55 +94,30 @@ class ExceptionClient(CustomClient):
         headers: Optional[dict] = None,
         data: Optional[dict] = None,
         params: Optional[dict] = None,
+        stream: bool = False,
+        max_attempts: Optional[int] = None,
         **kwargs: Any,
     ) -> Optional[Response]:
-        attempts = 0
-        start = datetime.datetime.now()
-
-        logger.info(f"Starting request on {start.isoformat()}")
-
-        while True:
-            attempts += 1
-            logger.debug(f"Attempts: {attempts}")
-
-            elapsed_time = datetime.timedelta.total_seconds(datetime.datetime.now() - start)
-            logger.debug(f"Elapsed time: {elapsed_time}")
-
-            try:
-                response = await self._client.request(
-                    url=url,
-                    method=method,
-                    json=json,
-                    headers=headers,
-                    data=data,
-                    params=params,
-                    **kwargs,
-                )
-            except self._exception as e:  # type: ignore
-                logger.info(f"Caught exception: {e}")
-
-                max_attempts_exceeded = attempts == self._attempts
-                max_time_exceeded = self._timeout is not None and elapsed_time >= self._timeout
-
-                if max_attempts_exceeded or max_time_exceeded:
-                    logger.debug(f"Max attempts: {self._attempts}\n" f"Max time: {self._timeout}")
-                    raise e
-
-                try:
-                    seconds = _next_wait(
-                        self._backoff_option,
-                        e,
-                        elapsed_time,
-                        self._jitter,
-                        self._timeout,
-                    )
-                    logger.debug(f"Seconds for retry: {seconds}")
-                except StopIteration:
-                    raise e
-
-                await asyncio.sleep(seconds)
-            else:
-                return response
+        async def attempt() -> Response:
+            return await _send(
+                self._client,
+                url=url,
+                method=method,
+                json=json,
+                headers=headers,
+                data=data,
+                params=params,
+                stream=stream,
+                **kwargs,
+            )
+
+        return await self._retry_engine.run(
+            attempt,
+            retry_on_exception=self._exception,
+            budget_key=_host_key(self._client, url),
+            discard=_close if stream else None,
+            max_attempts=max_attempts,
+        )
 
     def is_closed(self) -> bool:
         return self._client.is_closed
@@ -1,15 +1,14 @@
-import asyncio
-import datetime
-import logging
 from typing import Any, Callable, Optional
 
 from httpx import AsyncClient, ConnectTimeout, Response
-from httpx_backoff._common import _next_wait
-from httpx_backoff._typing import _BackoffGenerator, _Jitterer
+from httpx_backoff._common import _close, _host_key, _send
+from httpx_backoff._retry import RetryEngine
+from httpx_backoff._typing import _BackoffFactory, _BackoffGenerator, _Jitterer
 from httpx_backoff.backoff_options.jitter import use_full_jitter
 from httpx_backoff.clients.base import CustomClient
-
-logger = logging.getLogger(__name__)
+from httpx_backoff.hooks import RetryHooks
+from httpx_backoff.rate_limit import HostRateLimiter
+from httpx_backoff.retry_budget import RetryBudget
 
 
 class PredicateClient(CustomClient):
@@ -20,9 +19,7 @@ class PredicateClient(CustomClient):
     __slots__ = (
         "_predicate",
         "_client",
-        "_backoff_option",
-        "_timeout",
-        "_jitter",
+        "_retry_engine",
     )
 
     def __init__(
@@ -30,10 +27,13 @@ class PredicateClient(CustomClient):
         predicate: Callable[[Response], bool],
         *,
         client: AsyncClient,
-        backoff_option: _BackoffGenerator,
+        backoff_option: _BackoffGenerator | _BackoffFactory,
         attempts: int = 5,
         timeout: Optional[float] = None,
         jitter: Optional[_Jitterer] = use_full_jitter,
+        retry_budget: Optional[RetryBudget] = None,
+        rate_limiter: Optional[HostRateLimiter] = None,
+        hooks: Optional[RetryHooks] = None,
     ):
         """
         Constructor
@@ -42,7 +42,9 @@ class PredicateClient(CustomClient):
             the target function will trigger backoff when considered
             truthfully. If not specified, the default behavior is to
             backoff on falsely return values.
-        :param backoff_option: Your backoff option which influences to retrying behaviour
+        :param backoff_option: Your backoff option which influences to retrying behaviour. Pass a factory
+            (e.g. `Expo` or `functools.partial(Expo, factor=0.1)`), an instance is used as a prototype
+            and copied, so every request gets its own backoff state.
         :param attempts: The maximum number of attempts to make before giving
             up. In the case of failure, the result of the last attempt
             will be returned. The default func of None means there
@@ -58,18 +60,33 @@ class PredicateClient(CustomClient):
             concurrent clients. Wait times are jittered by default
             using the full_jitter function. Jittering may be disabled
             altogether by passing jitter=None.
+        :param retry_budget: A retry budget keyed by request host. When the host's bucket is empty,
+            the request fails fast instead of sleeping. Share one budget between clients to limit
+            retries to a host across all of them.
+        :param rate_limiter: A rate limiter keyed by request host which learns from `Retry-After` and
+            `X-RateLimit-*` headers. Share one limiter between clients, so all requests to a host slow down.
+        :param hooks: Retry instrumentation, see `httpx_backoff.hooks`. Nothing is logged or measured without it.
         """
         self._predicate = predicate
         self._client = client
-        self._backoff_option = backoff_option
-        self._timeout = timeout
-        self._attempts = attempts
-        self._jitter = jitter
+        self._retry_engine = RetryEngine(
+            backoff_option=backoff_option,
+            attempts=attempts,
+            timeout=timeout,
+            jitter=jitter,
+            retry_budget=retry_budget,
+            rate_limiter=rate_limiter,
+            hooks=hooks,
+        )
 
     @property
     def client(self):
         return self._client
 
+    @property
+    def retry_engine(self) -> RetryEngine:
+        return self._retry_engine
+
     async def _request(
         self,
         url: str,
@@ -79,22 +96,14 @@ class PredicateClient(CustomClient):
         headers: Optional[dict] = None,
         data: Optional[dict] = None,
         params: Optional[dict] = None,
+        stream: bool = False,
+        max_attempts: Optional[int] = None,
         **kwargs: Any,
     ) -> Response:
-        attempts = 0
-        start = datetime.datetime.now()
-
-        logger.info(f"Starting request on {start.isoformat()}")
-
-        while True:
-            attempts += 1
-            logger.debug(f"Attempts: {attempts}")
-
-            elapsed_time = datetime.timedelta.total_seconds(datetime.datetime.now() - start)
-            logger.debug(f"Elapsed time: {elapsed_time}")
-
+        async def attempt() -> Response:
             try:
-                response = await self._client.request(
+                return await _send(
+                    self._client,
                     url=url,
                     method=method,
                     json=json,
@@ -102,37 +111,19 @@ class PredicateClient(CustomClient):
                     data=data,
                     params=params,
                     timeout=5,
+                    stream=stream,
                     **kwargs,
                 )
-            except ConnectTimeout as e:
-                response = Response(status_code=408)
-
-            if self._predicate(response):
-                max_attempts_exceeded = attempts == self._attempts
-                max_time_exceeded = self._timeout is not None and elapsed_time >= self._timeout
-
-                if max_attempts_exceeded or max_time_exceeded:
-                    logger.debug(f"Max attempts: {self._attempts}\nMax time: {self._timeout}")
-                    break
-
-                try:
-                    seconds = _next_wait(
-                        self._backoff_option,
-                        response,
-                        elapsed_time,
-                        self._jitter,
-                        self._timeout,
-                    )
-                    logger.debug(f"Seconds for retry: {seconds}")
-                except StopIteration:
-                    break
-
-                await asyncio.sleep(seconds)
-                continue
-            else:
-                break
-
-        return response
+            except ConnectTimeout:
+                return Response(status_code=408)
+
+        return await self._retry_engine.run(
+            attempt,
+            retry_on_result=self._predicate,
+            budget_key=_host_key(self._client, url),
+            discard=_close if stream else None,
+            max_attempts=max_attempts,
+        )
 
     def is_closed(self) -> bool:
         return self._client.is_closed
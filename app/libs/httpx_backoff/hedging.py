@@ -0,0 +1,228 @@
+import asyncio
+from collections import defaultdict, deque
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Optional
+
+from httpx import AsyncClient, Response
+from httpx_backoff._common import _host_key
+from httpx_backoff.clients.base import CustomClient
+from httpx_backoff.retry_budget import RetryBudget
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class HedgePolicy:
+    """
+    Shared hedging state: per host latency samples, hedge budget and hedge outcomes.
+
+    The hedge delay of a host is the `quantile` of its recent latencies, so only the slowest
+    requests are hedged. Until `min_samples` latencies are observed the fixed `delay` is used.
+    The budget receives `ratio` tokens for every hedgeable request and a hedge costs one token,
+    which caps the extra load on a host.
+    """
+
+    __slots__ = (
+        "_delay",
+        "_quantile",
+        "_min_samples",
+        "_recompute_every",
+        "_methods",
+        "_samples",
+        "_delays",
+        "_recorded",
+        "budget",
+        "hedged",
+        "wins",
+        "losses",
+    )
+
+    def __init__(
+        self,
+        *,
+        delay: float = 0.05,
+        quantile: Optional[float] = 0.95,
+        window: int = 200,
+        min_samples: int = 20,
+        budget: Optional[RetryBudget] = None,
+        methods: Iterable[str] = IDEMPOTENT_METHODS,
+    ):
+        """
+        :param delay: Hedge delay in seconds used until enough latencies are observed,
+            or always when `quantile` is None.
+        :param quantile: Latency quantile (0..1) used as the hedge delay.
+        :param window: Number of recent latencies kept per host.
+        :param min_samples: Latencies required before the quantile is used.
+        :param budget: Token bucket limiting hedges. Defaults to one hedge per ten requests.
+        :param methods: Methods which may be hedged. Only idempotent methods are safe to send twice.
+        """
+        self._delay = delay
+        self._quantile = quantile
+        self._min_samples = min_samples
+        self._recompute_every = max(1, window // 20)
+        self._methods = frozenset(method.upper() for method in methods)
+        self._samples: defaultdict[Hashable, deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._delays: dict[Hashable, float] = {}
+        self._recorded: defaultdict[Hashable, int] = defaultdict(int)
+        self.budget = budget if budget is not None else RetryBudget(ratio=0.1, max_tokens=10)
+        self.hedged: defaultdict[Hashable, int] = defaultdict(int)
+        self.wins: defaultdict[Hashable, int] = defaultdict(int)
+        self.losses: defaultdict[Hashable, int] = defaultdict(int)
+
+    def is_hedgeable(self, method: str) -> bool:
+        return method.upper() in self._methods
+
+    def delay(self, key: Hashable) -> float:
+        return self._delays.get(key, self._delay)
+
+    def record_latency(self, key: Hashable, seconds: float) -> None:
+        if self._quantile is None:
+            return
+
+        samples = self._samples[key]
+        samples.append(seconds)
+        self._recorded[key] += 1
+        # sorting the window on every request is wasteful, the quantile moves slowly anyway
+        if len(samples) >= self._min_samples and self._recorded[key] % self._recompute_every == 0:
+            ordered = sorted(samples)
+            self._delays[key] = ordered[min(len(ordered) - 1, int(self._quantile * len(ordered)))]
+
+
+class HedgingClient(CustomClient):
+    """
+    Client which sends a second identical request when the first one is slow and returns
+    the response which arrives first, cancelling the other one.
+
+    Only the primary request runs the retry loop of the wrapped client. The hedge is a single attempt
+    of the same client, so it waits for the rate limiter and is seen by the hooks, and its response loses
+    when the client's predicate asks for a retry. A hedged call sends at most `attempts + 1` requests.
+    Besides the hedge budget, a hedge spends a token of the client's retry budget.
+    """
+
+    __slots__ = ("_client", "_policy", "_enabled", "_clock")
+
+    def __init__(
+        self,
+        client: CustomClient,
+        *,
+        policy: HedgePolicy,
+        enabled: bool = False,
+        clock: Callable[[], float] = monotonic,
+    ):
+        """
+        Constructor
+        :param client: A backoff client (PredicateClient or ExceptionClient) to wrap.
+        :param policy: Hedging state shared by clients.
+        :param enabled: Whether requests are hedged by default. A request can override it with `hedge=`.
+        :param clock: Monotonic time source.
+        """
+        self._client = client
+        self._policy = policy
+        self._enabled = enabled
+        self._clock = clock
+
+    @property
+    def client(self) -> AsyncClient:
+        return self._client.client  # type: ignore[attr-defined]
+
+    @property
+    def predicate(self) -> Optional[Callable[[Response], bool]]:
+        return getattr(self._client, "predicate", None)
+
+    @property
+    def retry_budget(self) -> Optional[RetryBudget]:
+        retry_engine = getattr(self._client, "retry_engine", None)
+        return retry_engine.retry_budget if retry_engine is not None else None
+
+    @property
+    def policy(self) -> HedgePolicy:
+        return self._policy
+
+    async def _request(
+        self,
+        url: str,
+        *,
+        method: str = "GET",
+        json: Optional[dict] = None,
+        headers: Optional[dict] = None,
+        data: Optional[dict] = None,
+        params: Optional[dict] = None,
+        hedge: Optional[bool] = None,
+        **kwargs: Any,
+    ) -> Optional[Response]:
+        def attempt(**options: Any) -> Awaitable[Optional[Response]]:
+            return self._client.request(
+                url,
+                method=method,
+                json=json,
+                headers=headers,
+                data=data,
+                params=params,
+                **options,
+                **kwargs,
+            )
+
+        enabled = self._enabled if hedge is None else hedge
+        # a streamed response of the losing request can't be reliably closed, streams are not hedged
+        if not enabled or kwargs.get("stream") or not self._policy.is_hedgeable(method):
+            return await attempt()
+
+        return await self._hedged(_host_key(self.client, url), attempt)
+
+    async def _hedged(self, key: str, attempt: Callable[..., Awaitable[Optional[Response]]]) -> Optional[Response]:
+        policy = self._policy
+        policy.budget.on_success(key)
+
+        started = self._clock()
+        primary = asyncio.ensure_future(attempt())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=policy.delay(key))
+            if done or not policy.budget.try_acquire(key) or not self._try_acquire_retry(key):
+                response = await primary
+                policy.record_latency(key, self._clock() - started)
+                return response
+
+            hedge = asyncio.ensure_future(attempt(max_attempts=1))
+            tasks.append(hedge)
+            policy.hedged[key] += 1
+
+            pending = set(tasks)
+            while True:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # a failed request doesn't win while the other one is still running
+                winner = next((task for task in tasks if task in done and not self._failed(task, hedge)), None)
+                if winner is None and pending:
+                    continue
+
+                winner = winner or primary
+                if winner is hedge:
+                    policy.wins[key] += 1
+                else:
+                    policy.losses[key] += 1
+                # the primary latency is unknown when it loses, the elapsed time is its lower bound
+                policy.record_latency(key, self._clock() - started)
+                return winner.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    # mark the error of the losing request as retrieved
+                    task.exception()
+
+    def _try_acquire_retry(self, key: str) -> bool:
+        retry_budget = self.retry_budget
+        return retry_budget is None or retry_budget.try_acquire(key)
+
+    def _failed(self, task: asyncio.Future, hedge: asyncio.Future) -> bool:
+        if task.exception() is not None:
+            return True
+        # the primary has already been retried by the wrapped client, only the hedge is checked
+        predicate = self.predicate
+        return task is hedge and predicate is not None and predicate(task.result())
+
+    def is_closed(self) -> bool:
+        return self._client.is_closed()
+
+    async def __aexit__(self, *args: Any) -> None:
+        await self._client.__aexit__(*args)
@@ -0,0 +1,82 @@
+import logging
+from enum import Enum
+from typing import Any, Hashable, Optional
+
+
+class RetryOutcome(str, Enum):
+    SUCCESS = "success"
+    ATTEMPTS_EXHAUSTED = "attempts_exhausted"
+    TIMEOUT = "timeout"
+    BUDGET_EXHAUSTED = "budget_exhausted"
+    STOPPED = "stopped"
+
+
+class RetryHooks:
+    """
+    Instrumentation of the retry loop.
+
+    Methods are no-ops, override the ones you need. The engine calls hooks only when they're passed,
+    so an uninstrumented client pays nothing for instrumentation.
+    """
+
+    __slots__ = ()
+
+    def on_retry(self, key: Hashable, attempt: int, wait: float, outcome: Any) -> None:
+        """
+        Called before sleeping between attempts.
+
+        :param key: Retry budget bucket, e.g. the request host.
+        :param attempt: Number of the failed attempt, starting from 1.
+        :param wait: Seconds to wait before the next attempt.
+        :param outcome: The retried result or the caught exception.
+        """
+
+    def on_finish(
+        self,
+        key: Hashable,
+        attempts: int,
+        waited: float,
+        elapsed: float,
+        outcome: RetryOutcome,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Called once per call when it succeeds or retrying is given up.
+
+        :param key: Retry budget bucket, e.g. the request host.
+        :param attempts: Number of attempts made.
+        :param waited: Seconds spent sleeping between attempts.
+        :param elapsed: Seconds since the first attempt.
+        :param outcome: Why the loop ended.
+        :param error: The raised exception when the last attempt failed with one.
+        """
+
+
+class LoggingRetryHooks(RetryHooks):
+    """
+    Hooks logging retries at DEBUG and given up calls at INFO.
+
+    Messages use lazy %-formatting, so nothing is formatted when the level is disabled.
+    """
+
+    __slots__ = ("_logger",)
+
+    def __init__(self, logger: logging.Logger = logging.getLogger("httpx_backoff")):
+        self._logger = logger
+
+    def on_retry(self, key: Hashable, attempt: int, wait: float, outcome: Any) -> None:
+        self._logger.debug("Retrying %s after attempt %d in %.3fs: %r", key, attempt, wait, outcome)
+
+    def on_finish(
+        self,
+        key: Hashable,
+        attempts: int,
+        waited: float,
+        elapsed: float,
+        outcome: RetryOutcome,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        if outcome is not RetryOutcome.SUCCESS:
+            self._logger.info(
+                "Gave up on %s after %d attempts in %.3fs: %s", key, attempts, elapsed, outcome.value, exc_info=error
+            )
@@ -0,0 +1,169 @@
+import asyncio
+from email.utils import parsedate_to_datetime
+from time import monotonic, time
+from typing import Awaitable, Callable, Hashable, Optional
+
+from httpx import Response
+
+# Statuses whose Retry-After means "wait before the next request" (RFC 9110, RFC 6585)
+RETRY_AFTER_STATUSES = frozenset({429, 503})
+
+# X-RateLimit-Reset above this is a Unix timestamp rather than seconds until the reset
+_EPOCH_THRESHOLD = 10**9
+
+
+def parse_retry_after(value: str, now: float) -> Optional[float]:
+    """
+    Parse a `Retry-After` value.
+
+    :param value: Delay in seconds or an HTTP-date.
+    :param now: Current Unix time.
+    :return: Seconds to wait, or None when the value is malformed.
+    """
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if date is None or date.tzinfo is None:
+        return None
+    return max(0.0, date.timestamp() - now)
+
+
+def _header(response: Response, name: str) -> Optional[float]:
+    value = response.headers.get(f"x-{name}", response.headers.get(name))
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def rate_limit_reset(response: Response, now: float) -> Optional[float]:
+    """
+    Seconds until the rate limit window of `X-RateLimit-Reset` (or draft `RateLimit-Reset`) ends.
+    """
+    reset = _header(response, "ratelimit-reset")
+    if reset is None:
+        return None
+    if reset > _EPOCH_THRESHOLD:
+        reset -= now
+    return max(0.0, reset)
+
+
+def retry_after(response: Response, now: float) -> Optional[float]:
+    """
+    Seconds the server asked to wait before the next request.
+
+    `Retry-After` of a 429/503 response is used first, then the rate limit reset when
+    `X-RateLimit-Remaining` is zero.
+
+    :param response: Response to inspect.
+    :param now: Current Unix time, HTTP-dates and reset timestamps are relative to it.
+    :return: Seconds to wait, or None when the server didn't say.
+    """
+    if response.status_code in RETRY_AFTER_STATUSES and "retry-after" in response.headers:
+        seconds = parse_retry_after(response.headers["retry-after"], now)
+        if seconds is not None:
+            return seconds
+    if _header(response, "ratelimit-remaining") == 0:
+        return rate_limit_reset(response, now)
+    return None
+
+
+class _HostState:
+    __slots__ = ("blocked_until", "interval", "next_slot")
+
+    def __init__(self) -> None:
+        self.blocked_until = 0.0
+        self.interval = 0.0
+        self.next_slot = 0.0
+
+
+class HostRateLimiter:
+    """
+    Client-side rate limiter per host which learns from server headers.
+
+    When a server asks to wait (`Retry-After`, an exhausted `X-RateLimit-Remaining`), every request
+    to that host waits, not only the retried one. When few requests remain in the rate limit window,
+    they are spread evenly over the rest of the window instead of being spent in a burst.
+    """
+
+    __slots__ = ("_low_watermark", "_max_wait", "_clock", "_wall_clock", "_sleep", "_hosts")
+
+    def __init__(
+        self,
+        *,
+        low_watermark: float = 0.1,
+        max_wait: float = 60,
+        clock: Callable[[], float] = monotonic,
+        wall_clock: Callable[[], float] = time,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        """
+        :param low_watermark: Share of `X-RateLimit-Limit` remaining in the window below which requests are paced.
+        :param max_wait: The maximum pause of a host, so a bogus header can't stall requests for long.
+        :param clock: Monotonic time source.
+        :param wall_clock: Unix time source, HTTP-dates and reset timestamps are relative to it.
+        :param sleep: Coroutine function used to wait.
+        """
+        self._low_watermark = low_watermark
+        self._max_wait = max_wait
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._sleep = sleep
+        self._hosts: dict[Hashable, _HostState] = {}
+
+    def delay(self, key: Hashable) -> float:
+        """
+        Seconds the next request to the host would wait.
+        """
+        state = self._hosts.get(key)
+        if state is None:
+            return 0.0
+        return max(0.0, state.blocked_until - self._clock(), state.next_slot - self._clock())
+
+    async def acquire(self, key: Hashable) -> None:
+        """
+        Wait until a request to the host is allowed.
+
+        :param key: Host key
+        """
+        state = self._hosts.get(key)
+        if state is None:
+            return
+
+        now = self._clock()
+        start = max(now, state.blocked_until, state.next_slot)
+        if state.interval:
+            # the slot is reserved before sleeping, so concurrent requests queue up one interval apart
+            state.next_slot = start + state.interval
+        if start > now:
+            await self._sleep(start - now)
+
+    def update(self, key: Hashable, response: Response) -> None:
+        """
+        Learn the host limits from response headers.
+
+        :param key: Host key
+        :param response: Response of the host
+        """
+        now = self._wall_clock()
+        wait = retry_after(response, now)
+        limit = _header(response, "ratelimit-limit")
+        remaining = _header(response, "ratelimit-remaining")
+        if wait is None and remaining is None:
+            return
+
+        state = self._hosts.get(key)
+        if state is None:
+            state = self._hosts[key] = _HostState()
+        if wait is not None:
+            state.blocked_until = max(state.blocked_until, self._clock() + min(wait, self._max_wait))
+
+        reset = rate_limit_reset(response, now)
+        if limit and remaining and reset is not None and remaining <= limit * self._low_watermark:
+            state.interval = min(reset / remaining, self._max_wait)
+        else:
+            state.interval = 0.0
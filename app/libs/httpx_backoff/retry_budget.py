@@ -0,0 +1,54 @@
+from collections import defaultdict
+from typing import Hashable
+
+
+class RetryBudget:
+    """
+    Token bucket which limits retries to a fraction of successful traffic.
+
+    Every successful request deposits `ratio` tokens, every retry withdraws one token.
+    When a bucket has less than one token, retries are suppressed and the request fails fast.
+    Buckets are kept per key (a host by default), so a budget shared by several clients
+    limits retries to a host across all of them.
+    """
+
+    __slots__ = ("_ratio", "_max_tokens", "_buckets", "suppressed", "depletions")
+
+    def __init__(self, *, ratio: float = 0.2, max_tokens: float = 10):
+        """
+        :param ratio: Tokens deposited per successful request, i.e. allowed retries per success.
+        :param max_tokens: Bucket capacity, i.e. the burst of retries allowed after a quiet period.
+        """
+        self._ratio = ratio
+        self._max_tokens = max_tokens
+        self._buckets: dict[Hashable, float] = {}
+        self.suppressed: defaultdict[Hashable, int] = defaultdict(int)
+        self.depletions: defaultdict[Hashable, int] = defaultdict(int)
+
+    def tokens(self, key: Hashable) -> float:
+        return self._buckets.get(key, self._max_tokens)
+
+    @property
+    def keys(self) -> list[Hashable]:
+        return list(self._buckets)
+
+    def on_success(self, key: Hashable) -> None:
+        self._buckets[key] = min(self._max_tokens, self.tokens(key) + self._ratio)
+
+    def try_acquire(self, key: Hashable) -> bool:
+        """
+        Withdraw a token for a retry.
+
+        :param key: Bucket key
+        :return: Whether the retry is allowed
+        """
+        tokens = self.tokens(key)
+        if tokens < 1:
+            self.suppressed[key] += 1
+            return False
+
+        tokens -= 1
+        if tokens < 1:
+            self.depletions[key] += 1
+        self._buckets[key] = tokens
+        return True
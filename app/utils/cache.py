@@ -0,0 +1,84 @@
+from collections import OrderedDict
+from time import monotonic
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+KT = TypeVar("KT", bound=Hashable)
+VT = TypeVar("VT")
+
+
+class TTLCache(Generic[KT, VT]):
+    """
+    Ограниченный по размеру LRU кэш с временем жизни каждой записи
+    """
+
+    __slots__ = ("_maxsize", "_ttl", "_clock", "_data", "hits", "misses")
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None, clock: Callable[[], float] = monotonic) -> None:
+        """
+        :param maxsize: Максимальное количество записей. 0 отключает кэш
+        :param ttl: Время жизни записи по умолчанию (в единицах clock)
+        :param clock: Источник времени, с которым сравниваются сроки жизни записей
+        """
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._clock = clock
+        self._data: OrderedDict[KT, tuple[VT, Optional[float]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def clock(self) -> Callable[[], float]:
+        return self._clock
+
+    def get(self, key: KT, default: Optional[VT] = None) -> Optional[VT]:
+        """
+        Получение записи. Просроченная запись удаляется и считается промахом
+
+        :param key: Ключ записи
+        :param default: Значение при промахе
+        :return: Значение записи
+        """
+        item = self._data.get(key)
+        if item is None:
+            self.misses += 1
+            return default
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: KT, value: VT, expires_at: Optional[float] = None) -> None:
+        """
+        Сохранение записи. Запись живет не дольше expires_at и не дольше ttl кэша
+
+        :param key: Ключ записи
+        :param value: Значение
+        :param expires_at: Абсолютный момент истечения записи (в единицах clock)
+        """
+        if self._maxsize <= 0:
+            return
+
+        if self._ttl is not None:
+            ttl_deadline = self._clock() + self._ttl
+            expires_at = ttl_deadline if expires_at is None else min(expires_at, ttl_deadline)
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: KT, default: Optional[VT] = None) -> Optional[VT]:
+        item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
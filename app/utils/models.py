@@ -0,0 +1,70 @@
+from functools import lru_cache
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+
+def construct(model: Any, data: Any) -> Any:
+    """
+    Сборка модели без валидации, включая вложенные модели и списки моделей
+
+    :param model: Модель, либо тип над моделями
+    :param data: Разобранный JSON
+    :return: Модель, либо data, если тип не модель
+    """
+    origin = get_origin(model)
+    if origin in (Union, UnionType):
+        # Optional и Union: None остается None, словарь или список собираются первым подходящим по форме типом
+        for arg in get_args(model):
+            if _contains_model(arg) and _matches(arg, data):
+                return construct(arg, data)
+        return data
+    if origin in (list, tuple, set, frozenset) and isinstance(data, list):
+        item_type = get_args(model)[0] if get_args(model) else Any
+        if not _contains_model(item_type):
+            return data if origin is list else origin(data)
+        return origin(construct(item_type, item) for item in data)
+    if origin is dict and isinstance(data, dict):
+        value_type = get_args(model)[1] if get_args(model) else Any
+        if not _contains_model(value_type):
+            return data
+        return {key: construct(value_type, value) for key, value in data.items()}
+
+    if not (isinstance(model, type) and issubclass(model, BaseModel) and isinstance(data, dict)):
+        return data
+
+    values = {}
+    for name, alias, field_type in _construct_plan(model):
+        if alias in data:
+            value = data[alias]
+        elif name in data:
+            value = data[name]
+        else:
+            continue
+        values[name] = value if field_type is None else construct(field_type, value)
+    return model.construct(**values)
+
+
+def _matches(field_type: Any, data: Any) -> bool:
+    if isinstance(data, dict):
+        return get_origin(field_type) is dict or (isinstance(field_type, type) and issubclass(field_type, BaseModel))
+    return isinstance(data, list) and get_origin(field_type) in (list, tuple, set, frozenset)
+
+
+@lru_cache(maxsize=None)
+def _contains_model(field_type: Any) -> bool:
+    if isinstance(field_type, type) and issubclass(field_type, BaseModel):
+        return True
+    return any(_contains_model(arg) for arg in get_args(field_type))
+
+
+@lru_cache(maxsize=None)
+def _construct_plan(model: type[BaseModel]) -> tuple[tuple[str, str, Any], ...]:
+    """
+    Поля модели: имя, алиас и тип, если в поле есть вложенные модели. Скалярные поля копируются как есть
+    """
+    return tuple(
+        (name, field.alias, field.outer_type_ if _contains_model(field.outer_type_) else None)
+        for name, field in model.__fields__.items()
+    )
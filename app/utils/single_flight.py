@@ -0,0 +1,62 @@
+import asyncio
+from typing import Awaitable, Callable, Generic, Hashable, TypeVar
+
+KT = TypeVar("KT", bound=Hashable)
+VT = TypeVar("VT")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight(Generic[KT, VT]):
+    """
+    Схлопывание одновременных одинаковых вызовов в один.
+
+    Пока вызов по ключу выполняется, остальные вызовы с тем же ключом ждут его результат.
+    После завершения результат не хранится: следующий вызов выполняется заново.
+    """
+
+    __slots__ = ("_calls", "shared")
+
+    def __init__(self) -> None:
+        self._calls: dict[KT, _Call] = {}
+        self.shared = 0
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: KT, func: Callable[[], Awaitable[VT]]) -> VT:
+        """
+        Выполнение вызова, либо ожидание уже выполняющегося вызова с тем же ключом
+
+        :param key: Ключ вызова
+        :param func: Вызов
+        :return: Результат вызова. Исключение вызова поднимается у каждого ожидающего
+        """
+        call = self._calls.get(key)
+        if call is None or call.task.done():
+            call = self._calls[key] = _Call(asyncio.ensure_future(func()))
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            # отмена одного ожидающего не отменяет вызов для остальных
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: KT, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not call.task.cancelled():
+            # исключение уже получили ожидающие, либо их не осталось
+            call.task.exception()
@@ -0,0 +1,248 @@
+import hashlib
+from time import time
+from typing import Any, Callable, Optional, Sequence, TypeVar, Union
+
+import structlog
+from fastapi.dependencies.utils import get_flat_dependant
+from fastapi.routing import APIRoute
+from infrastructure.http.cache import BaseResponseCacheBackend, CachedResponse, InMemoryResponseCacheBackend
+from opentelemetry import metrics
+from starlette.datastructures import Headers
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from utils.cache import TTLCache
+
+logger = structlog.get_logger(__name__)
+
+meter = metrics.get_meter(__name__)
+
+_requests_counter = meter.create_counter(
+    name="http.server.cache.requests",
+    unit="{request}",
+    description="Запросы к кэшируемым endpoint'ам по результату: hit, miss, not_modified",
+)
+
+F = TypeVar("F", bound=Callable)
+
+
+class CachePolicy:
+    """
+    Правила кэширования ответа endpoint'а
+    """
+
+    __slots__ = ("expire", "vary", "cache_control")
+
+    def __init__(self, expire: int, vary: Sequence[str]):
+        """
+        :param expire: Время жизни ответа, секунды
+        :param vary: Заголовки запроса, от которых зависит ответ
+        """
+        self.expire = expire
+        self.vary = tuple(name.lower() for name in vary)
+        # ответ, зависящий от пользователя, не должен сохраняться в общих кэшах (прокси, CDN)
+        scope = "private" if "authorization" in self.vary or "cookie" in self.vary else "public"
+        self.cache_control = f"{scope}, max-age={expire}"
+
+
+def api_cache(expire: int, vary: Sequence[str] = ("authorization",)) -> Callable[[F], F]:
+    """
+    Кэширование ответа GET endpoint'а в ResponseCacheMiddleware.
+
+    Декоратор ставится над декоратором роутера. Ответ хранится уже сериализованным,
+    а запрос с совпадающим If-None-Match получает 304 без вызова обработчика и его зависимостей.
+    Поэтому endpoint с security зависимостями (RolesKeycloakMiddleware и другие схемы fastapi.security)
+    не кэшируется: иначе просроченный или отозванный токен получал бы ответ из кэша
+
+    :param expire: Время жизни ответа, секунды
+    :param vary: Заголовки запроса, от которых зависит ответ, например authorization или x-role
+    """
+    policy = CachePolicy(expire, vary)
+
+    def decorator(endpoint: F) -> F:
+        setattr(endpoint, "__api_cache__", policy)
+        return endpoint
+
+    return decorator
+
+
+def make_etag(content: bytes) -> str:
+    return f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Проверка If-None-Match. Сравнение слабое: W/ префикс не учитывается
+
+    :param if_none_match: Значение заголовка
+    :param etag: ETag ответа
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware для кэширования ответов endpoint'ов, отмеченных api_cache.
+
+    Хранит тело ответа уже сериализованным, отдает его с ETag и Cache-Control,
+    а на запрос с совпадающим If-None-Match отвечает 304 Not Modified без вызова обработчика
+    """
+
+    __slots__ = ("_app", "_backend", "_policies", "_clock")
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        backend: Optional[BaseResponseCacheBackend] = None,
+        maxsize: int = 1024,
+        clock: Callable[[], float] = time,
+    ) -> None:
+        """
+        :param app: ASGI приложение
+        :param backend: Хранилище ответов. По умолчанию память процесса
+        :param maxsize: Количество ответов в памяти процесса, если хранилище не задано
+        :param clock: Источник времени. В Redis записи общие для процессов, поэтому время не монотонное
+        """
+        self._app = app
+        self._backend = backend or InMemoryResponseCacheBackend(maxsize=maxsize, clock=clock)
+        # правило кэширования по пути, чтобы не перебирать маршруты на каждый запрос. False - путь не кэшируется
+        self._policies: TTLCache[str, Union[CachePolicy, bool]] = TTLCache(maxsize=maxsize)
+        self._clock = clock
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self._app(scope, receive, send)
+            return
+
+        policy = self._get_policy(scope)
+        if policy is None:
+            await self._app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = self._make_key(scope, headers, policy)
+        if_none_match = headers.get("if-none-match")
+        entry = await self._backend.get(key)
+        if entry is not None and entry.is_fresh(self._clock()):
+            etag = entry.headers["etag"]
+            if etag_matches(if_none_match, etag):
+                _requests_counter.add(1, {"result": "not_modified"})
+                await self._send_not_modified(send, entry.headers)
+            else:
+                _requests_counter.add(1, {"result": "hit"})
+                await self._send(send, entry.status_code, entry.headers, entry.content)
+            return
+
+        _requests_counter.add(1, {"result": "miss"})
+        await self._call_and_store(scope, receive, send, key, policy, if_none_match)
+
+    async def _call_and_store(
+        self, scope: Scope, receive: Receive, send: Send, key: str, policy: CachePolicy, if_none_match: Optional[str]
+    ) -> None:
+        start: Optional[Message] = None
+        chunks: list[bytes] = []
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._finish(send, start, b"".join(chunks), key, policy, if_none_match)
+
+        await self._app(scope, receive, send_wrapper)
+
+    async def _finish(
+        self,
+        send: Send,
+        start: Message,
+        content: bytes,
+        key: str,
+        policy: CachePolicy,
+        if_none_match: Optional[str],
+    ) -> None:
+        response_headers = Headers(raw=start.get("headers", []))
+        if start["status"] != 200 or "set-cookie" in response_headers or "cache-control" in response_headers:
+            # ответы с ошибкой, cookie или собственной политикой кэширования отдаются как есть
+            await send(start)
+            await send({"type": "http.response.body", "body": content})
+            return
+
+        headers = {name: value for name, value in response_headers.items() if name != "content-length"}
+        headers["etag"] = make_etag(content)
+        headers["cache-control"] = policy.cache_control
+        if policy.vary:
+            headers["vary"] = ", ".join(policy.vary)
+        entry = CachedResponse(
+            status_code=200,
+            headers=headers,
+            content=content,
+            stored_at=self._clock(),
+            max_age=policy.expire,
+            stale_while_revalidate=0,
+        )
+        await self._backend.set(key, entry, policy.expire)
+
+        if etag_matches(if_none_match, headers["etag"]):
+            await self._send_not_modified(send, headers)
+        else:
+            await self._send(send, 200, headers, content)
+
+    def _get_policy(self, scope: Scope) -> Optional[CachePolicy]:
+        path = scope["path"]
+        policy = self._policies.get(path)
+        if policy is None:
+            policy = self._find_policy(scope) or False
+            self._policies.set(path, policy)
+        return policy if isinstance(policy, CachePolicy) else None
+
+    @staticmethod
+    def _find_policy(scope: Scope) -> Optional[CachePolicy]:
+        for route in getattr(scope.get("app"), "routes", ()):
+            match, _ = route.matches(scope)
+            if match != Match.FULL:
+                continue
+            policy: Optional[CachePolicy] = getattr(getattr(route, "endpoint", None), "__api_cache__", None)
+            if policy is not None and _has_security(route):
+                logger.warning("api_cache is ignored on a route with security dependencies", path=route.path)
+                return None
+            return policy
+        return None
+
+    @staticmethod
+    def _make_key(scope: Scope, headers: Headers, policy: CachePolicy) -> str:
+        digest = hashlib.sha256(scope["path"].encode())
+        digest.update(b"?" + scope.get("query_string", b""))
+        for name in policy.vary:
+            digest.update(b"\n" + name.encode() + b":" + (headers.get(name) or "").encode("latin-1"))
+        return f"api-cache:{digest.hexdigest()}"
+
+    @staticmethod
+    async def _send(send: Send, status_code: int, headers: dict[str, str], content: bytes) -> None:
+        raw_headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+        raw_headers.append((b"content-length", str(len(content)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": status_code, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": content})
+
+    @staticmethod
+    async def _send_not_modified(send: Send, headers: dict[str, str]) -> None:
+        raw_headers = [
+            (name.encode("latin-1"), headers[name].encode("latin-1"))
+            for name in ("etag", "cache-control", "vary")
+            if name in headers
+        ]
+        await send({"type": "http.response.start", "status": 304, "headers": raw_headers})
+        await send({"type": "http.response.body", "body": b""})
+
+
+def _has_security(route: Any) -> bool:
+    # зависимости приложения и роутера входят в dependant маршрута
+    return isinstance(route, APIRoute) and bool(get_flat_dependant(route.dependant).security_requirements)
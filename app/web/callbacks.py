@@ -1,17 +1,33 @@
+import inspect
+
 from fastapi import FastAPI
 from infrastructure.ioc.container import Container
+from infrastructure.ioc.gateways import Gateways
 from opentelemetry import trace
 from web.api.v1.example.router import example_router
+from web.healthcheck.scheduler import HealthCheckScheduler
 
 tracer = trace.get_tracer(__name__)
 
 
-def register_callback(app: FastAPI, container: Container) -> None:
+def register_callback(app: FastAPI, container: Container, healthcheck_scheduler: HealthCheckScheduler) -> None:
     with tracer.start_as_current_span("register_callback"):
 
-        def shutdown():
-            container.shutdown_resources()
+        async def startup() -> None:
+            gateways: Gateways = container.gateways()
+            for resource in (gateways.http_clients, gateways.redis_connections):
+                result = resource.init()
+                if inspect.isawaitable(result):
+                    await result
+
+        async def shutdown() -> None:
+            result = container.shutdown_resources()
+            if inspect.isawaitable(result):
+                await result
 
+        app.add_event_handler("startup", startup)
+        app.add_event_handler("startup", healthcheck_scheduler.start)
+        app.add_event_handler("shutdown", healthcheck_scheduler.stop)
         app.add_event_handler("shutdown", shutdown)
 
         app.include_router(example_router, prefix="/example")
@@ -1,7 +1,11 @@
+import asyncio
+from time import perf_counter
+
 from infrastructure.config import HealthCheckConfig
 from opentelemetry import trace
 from utils.time import TimeCatcher
 from web.dto.base import BaseCamelCaseModel
+from web.healthcheck.commands import BaseCommand, CommandResult
 from web.healthcheck.handler import CommandHandler
 from web.healthcheck.status import Status
 
@@ -88,13 +92,13 @@ class HealthCheckCommander:
             entries = dict()
 
             async with TimeCatcher() as catcher:  # type: TimeCatcher
-                for name, command in command_handler.commands.items():  # type: str, BaseCommand
-                    command_result = await command.execute()
+                command_results = await self._execute_commands(command_handler.commands)
 
-                    if command_result.status == Status.HEALTHY:
-                        count_healthy_services += 1
+            for name, command_result in command_results.items():
+                if command_result.status == Status.HEALTHY:
+                    count_healthy_services += 1
 
-                    entries[name] = command_result.dict(exclude_none=True)
+                entries[name] = command_result.dict(exclude_none=True)
 
             if self._is_services_healthy(
                 count_healthy_services=count_healthy_services,
@@ -107,6 +111,61 @@ class HealthCheckCommander:
 
             return WorkingCapacityResult(status=status, total_duration=catcher.total_duration, entries=entries)
 
+    async def _execute_commands(self, commands: dict[str, BaseCommand]) -> dict[str, CommandResult]:
+        """
+        Конкурентный запуск проверок. Проверки, не уложившиеся в общий дедлайн, отменяются
+
+        :param commands: Команды проверки сервисов
+        :return: Результаты проверок
+        """
+        if not commands:
+            return {}
+
+        started = perf_counter()
+        tasks = {name: asyncio.create_task(self._execute_command(command)) for name, command in commands.items()}
+        _, pending = await asyncio.wait(tasks.values(), timeout=self._config.TOTAL_TIMEOUT)
+
+        for task in pending:
+            task.cancel()
+        # отмененные задачи дожидаются, чтобы они не остались висеть до закрытия event loop
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        return {
+            name: self._timeout_result(perf_counter() - started, "Overall healthcheck deadline exceeded")
+            if task in pending
+            else task.result()
+            for name, task in tasks.items()
+        }
+
+    async def _execute_command(self, command: BaseCommand) -> CommandResult:
+        """
+        Запуск одной проверки с таймаутом
+
+        :param command: Команда проверки сервиса
+        :return: Результат проверки
+        """
+        started = perf_counter()
+        try:
+            return await asyncio.wait_for(command.execute(), timeout=self._config.COMMAND_TIMEOUT)
+        except asyncio.TimeoutError:
+            return self._timeout_result(perf_counter() - started, "Healthcheck command timed out")
+        except Exception as e:
+            return CommandResult(
+                status=Status.UNHEALTHY,
+                duration=perf_counter() - started,
+                exception=str(type(e)),
+                description=str(e),
+            )
+
+    @staticmethod
+    def _timeout_result(duration: float, description: str) -> CommandResult:
+        return CommandResult(
+            status=Status.UNHEALTHY,
+            duration=duration,
+            exception=str(asyncio.TimeoutError),
+            description=description,
+        )
+
     @staticmethod
     def _is_services_healthy(*, count_healthy_services: int, count_all_services: int, need_percentage: float) -> bool:
         """
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from typing import Any
 
-from dependency_injector.wiring import Closing, Provide
+from dependency_injector.wiring import Closing, Provide, inject
+from httpx_backoff.circuit_breaker import CircuitBreakerRegistry, CircuitState
 from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.exc import SQLAlchemyError
@@ -49,6 +50,27 @@ class DBCommand(BaseCommand):
         )
 
 
+class CircuitBreakersCommand(BaseCommand):
+    @inject
+    def __init__(self, registry: CircuitBreakerRegistry = Provide["gateways.circuit_breakers"]):
+        self.registry = registry
+
+    async def execute(self) -> CommandResult:
+        async with TimeCatcher() as catcher:
+            data = {
+                breaker.name: {"state": breaker.state.value, "failureRate": breaker.failure_rate}
+                for breaker in self.registry
+            }
+            opened = [name for name, breaker in data.items() if breaker["state"] == CircuitState.OPEN]
+
+        return CommandResult(
+            status=Status.UNHEALTHY if opened else Status.HEALTHY,
+            data=data,
+            duration=catcher.total_duration,
+            description=f"Open circuits: {', '.join(opened)}" if opened else None,
+        )
+
+
 class OpenSearchPingCommand(BaseCommand):
     def __init__(self, client: Any = Closing[Provide["gateways.open_search_client"]]):
         self.client = client
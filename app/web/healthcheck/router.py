@@ -5,13 +5,15 @@ from fastapi.responses import ORJSONResponse
 from infrastructure.config import HealthCheckConfig
 from opentelemetry import trace
 from web.healthcheck.commander import HealthCheckCommander, WorkingCapacityResult
+from web.healthcheck.commands import CircuitBreakersCommand
 from web.healthcheck.handler import CommandHandler
+from web.healthcheck.scheduler import HealthCheckScheduler
 from web.healthcheck.status import Status
 
 tracer = trace.get_tracer(__name__)
 
 
-def register_healthcheck(app: FastAPI, healthcheck_config: HealthCheckConfig) -> None:
+def register_healthcheck(app: FastAPI, healthcheck_config: HealthCheckConfig) -> HealthCheckScheduler:
     with tracer.start_as_current_span("register_healthcheck"):
         healthcheck_router = APIRouter(prefix="/health", tags=["Healthcheck"])
 
@@ -23,6 +25,7 @@ def register_healthcheck(app: FastAPI, healthcheck_config: HealthCheckConfig) ->
         # liveness_command_handler.add_healthcheck_command(command=kafka_command)
         # readiness_command_handler.add_healthcheck_command(command=kafka_command)
         # monitor_command_handler.add_healthcheck_command(command=kafka_command)
+        monitor_command_handler.add_healthcheck_command("circuitBreakers", CircuitBreakersCommand())
 
         healthcheck_commander = HealthCheckCommander(
             liveness_handler=liveness_command_handler,
@@ -30,9 +33,14 @@ def register_healthcheck(app: FastAPI, healthcheck_config: HealthCheckConfig) ->
             monitor_handler=monitor_command_handler,
             healthcheck_config=healthcheck_config,
         )
+        healthcheck_scheduler = HealthCheckScheduler(
+            healthcheck_commander,
+            interval=healthcheck_config.PROBE_INTERVAL,
+            max_age=healthcheck_config.SNAPSHOT_MAX_AGE,
+        )
 
         @healthcheck_router.get("/liveness", status_code=status.HTTP_200_OK, response_model=WorkingCapacityResult)
-        async def liveness(result: WorkingCapacityResult = Depends(healthcheck_commander.run_liveness_route)):
+        async def liveness(result: WorkingCapacityResult = Depends(healthcheck_scheduler.liveness)):
             with tracer.start_as_current_span("liveness"):
                 if result.status == Status.HEALTHY:
                     return result
@@ -40,7 +48,7 @@ def register_healthcheck(app: FastAPI, healthcheck_config: HealthCheckConfig) ->
                     return ORJSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=jsonable_encoder(result))
 
         @healthcheck_router.get("/readiness", status_code=status.HTTP_200_OK, response_model=WorkingCapacityResult)
-        async def readiness(result: WorkingCapacityResult = Depends(healthcheck_commander.run_readiness_route)):
+        async def readiness(result: WorkingCapacityResult = Depends(healthcheck_scheduler.readiness)):
             with tracer.start_as_current_span("readiness"):
                 if result.status == Status.HEALTHY:
                     return result
@@ -48,7 +56,7 @@ def register_healthcheck(app: FastAPI, healthcheck_config: HealthCheckConfig) ->
                     return ORJSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=jsonable_encoder(result))
 
         @healthcheck_router.get("/monitor", status_code=status.HTTP_200_OK, response_model=WorkingCapacityResult)
-        async def monitor(result: WorkingCapacityResult = Depends(healthcheck_commander.run_monitor_route)):
+        async def monitor(result: WorkingCapacityResult = Depends(healthcheck_scheduler.monitor)):
             with tracer.start_as_current_span("monitor"):
                 if result.status == Status.HEALTHY:
                     return result
@@ -56,3 +64,5 @@ def register_healthcheck(app: FastAPI, healthcheck_config: HealthCheckConfig) ->
                     return ORJSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=jsonable_encoder(result))
 
         app.include_router(healthcheck_router, default_response_class=Default(ORJSONResponse))
+
+        return healthcheck_scheduler
@@ -0,0 +1,121 @@
+import asyncio
+from enum import Enum
+from time import monotonic
+from typing import Awaitable, Callable, Optional
+
+import structlog
+from opentelemetry import trace
+from web.healthcheck.commander import HealthCheckCommander, WorkingCapacityResult
+from web.healthcheck.status import Status
+
+logger = structlog.get_logger(__name__)
+tracer = trace.get_tracer(__name__)
+
+
+class ProbeKind(str, Enum):
+    LIVENESS = "liveness"
+    READINESS = "readiness"
+    MONITOR = "monitor"
+
+
+class HealthCheckScheduler:
+    """
+    Фоновый запуск проверок с хранением последнего результата.
+
+    Пока планировщик запущен, роуты отдают последний снимок, а снимок старше max_age считается Unhealthy.
+    Если планировщик не запущен, проверки выполняются на каждый запрос.
+    """
+
+    __slots__ = ("_commander", "_interval", "_max_age", "_clock", "_snapshots", "_task")
+
+    def __init__(
+        self,
+        commander: HealthCheckCommander,
+        *,
+        interval: float,
+        max_age: float,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        """
+        :param commander: Исполнитель проверок
+        :param interval: Интервал между запусками проверок, секунды
+        :param max_age: Максимальный возраст снимка, после которого статус Unhealthy, секунды
+        :param clock: Источник времени
+        """
+        self._commander = commander
+        self._interval = interval
+        self._max_age = max_age
+        self._clock = clock
+        self._snapshots: dict[ProbeKind, tuple[WorkingCapacityResult, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        if not self.is_running:
+            self._task = asyncio.create_task(self._run_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            task, self._task = self._task, None
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def liveness(self) -> WorkingCapacityResult:
+        return await self._get_snapshot(ProbeKind.LIVENESS)
+
+    async def readiness(self) -> WorkingCapacityResult:
+        return await self._get_snapshot(ProbeKind.READINESS)
+
+    async def monitor(self) -> WorkingCapacityResult:
+        return await self._get_snapshot(ProbeKind.MONITOR)
+
+    async def _get_snapshot(self, kind: ProbeKind) -> WorkingCapacityResult:
+        """
+        Получение результата проверки
+
+        :param kind: Тип проверки
+        :return: Последний снимок, либо результат проверки, выполненной сейчас
+        """
+        snapshot = self._snapshots.get(kind)
+        if not self.is_running or snapshot is None:
+            return await self._refresh(kind)
+
+        result, taken_at = snapshot
+        age = self._clock() - taken_at
+        if age > self._max_age:
+            return WorkingCapacityResult(
+                status=Status.UNHEALTHY,
+                total_duration=result.total_duration,
+                entries={
+                    **result.entries,
+                    "scheduler": {"status": Status.UNHEALTHY, "description": f"Snapshot is stale: {age:.1f}s"},
+                },
+            )
+
+        return result
+
+    async def _refresh(self, kind: ProbeKind) -> WorkingCapacityResult:
+        with tracer.start_as_current_span("HealthCheckScheduler._refresh"):
+            result = await self._probes[kind]()
+            self._snapshots[kind] = (result, self._clock())
+            return result
+
+    @property
+    def _probes(self) -> dict[ProbeKind, Callable[[], Awaitable[WorkingCapacityResult]]]:
+        return {
+            ProbeKind.LIVENESS: self._commander.run_liveness_route,
+            ProbeKind.READINESS: self._commander.run_readiness_route,
+            ProbeKind.MONITOR: self._commander.run_monitor_route,
+        }
+
+    async def _run_periodically(self) -> None:
+        while True:
+            results = await asyncio.gather(*(self._refresh(kind) for kind in ProbeKind), return_exceptions=True)
+            for kind, result in zip(ProbeKind, results):
+                if isinstance(result, Exception):
+                    logger.warning("Healthcheck probe failed", probe=kind.value, error=str(result))
+
+            await asyncio.sleep(self._interval)
@@ -1,6 +1,5 @@
 from dependency_injector import containers
 from fastapi import FastAPI
-from fastapi.responses import ORJSONResponse
 from infrastructure.config import config
 from infrastructure.ioc.container import Container
 from infrastructure.log import configure_logging
@@ -10,6 +9,7 @@ from web.callbacks import register_callback
 from web.handlers import register_error_handlers
 from web.healthcheck.router import register_healthcheck
 from web.middlewares import register_middleware
+from web.responses import ModelORJSONResponse
 
 tracer = trace.get_tracer(__name__)
 
@@ -20,13 +20,13 @@ def create_app(container: containers.DeclarativeContainer = None) -> FastAPI:
         debug=config.DEBUG,
         title=config.PROJECT_NAME,
         openapi_url="/openapi.json",
-        default_response_class=ORJSONResponse,
+        default_response_class=ModelORJSONResponse,
     )
     init_tracing_for_app(application, config)
     register_middleware(application)
     register_error_handlers(application)
-    register_healthcheck(app=application, healthcheck_config=config.HEALTHCHECK_CONFIG)
-    register_callback(app=application, container=container)
+    healthcheck_scheduler = register_healthcheck(app=application, healthcheck_config=config.HEALTHCHECK_CONFIG)
+    register_callback(app=application, container=container, healthcheck_scheduler=healthcheck_scheduler)
     configure_logging(log_level=config.LOG.LEVEL, log_format=config.LOG.FORMAT)
 
     return application
@@ -1,22 +1,101 @@
+import hashlib
+import re
+import time
 import uuid
-from typing import Any, Callable, Coroutine, Optional
+from typing import Optional
 
 from common.dto.auth import UserDTO
-from common.errors import SecurityBusinessError
-from fastapi import FastAPI, Request, Response, status
+from common.errors import KeyProviderUnavailableError, SecurityBusinessError
+from fastapi import FastAPI, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.security.utils import get_authorization_scheme_param
 from infrastructure.config import KeycloakConfig, config
+from infrastructure.keycloak.keys import BaseKeyProvider, create_key_provider
 from infrastructure.sentry import configure_sentry
 from jose import ExpiredSignatureError, JWTError, jwt
 from opentelemetry import trace
 from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
+from starlette.datastructures import Headers
 from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from structlog.contextvars import bind_contextvars, clear_contextvars
+from utils.cache import TTLCache
+from web.cache import ResponseCacheMiddleware
 from web.errors import HTTPCustomError
+from web.roles import RoleExpression, UserRoles, compile_roles
 
 tracer = trace.get_tracer(__name__)
 
+CORRELATION_ID_HEADER = "X-Correlation-ID"
+_CORRELATION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.:-]{1,128}$")
+_TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+
+
+class VerifiedToken:
+    """
+    Результат проверки JWT токена, который переиспользуется между запросами с тем же токеном
+    """
+
+    __slots__ = ("payload", "user", "roles")
+
+    def __init__(self, payload: dict, user: UserDTO, roles: UserRoles):
+        self.payload = payload
+        self.user = user
+        self.roles = roles
+
+
+class VerifiedTokenCache(TTLCache[bytes, VerifiedToken]):
+    """
+    Кэш проверенных токенов. Ключ - sha256 настроек проверки и токена, запись живет не дольше exp токена
+    """
+
+    __slots__ = ()
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        super().__init__(maxsize=maxsize, ttl=ttl, clock=time.time)
+
+    @staticmethod
+    def make_key(token: str, namespace: str = "") -> bytes:
+        """
+        :param token: JWT
+        :param namespace: Настройки проверки токена: realm, клиент и поставщик ключей
+        """
+        return hashlib.sha256(f"{namespace}\0{token}".encode()).digest()
+
+    def add(self, key: bytes, verified_token: VerifiedToken) -> None:
+        """
+        Сохранение проверенного токена до момента его истечения
+
+        :param key: Ключ токена
+        :param verified_token: Проверенный токен
+        """
+        exp = verified_token.payload.get("exp")
+        self.set(key, verified_token, expires_at=float(exp) if isinstance(exp, (int, float)) else None)
+
+
+_token_cache = VerifiedTokenCache(
+    maxsize=config.KEYCLOAK_CONFIG.TOKEN_CACHE_SIZE, ttl=config.KEYCLOAK_CONFIG.TOKEN_CACHE_TTL
+)
+_keycloak_key_provider: Optional[BaseKeyProvider] = None
+
+
+def get_keycloak_key_provider() -> BaseKeyProvider:
+    """
+    Поставщик ключей приложения. Создается при старте приложения по текущему config.KEYCLOAK_CONFIG,
+    либо при первой проверке токена
+    """
+    global _keycloak_key_provider
+    if _keycloak_key_provider is None:
+        _keycloak_key_provider = create_key_provider(config.KEYCLOAK_CONFIG)
+    return _keycloak_key_provider
+
+
+async def close_keycloak_key_provider() -> None:
+    global _keycloak_key_provider
+    if _keycloak_key_provider is not None:
+        await _keycloak_key_provider.aclose()
+        _keycloak_key_provider = None
+
 
 class RolesKeycloakMiddleware(HTTPBearer):
     """
@@ -26,25 +105,35 @@ class RolesKeycloakMiddleware(HTTPBearer):
     def __init__(
         self,
         *,
-        roles: list[str],
+        roles: list[str] | RoleExpression,
         keycloak_config: KeycloakConfig = config.KEYCLOAK_CONFIG,
         bearer_format: str = "Bearer",
         scheme_name: Optional[str] = "Authorization",
         description: Optional[str] = "Авторизация по JWT токену",
         auto_error: bool = True,
+        token_cache: VerifiedTokenCache = _token_cache,
+        key_provider: Optional[BaseKeyProvider] = None,
     ):
         super().__init__(
             bearerFormat=bearer_format, scheme_name=scheme_name, description=description, auto_error=auto_error
         )
-        self._roles = roles
+        self._roles = compile_roles(roles)
         self._config = keycloak_config
+        self._token_cache = token_cache
+        # кэш общий для всех экземпляров, поэтому токен, проверенный другим ключом или для другого клиента,
+        # проверяется заново
+        provider_id = id(key_provider) if key_provider is not None else "app"
+        self._token_cache_namespace = (
+            f"{keycloak_config.URL}|{keycloak_config.REALM_NAME}|{keycloak_config.CLIENT_ID}|{provider_id}"
+        )
+        self._key_provider = key_provider
 
     async def __call__(self, request: Request) -> HTTPAuthorizationCredentials:
         with tracer.start_as_current_span("RolesKeycloakMiddleware.__call__"):
             token = await self._get_token_from_authorization_scheme(request)
 
             try:
-                token_payload = self._receive_token_payload(token.credentials)
+                verified_token = await self._receive_verified_token(token.credentials)
             except (ExpiredSignatureError, JWTError) as e:
                 raise HTTPCustomError(
                     status_code=status.HTTP_401_UNAUTHORIZED,
@@ -54,10 +143,14 @@ class RolesKeycloakMiddleware(HTTPBearer):
                         detail=str(e),
                     ),
                 ) from e
+            except KeyProviderUnavailableError as e:
+                raise HTTPCustomError(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=e.detail,
+                    business_error=e,
+                ) from e
 
-            roles = self._get_roles_from_token_payload(token_payload)
-
-            if not self._check_user_access_roles(roles):
+            if not self._check_user_access_roles(verified_token.roles):
                 raise HTTPCustomError(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Not enough permissions",
@@ -67,7 +160,7 @@ class RolesKeycloakMiddleware(HTTPBearer):
                     ),
                 )
 
-            request.state.user = UserDTO.parse_obj(token_payload)
+            request.state.user = verified_token.user
 
             return token
 
@@ -99,49 +192,118 @@ class RolesKeycloakMiddleware(HTTPBearer):
 
             return HTTPAuthorizationCredentials(scheme=scheme, credentials=credentials)
 
-    def _receive_token_payload(self, token: str) -> dict:
+    async def _receive_verified_token(self, token: str) -> VerifiedToken:
+        """
+        Получение проверенного токена из кэша, либо проверка подписи и сохранение в кэш
+
+        :param token: JWT
+        :return: Проверенный токен
+        :raise: ExpiredSignatureError, JWTError
+        """
+        with tracer.start_as_current_span("RolesKeycloakMiddleware._receive_verified_token") as span:
+            key = self._token_cache.make_key(token, self._token_cache_namespace)
+            verified_token = self._token_cache.get(key)
+            span.set_attribute("token_cache.hit", verified_token is not None)
+
+            if verified_token is None:
+                token_payload = await self._receive_token_payload(token)
+                verified_token = VerifiedToken(
+                    payload=token_payload,
+                    user=UserDTO.parse_obj(token_payload),
+                    roles=self._get_roles_from_token_payload(token_payload),
+                )
+                self._token_cache.add(key, verified_token)
+
+            return verified_token
+
+    async def _receive_token_payload(self, token: str) -> dict:
         """
         Получение payload токена
 
         :param token: JWT
         :return: token payload
-        :raise: ExpiredSignatureError, JWTError
+        :raise: ExpiredSignatureError, JWTError, KeyProviderUnavailableError
         """
         with tracer.start_as_current_span("RolesKeycloakMiddleware._receive_token_payload"):
+            header = jwt.get_unverified_header(token)
+            key_provider = self._key_provider or get_keycloak_key_provider()
+            key = await key_provider.get_key(header.get("kid"), header.get("alg"))
             return jwt.decode(
                 token=token,
-                key=self._config.PUBLIC_KEY,
+                key=key,
                 algorithms=self._config.ALGORITHMS,
                 audience=self._config.CLIENT_ID,
                 options={"verify_aud": False},
             )
 
-    def _get_roles_from_token_payload(self, token_payload: dict) -> list[str]:
+    def _get_roles_from_token_payload(self, token_payload: dict) -> UserRoles:
         """
-        Получить keycloak роли пользователя из JWT payload
+        Получить keycloak роли пользователя из JWT payload. Вызывается один раз на токен
 
         :param token_payload: JWT payload
-        :return: Список ролей
+        :return: Роли пользователя
         """
-        with tracer.start_as_current_span("RolesKeycloakMiddleware._get_roles_from_token_payload"):
-            realm_access = token_payload.get("realm_access", {})
-            resource_access = token_payload.get("resource_access", {})
-            client_access = resource_access.get(self._config.CLIENT_ID, {})
-
-            client_roles = client_access.get("roles", []) if client_access is not None else []
-            realm_roles = realm_access.get("roles", []) if realm_access is not None else []
+        return UserRoles.from_token_payload(token_payload, self._config.CLIENT_ID)
 
-            return client_roles + realm_roles
-
-    def _check_user_access_roles(self, roles: list[str]) -> bool:
+    def _check_user_access_roles(self, roles: UserRoles) -> bool:
         """
         Проверка доступов пользователя
 
         :param roles: Роли пользователя
         :return: Результат проверки доступа
         """
-        with tracer.start_as_current_span("RolesKeycloakMiddleware._check_user_access_roles"):
-            return set(self._roles).issubset(set(roles))
+        return self._roles.matches(roles)
+
+
+class CorrelationIdMiddleware:
+    """
+    ASGI middleware для трассировки запроса.
+
+    Берет correlation id из X-Correlation-ID или trace-id из traceparent, иначе генерирует новый,
+    кладет его в contextvars structlog и возвращает в заголовке ответа
+    """
+
+    __slots__ = ("_app", "_response_header")
+
+    def __init__(self, app: ASGIApp) -> None:
+        self._app = app
+        self._response_header = CORRELATION_ID_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self._app(scope, receive, send)
+            return
+
+        correlation_id = self._get_correlation_id(Headers(scope=scope))
+        clear_contextvars()
+        bind_contextvars(x_correlation_id=correlation_id)
+
+        header = (self._response_header, correlation_id.encode("latin-1"))
+
+        async def send_with_correlation_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), header]
+            await send(message)
+
+        await self._app(scope, receive, send_with_correlation_id)
+
+    @staticmethod
+    def _get_correlation_id(headers: Headers) -> str:
+        """
+        Получение correlation id из заголовков запроса
+
+        :param headers: Заголовки запроса
+        :return: correlation id
+        """
+        correlation_id = headers.get(CORRELATION_ID_HEADER)
+        if correlation_id is not None and _CORRELATION_ID_PATTERN.match(correlation_id):
+            return correlation_id
+
+        traceparent = headers.get("traceparent")
+        if traceparent is not None and (match := _TRACEPARENT_PATTERN.match(traceparent)):
+            return match.group(1)
+
+        return str(uuid.uuid4())
 
 
 def register_middleware(app: FastAPI) -> None:
@@ -156,21 +318,15 @@ def register_middleware(app: FastAPI) -> None:
             configure_sentry(dsn=config.SENTRY_CONFIG.DSN, environment=config.SENTRY_CONFIG.STAGE)
             app.add_middleware(SentryAsgiMiddleware)
 
-        @app.middleware("http")
-        async def add_request_id(request: Request, call_next: Callable[[Any], Coroutine]) -> Response:
-            """
-            Middleware для трассировки запроса
-
-            :param request: Endpoint mock_request
-            :param call_next: Следующий вызов
-            :return:
-            """
-            clear_contextvars()
-            bind_contextvars(x_correlation_id=str(uuid.uuid4()))
+        # поставщик ключей создается при старте, чтобы использовать конфиг, действующий на момент запуска
+        app.add_event_handler("startup", get_keycloak_key_provider)
+        app.add_event_handler("shutdown", close_keycloak_key_provider)
 
-            response: Response = await call_next(request)
+        if config.API_CACHE_CONFIG.ENABLED:
+            # внутри CorrelationIdMiddleware, чтобы ответы из кэша тоже получали X-Correlation-ID
+            app.add_middleware(ResponseCacheMiddleware, maxsize=config.API_CACHE_CONFIG.MAXSIZE)
 
-            return response
+        app.add_middleware(CorrelationIdMiddleware)
 
         app.add_middleware(
             CORSMiddleware,
@@ -178,4 +334,5 @@ def register_middleware(app: FastAPI) -> None:
             allow_credentials=True,
             allow_methods=config.CORS_CONFIG.METHODS,
             allow_headers=config.CORS_CONFIG.HEADERS,
+            expose_headers=[CORRELATION_ID_HEADER],
         )
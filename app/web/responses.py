@@ -0,0 +1,135 @@
+import asyncio
+from functools import lru_cache
+from typing import Any, Callable, get_args
+
+import orjson
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.dependencies.models import Dependant
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+from pydantic.json import pydantic_encoder
+from starlette.concurrency import run_in_threadpool
+
+
+@lru_cache(maxsize=None)
+def _dump_plan(model: type[BaseModel]) -> tuple[tuple[str, str], ...]:
+    """
+    Поля модели и их алиасы (camelCase у CustomModel), вычисляются один раз на класс
+    """
+    return tuple((name, field.alias) for name, field in model.__fields__.items())
+
+
+@lru_cache(maxsize=None)
+def is_plain_model(model: type[BaseModel]) -> bool:
+    """
+    Модель, включая вложенные, сериализуется по полям так же, как jsonable_encoder:
+    без __root__, Config.json_encoders и полей с exclude
+    """
+    return _is_plain_type(model, set())
+
+
+def _is_plain_type(field_type: Any, seen: set[type]) -> bool:
+    if not (isinstance(field_type, type) and issubclass(field_type, BaseModel)):
+        return all(_is_plain_type(arg, seen) for arg in get_args(field_type))
+    if field_type in seen:
+        return True
+    seen.add(field_type)
+    if field_type.__custom_root_type__ or field_type.__config__.json_encoders:
+        return False
+    return all(
+        field.field_info.exclude is None and _is_plain_type(field.outer_type_, seen)
+        for field in field_type.__fields__.values()
+    )
+
+
+def _default(value: Any) -> Any:
+    # orjson вызывает default только для неизвестных ему типов, вложенные модели и списки обходит сам
+    if isinstance(value, BaseModel):
+        if not is_plain_model(type(value)):
+            return jsonable_encoder(value, by_alias=True)
+        return {alias: getattr(value, name) for name, alias in _dump_plan(type(value))}
+    return pydantic_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Сериализация ответа с моделями по алиасам за один проход orjson, без dict() и jsonable_encoder
+
+    :param content: Модель, список моделей, либо данные, которые сериализует ORJSONResponse
+    :return: JSON
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ModelORJSONResponse(ORJSONResponse):
+    """
+    ORJSONResponse, который сериализует модели pydantic напрямую, см. dumps
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def _uses_response_param(dependant: Dependant) -> bool:
+    return dependant.response_param_name is not None or any(
+        _uses_response_param(dependency) for dependency in dependant.dependencies
+    )
+
+
+def _is_model_content(content: Any) -> bool:
+    # модели с __root__, json_encoders или exclude у полей сериализует обычный путь FastAPI
+    if isinstance(content, list) and content:
+        content = content[0]
+    return isinstance(content, BaseModel) and is_plain_model(type(content))
+
+
+class TrustedModelRoute(APIRoute):
+    """
+    Маршрут, который отдает модель, возвращенную обработчиком, сразу в ModelORJSONResponse.
+
+    FastAPI по умолчанию повторно валидирует результат через response_model и обходит его jsonable_encoder,
+    прежде чем передать orjson. Здесь результат считается доверенным: обработчик должен возвращать
+    объявленную модель, а не ее наследника с лишними полями. Маршруты с response_model_include/exclude,
+    exclude_unset/defaults/none, by_alias=False и параметром Response, а также результаты-модели с __root__,
+    json_encoders или exclude у полей используют обычный путь FastAPI
+    """
+
+    def get_route_handler(self) -> Callable:
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+
+        call = self.dependant.call
+        if (
+            call is not None
+            and isinstance(response_class, type)
+            and issubclass(response_class, ModelORJSONResponse)
+            and self._is_trusted()
+        ):
+            self.dependant.call = self._wrap_endpoint(call, response_class)
+        return super().get_route_handler()
+
+    def _is_trusted(self) -> bool:
+        return (
+            self.response_model_by_alias
+            and not self.response_model_include
+            and not self.response_model_exclude
+            and not self.response_model_exclude_unset
+            and not self.response_model_exclude_defaults
+            and not self.response_model_exclude_none
+            and not _uses_response_param(self.dependant)
+        )
+
+    def _wrap_endpoint(self, call: Callable, response_class: type[ModelORJSONResponse]) -> Callable:
+        is_coroutine = asyncio.iscoroutinefunction(call)
+        status_code = self.status_code or 200
+
+        async def endpoint(**kwargs: Any) -> Any:
+            content = await call(**kwargs) if is_coroutine else await run_in_threadpool(call, **kwargs)
+            if _is_model_content(content):
+                return response_class(content, status_code=status_code)
+            return content
+
+        return endpoint
@@ -0,0 +1,132 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+_EMPTY: frozenset[str] = frozenset()
+
+
+class UserRoles:
+    """
+    Роли пользователя, извлеченные из JWT payload один раз на токен
+    """
+
+    __slots__ = ("realm", "clients", "effective")
+
+    def __init__(self, realm: frozenset[str], clients: dict[str, frozenset[str]], client_id: str):
+        """
+        :param realm: Роли realm'а
+        :param clients: Роли по клиентам (resource_access)
+        :param client_id: Клиент сервиса, его роли вместе с ролями realm'а проверяются по умолчанию
+        """
+        self.realm = realm
+        self.clients = clients
+        self.effective = realm | clients.get(client_id, _EMPTY)
+
+    @classmethod
+    def from_token_payload(cls, token_payload: dict, client_id: str) -> "UserRoles":
+        realm_access = token_payload.get("realm_access") or {}
+        resource_access = token_payload.get("resource_access") or {}
+
+        return cls(
+            realm=frozenset(realm_access.get("roles") or ()),
+            clients={
+                client: frozenset((access or {}).get("roles") or ()) for client, access in resource_access.items()
+            },
+            client_id=client_id,
+        )
+
+    def of(self, client: Optional[str]) -> frozenset[str]:
+        """
+        Роли, по которым проверяется выражение
+
+        :param client: Клиент. None - роли realm'а и клиента сервиса
+        :return: Множество ролей
+        """
+        return self.effective if client is None else self.clients.get(client, _EMPTY)
+
+
+class RoleExpression(ABC):
+    """
+    Выражение над ролями пользователя. Выражения комбинируются через & и |
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def matches(self, roles: UserRoles) -> bool:
+        ...
+
+    def __and__(self, other: "RoleExpression") -> "RoleExpression":
+        return _And(self, other)
+
+    def __or__(self, other: "RoleExpression") -> "RoleExpression":
+        return _Or(self, other)
+
+
+class AllOf(RoleExpression):
+    """
+    У пользователя есть все перечисленные роли
+    """
+
+    __slots__ = ("_roles", "_client")
+
+    def __init__(self, *roles: str, client: Optional[str] = None):
+        """
+        :param roles: Требуемые роли
+        :param client: Клиент, в ролях которого проверять. По умолчанию роли realm'а и клиента сервиса
+        """
+        self._roles = frozenset(roles)
+        self._client = client
+
+    def matches(self, roles: UserRoles) -> bool:
+        return self._roles <= roles.of(self._client)
+
+
+class AnyOf(RoleExpression):
+    """
+    У пользователя есть хотя бы одна из перечисленных ролей
+    """
+
+    __slots__ = ("_roles", "_client")
+
+    def __init__(self, *roles: str, client: Optional[str] = None):
+        """
+        :param roles: Допустимые роли
+        :param client: Клиент, в ролях которого проверять. По умолчанию роли realm'а и клиента сервиса
+        """
+        self._roles = frozenset(roles)
+        self._client = client
+
+    def matches(self, roles: UserRoles) -> bool:
+        return not self._roles.isdisjoint(roles.of(self._client))
+
+
+class _And(RoleExpression):
+    __slots__ = ("_left", "_right")
+
+    def __init__(self, left: RoleExpression, right: RoleExpression):
+        self._left = left
+        self._right = right
+
+    def matches(self, roles: UserRoles) -> bool:
+        return self._left.matches(roles) and self._right.matches(roles)
+
+
+class _Or(RoleExpression):
+    __slots__ = ("_left", "_right")
+
+    def __init__(self, left: RoleExpression, right: RoleExpression):
+        self._left = left
+        self._right = right
+
+    def matches(self, roles: UserRoles) -> bool:
+        return self._left.matches(roles) or self._right.matches(roles)
+
+
+def compile_roles(roles: Iterable[str] | RoleExpression) -> RoleExpression:
+    """
+    Приведение списка ролей к выражению. Список ролей означает, что нужны все роли
+
+    :param roles: Список ролей или выражение
+    :return: Выражение
+    """
+    return roles if isinstance(roles, RoleExpression) else AllOf(*roles)
@@ -0,0 +1,85 @@
+"""
+Запись большого числа строк: добавление объектов ORM против многострочного INSERT, upsert и COPY.
+Нужен Postgres из настроек POSTGRES_* (например, из docker compose)
+
+PYTHONPATH=app:app/libs python -m tests.benchmarks.bench_bulk_insert
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from infrastructure.config import config
+from infrastructure.db.base import BaseRepository
+from infrastructure.db.session import create_db_engine, create_session_factory
+from sqlalchemy import Column, Integer, String, text
+from sqlalchemy.orm import declarative_base
+
+Base = declarative_base()
+
+
+class BenchItem(Base):
+    __tablename__ = "bench_bulk_items"
+
+    id = Column(Integer, primary_key=True)
+    sku = Column(String, nullable=False, unique=True)
+    name = Column(String, nullable=False)
+
+
+def create_rows(count: int) -> list[dict]:
+    return [{"sku": f"sku-{i}", "name": f"item {i}"} for i in range(count)]
+
+
+async def orm(repository: BaseRepository, rows: list[dict]) -> None:
+    for row in rows:
+        repository.session.add(BenchItem(**row))
+        await repository.session.flush()
+
+
+async def orm_add_all(repository: BaseRepository, rows: list[dict]) -> None:
+    repository.session.add_all([BenchItem(**row) for row in rows])
+    await repository.session.flush()
+
+
+async def multi_row_insert(repository: BaseRepository, rows: list[dict]) -> None:
+    await repository.bulk_insert(BenchItem, rows)
+
+
+async def upsert(repository: BaseRepository, rows: list[dict]) -> None:
+    await repository.bulk_upsert(BenchItem, rows, index_elements=["sku"])
+
+
+async def copy(repository: BaseRepository, rows: list[dict]) -> None:
+    await repository.copy_records(BenchItem, [(row["sku"], row["name"]) for row in rows], columns=["sku", "name"])
+
+
+async def main(count: int = 20_000) -> None:
+    engine = create_db_engine(config.POSTGRES_CONFIG.URI)
+    session_factory = create_session_factory(engine)
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    cases: dict[str, Callable[[BaseRepository, list[dict]], Awaitable[None]]] = {
+        "orm add + flush": orm,
+        "orm add_all": orm_add_all,
+        "multi-row insert": multi_row_insert,
+        "upsert": upsert,
+        "copy": copy,
+    }
+    rows = create_rows(count)
+    try:
+        for name, write in cases.items():
+            async with session_factory() as session:
+                await session.execute(text(f"TRUNCATE {BenchItem.__tablename__}"))
+                started = time.perf_counter()
+                await write(BaseRepository(session), rows)
+                await session.commit()
+                elapsed = time.perf_counter() - started
+            print(f"{name:>18}: {count / elapsed:>10,.0f} rows/s")
+    finally:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,59 @@
+"""
+Пропускная способность: add_request_id на BaseHTTPMiddleware против CorrelationIdMiddleware
+
+PYTHONPATH=app:app/libs python -m tests.benchmarks.bench_correlation_middleware
+"""
+import asyncio
+import time
+import uuid
+from typing import Any, Callable, Coroutine
+
+from fastapi import FastAPI, Request, Response
+from httpx import ASGITransport, AsyncClient
+from structlog.contextvars import bind_contextvars, clear_contextvars
+from web.middlewares import CorrelationIdMiddleware
+
+
+def create_base_http_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def add_request_id(request: Request, call_next: Callable[[Any], Coroutine]) -> Response:
+        clear_contextvars()
+        bind_contextvars(x_correlation_id=str(uuid.uuid4()))
+        return await call_next(request)
+
+    return app
+
+
+def create_asgi_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CorrelationIdMiddleware)
+    return app
+
+
+async def measure(app: FastAPI, requests: int, concurrency: int) -> float:
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"status": "ok"}
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get("/ping")
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                await client.get("/ping")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+        return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int = 5_000, concurrency: int = 50) -> None:
+    for name, factory in (("BaseHTTPMiddleware", create_base_http_app), ("pure ASGI", create_asgi_app)):
+        rps = await measure(factory(), requests, concurrency)
+        print(f"{name:>20}: {rps:8.0f} req/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""
+Переиспользование соединений: новый AsyncClient на каждый сервис против общего HTTPClientPool
+
+PYTHONPATH=app:app/libs python -m tests.benchmarks.bench_http_pool
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable
+
+from httpx import AsyncClient
+from infrastructure.http.pool import HTTPClientPool
+from opentelemetry.instrumentation.httpx import HTTPXClientInstrumentor
+
+RESPONSE = b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 15\r\n\r\n{"status":"ok"}'
+
+
+class StubServer:
+    """
+    Минимальный HTTP/1.1 сервер с keep-alive, считающий открытые соединения
+    """
+
+    def __init__(self):
+        self.connections = 0
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(RESPONSE)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def measure(send: Callable[[], Awaitable[None]], requests: int, concurrency: int) -> float:
+    async def worker(count: int) -> None:
+        for _ in range(count):
+            await send()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(requests // concurrency) for _ in range(concurrency)))
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int = 2_000, concurrency: int = 20) -> None:
+    for name in ("client per service", "shared pool"):
+        server = StubServer()
+        base_url = await server.start()
+        pool = HTTPClientPool()
+
+        async def send() -> None:
+            if name == "shared pool":
+                await pool.get(base_url).get("/")
+                return
+            # так вел себя providers.Factory(AsyncClient): новый пул и инструментирование на каждый сервис
+            async with AsyncClient(base_url=base_url) as client:
+                HTTPXClientInstrumentor().instrument_client(client=client)
+                await client.get("/")
+
+        rps = await measure(send, requests, concurrency)
+        await pool.aclose()
+        await server.stop()
+        print(f"{name:>20}: {rps:8.0f} req/s, {server.connections:5d} connections")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,70 @@
+"""
+Разбор больших ответов: response.json() против orjson, с валидацией в модель и без нее
+
+PYTHONPATH=app:app/libs python -m tests.benchmarks.bench_response_decoding
+"""
+import time
+from typing import Any, Callable, Optional
+
+import orjson
+from common.dto.base import CustomModel
+from httpx import Response
+from infrastructure.http.decoders import JsonDecoder, ModelDecoder
+
+
+class Region(CustomModel):
+    region_code: str
+    name: str
+
+
+class Country(CustomModel):
+    country_id: int
+    name: str
+    population: int
+    area: float
+    tags: list[str]
+    regions: list[Region]
+    capital: Optional[Region] = None
+
+
+def create_payload(countries: int) -> bytes:
+    return orjson.dumps(
+        [
+            {
+                "countryId": i,
+                "name": f"Country {i}",
+                "population": i * 1000,
+                "area": i * 1.5,
+                "tags": ["a", "b", "c"],
+                "regions": [{"regionCode": str(j), "name": f"Region {j}"} for j in range(10)],
+                "capital": {"regionCode": "0", "name": "Capital"},
+            }
+            for i in range(countries)
+        ]
+    )
+
+
+def measure(decode: Callable[[bytes], Any], content: bytes, rounds: int) -> float:
+    decode(content)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        decode(content)
+    return (time.perf_counter() - started) / rounds * 1000
+
+
+def main(countries: int = 5_000, rounds: int = 10) -> None:
+    content = create_payload(countries)
+    print(f"payload: {len(content) / 1024 / 1024:.1f} MiB")
+
+    cases = {
+        "response.json()": lambda body: Response(200, content=body).json(),
+        "orjson": JsonDecoder().decode,
+        "orjson + parse_obj": ModelDecoder(list[Country]).decode,
+        "orjson + construct": ModelDecoder(list[Country], validate=False).decode,
+    }
+    for name, decode in cases.items():
+        print(f"{name:>20}: {measure(decode, content, rounds):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Отдача PaginationResult на 1000 вложенных моделей: путь FastAPI по умолчанию
+(валидация response_model, jsonable_encoder, ORJSONResponse) против TrustedModelRoute с ModelORJSONResponse
+
+PYTHONPATH=app:app/libs python -m tests.benchmarks.bench_response_serialization
+"""
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+
+from common.dto import BaseResult
+from common.dto.pagination import PageInfo, PaginationResult
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import ORJSONResponse
+from httpx import ASGITransport, AsyncClient
+from web.responses import ModelORJSONResponse, TrustedModelRoute
+
+
+class Tag(BaseResult):
+    tag_name: str
+
+
+class Item(BaseResult):
+    item_id: UUID
+    display_name: str
+    created_at: datetime
+    quantity: int
+    tags: list[Tag]
+    parent_tag: Optional[Tag] = None
+
+
+def create_page(count: int) -> PaginationResult[Item]:
+    return PaginationResult[Item](
+        items=[
+            Item(
+                item_id=UUID(int=i),
+                display_name=f"item {i}",
+                created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                quantity=i,
+                tags=[Tag(tag_name="new"), Tag(tag_name="sale")],
+                parent_tag=Tag(tag_name="root"),
+            )
+            for i in range(count)
+        ],
+        total_count=count,
+        page=PageInfo(page_number=1, page_size=count),
+    )
+
+
+def create_app(page: PaginationResult[Item]) -> FastAPI:
+    default_router = APIRouter()
+    trusted_router = APIRouter(route_class=TrustedModelRoute)
+
+    @default_router.get("/default")
+    async def default() -> PaginationResult[Item]:
+        return page
+
+    @trusted_router.get("/trusted")
+    async def trusted() -> PaginationResult[Item]:
+        return page
+
+    app = FastAPI(default_response_class=ModelORJSONResponse)
+    app.include_router(default_router, default_response_class=ORJSONResponse)
+    app.include_router(trusted_router)
+    return app
+
+
+async def measure(client: AsyncClient, path: str, requests: int) -> float:
+    body = (await client.get(path)).content
+    started = time.perf_counter()
+    for _ in range(requests):
+        assert (await client.get(path)).content == body
+    return (time.perf_counter() - started) / requests
+
+
+async def main(count: int = 1000, requests: int = 200) -> None:
+    client = AsyncClient(transport=ASGITransport(app=create_app(create_page(count))), base_url="http://test")
+    async with client:
+        for name in ("default", "trusted"):
+            elapsed = await measure(client, f"/{name}", requests)
+            print(f"{name:>8}: {elapsed * 1000:>7.2f} ms/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""
+Накладные расходы инструментирования цикла ретраев на успешный вызов:
+f-строки в логах, как было раньше, против хуков, которые вызываются только при наличии
+
+PYTHONPATH=app:app/libs python -m tests.benchmarks.bench_retry_instrumentation
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from httpx_backoff._retry import RetryEngine
+from httpx_backoff.backoff_options import Expo
+from httpx_backoff.hooks import LoggingRetryHooks
+from infrastructure.http.metrics import RetryMetricsHooks
+
+logger = logging.getLogger("httpx_backoff")
+
+
+async def attempt() -> int:
+    return 200
+
+
+def legacy(engine: RetryEngine) -> Callable[[], Awaitable[int]]:
+    """
+    Логи прежнего цикла: строки форматируются на каждом вызове, даже если DEBUG выключен
+    """
+
+    async def run() -> int:
+        start = datetime.now()
+        logger.info(f"Starting request on {start.isoformat()}")
+        attempts = 1
+        logger.debug(f"Attempts: {attempts}")
+        result = await engine.run(attempt, retry_on_result=lambda status: status >= 500, budget_key="host")
+        logger.debug(f"Elapsed time: {(datetime.now() - start).total_seconds()}")
+        return result
+
+    return run
+
+
+def current(engine: RetryEngine) -> Callable[[], Awaitable[int]]:
+    async def run() -> int:
+        return await engine.run(attempt, retry_on_result=lambda status: status >= 500, budget_key="host")
+
+    return run
+
+
+async def measure(call: Callable[[], Awaitable[int]], rounds: int) -> float:
+    await call()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        await call()
+    return (time.perf_counter() - started) / rounds * 1_000_000
+
+
+async def main(rounds: int = 200_000) -> None:
+    logging.basicConfig(level=logging.WARNING)
+
+    cases = {
+        "f-string logs": legacy(RetryEngine(backoff_option=Expo)),
+        "no hooks": current(RetryEngine(backoff_option=Expo)),
+        "logging hooks": current(RetryEngine(backoff_option=Expo, hooks=LoggingRetryHooks())),
+        "otel metrics hooks": current(RetryEngine(backoff_option=Expo, hooks=RetryMetricsHooks())),
+    }
+    for name, call in cases.items():
+        print(f"{name:>20}: {await measure(call, rounds):.2f} us/call")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+"""
+Накладные расходы проверки ролей на запрос: до и после предкомпиляции ролей
+
+PYTHONPATH=app:app/libs python -m tests.benchmarks.bench_roles
+"""
+import timeit
+
+from opentelemetry import trace
+from web.roles import UserRoles, compile_roles
+
+tracer = trace.get_tracer(__name__)
+
+CLIENT_ID = "service"
+REQUIRED_ROLES = ["read", "write"]
+TOKEN_PAYLOAD = {
+    "realm_access": {"roles": [f"realm-role-{i}" for i in range(20)]},
+    "resource_access": {CLIENT_ID: {"roles": ["read", "write", *(f"client-role-{i}" for i in range(20))]}},
+}
+
+
+def legacy_check() -> bool:
+    with tracer.start_as_current_span("RolesKeycloakMiddleware._get_roles_from_token_payload"):
+        realm_access = TOKEN_PAYLOAD.get("realm_access", {})
+        resource_access = TOKEN_PAYLOAD.get("resource_access", {})
+        client_access = resource_access.get(CLIENT_ID, {})
+        roles = client_access.get("roles", []) + realm_access.get("roles", [])
+
+    with tracer.start_as_current_span("RolesKeycloakMiddleware._check_user_access_roles"):
+        return set(REQUIRED_ROLES).issubset(set(roles))
+
+
+expression = compile_roles(REQUIRED_ROLES)
+cached_roles = UserRoles.from_token_payload(TOKEN_PAYLOAD, CLIENT_ID)
+
+
+def compiled_check() -> bool:
+    return expression.matches(cached_roles)
+
+
+def main(number: int = 200_000) -> None:
+    for name, func in (("legacy", legacy_check), ("compiled", compiled_check)):
+        seconds = min(timeit.repeat(func, number=number, repeat=5))
+        print(f"{name:>10}: {seconds / number * 1e9:8.1f} ns/request")
+
+
+if __name__ == "__main__":
+    main()
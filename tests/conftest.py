@@ -2,7 +2,7 @@ import datetime
 import uuid
 
 import pytest
-from httpx import AsyncClient
+from httpx import ASGITransport, AsyncClient
 from jose import jwt
 
 from app.infrastructure.config import Config
@@ -34,7 +34,7 @@ def fastapi_app(container):
 
 @pytest.fixture()
 async def async_test_client(fastapi_app):
-    async with AsyncClient(app=fastapi_app, base_url="http://test") as client:
+    async with AsyncClient(transport=ASGITransport(app=fastapi_app), base_url="http://test") as client:
         yield client
 
 
@@ -0,0 +1,188 @@
+import asyncio
+from typing import Optional
+
+import pytest
+
+from app.common.dto import BaseCommand, BaseQuery, BaseResult
+from app.common.interfaces.command import ICommandHandler
+from app.common.interfaces.query import IQueryHandler
+from app.infrastructure.commands.cache import InvalidatingCommandHandler
+from app.infrastructure.queries.cache import CachedQueryHandler, QueryCache
+from tests.utils.clock import FakeClock
+
+
+class UserQuery(BaseQuery):
+    user_id: int
+
+
+class UserResult(BaseResult):
+    user_id: int
+    name: str
+
+
+class RenameUser(BaseCommand):
+    user_id: int
+    name: str
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: bytes, px: int) -> None:
+        self.values[key] = value
+
+    async def incr(self, key: str) -> int:
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    async def mget(self, keys: list[str]) -> list:
+        return [self.values.get(key) for key in keys]
+
+
+class UserQueryHandler(IQueryHandler[UserQuery, UserResult]):
+    def __init__(self, users: dict[int, str], release: asyncio.Event = None):
+        self.users = users
+        self.calls = 0
+        self.release = release
+
+    async def ask(self, query: UserQuery) -> UserResult:
+        self.calls += 1
+        # данные читаются до ожидания, как запрос к базе, начатый до изменения
+        name = self.users[query.user_id]
+        if self.release is not None:
+            await self.release.wait()
+        return UserResult(user_id=query.user_id, name=name)
+
+
+class RenameUserHandler(ICommandHandler[RenameUser, None]):
+    def __init__(self, users: dict[int, str]):
+        self.users = users
+
+    async def execute(self, command: RenameUser) -> None:
+        self.users[command.user_id] = command.name
+
+
+def user_tags(query) -> list[str]:
+    return [f"user:{query.user_id}"]
+
+
+@pytest.mark.anyio
+class TestQueryCache:
+    async def test_repeated_query_is_served_from_cache(self):
+        handler = UserQueryHandler({1: "alice", 2: "bob"})
+        cached = CachedQueryHandler(handler, QueryCache(beta=0), tags=user_tags)
+
+        assert (await cached.ask(UserQuery(user_id=1))).name == "alice"
+        assert (await cached.ask(UserQuery(user_id=1))).name == "alice"
+        assert (await cached.ask(UserQuery(user_id=2))).name == "bob"
+        assert handler.calls == 2
+
+    async def test_command_invalidates_tagged_results(self):
+        users = {1: "alice", 2: "bob"}
+        cache, handler = QueryCache(beta=0), UserQueryHandler(users)
+        cached = CachedQueryHandler(handler, cache, tags=user_tags)
+        rename = InvalidatingCommandHandler(RenameUserHandler(users), cache, tags=user_tags)
+        await cached.ask(UserQuery(user_id=1))
+        await cached.ask(UserQuery(user_id=2))
+
+        await rename.execute(RenameUser(user_id=1, name="carol"))
+
+        assert (await cached.ask(UserQuery(user_id=1))).name == "carol"
+        assert (await cached.ask(UserQuery(user_id=2))).name == "bob"
+        assert handler.calls == 3
+
+    async def test_result_expires_after_ttl(self):
+        clock = FakeClock(1000.0)
+        handler = UserQueryHandler({1: "alice"})
+        cached = CachedQueryHandler(handler, QueryCache(beta=0, clock=clock), ttl=10)
+
+        await cached.ask(UserQuery(user_id=1))
+        clock.now += 11
+        await cached.ask(UserQuery(user_id=1))
+
+        assert handler.calls == 2
+
+    async def test_early_refresh_before_expiry(self):
+        clock = FakeClock(1000.0)
+        handler = UserQueryHandler({1: "alice"})
+        # чем больше beta, тем раньше обновление: при огромном beta запись обновляется почти сразу
+        cached = CachedQueryHandler(handler, QueryCache(beta=1e9, clock=clock), ttl=10)
+        handler_delay = 0.01
+
+        async def slow_ask(query):
+            clock.now += handler_delay
+            return await UserQueryHandler.ask(handler, query)
+
+        handler.ask = slow_ask
+        await cached.ask(UserQuery(user_id=1))
+        await cached.ask(UserQuery(user_id=1))
+
+        assert handler.calls == 2
+
+    async def test_concurrent_misses_share_one_call(self):
+        release = asyncio.Event()
+        handler = UserQueryHandler({1: "alice"}, release)
+        cache = QueryCache(beta=0)
+        cached = CachedQueryHandler(handler, cache)
+
+        waiters = [asyncio.create_task(cached.ask(UserQuery(user_id=1))) for _ in range(10)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert {result.name for result in await asyncio.gather(*waiters)} == {"alice"}
+        assert handler.calls == 1
+
+    async def test_query_after_invalidation_does_not_join_stale_compute(self):
+        release, users = asyncio.Event(), {1: "alice"}
+        cache, handler = QueryCache(beta=0), UserQueryHandler(users, release)
+        cached = CachedQueryHandler(handler, cache, tags=user_tags)
+        rename = InvalidatingCommandHandler(RenameUserHandler(users), cache, tags=user_tags)
+        before = asyncio.create_task(cached.ask(UserQuery(user_id=1)))
+        await asyncio.sleep(0.01)
+
+        await rename.execute(RenameUser(user_id=1, name="carol"))
+        after = asyncio.create_task(cached.ask(UserQuery(user_id=1)))
+        await asyncio.sleep(0.01)
+        release.set()
+
+        assert ((await before).name, (await after).name) == ("alice", "carol")
+        assert handler.calls == 2
+
+    async def test_redis_tier_is_shared_between_processes(self):
+        redis, users = FakeRedis(), {1: "alice"}
+        first, second = UserQueryHandler(users), UserQueryHandler(users)
+        first_cache, second_cache = QueryCache(redis, beta=0), QueryCache(redis, beta=0, tag_version_ttl=0)
+
+        await CachedQueryHandler(first, first_cache, tags=user_tags).ask(UserQuery(user_id=1))
+        result = await CachedQueryHandler(second, second_cache, tags=user_tags).ask(UserQuery(user_id=1))
+
+        assert type(result).__name__ == "UserResult"
+        assert (result.user_id, result.name, second.calls) == (1, "alice", 0)
+
+    async def test_invalidation_is_shared_through_redis(self):
+        redis, users = FakeRedis(), {1: "alice"}
+        handler = UserQueryHandler(users)
+        reader = CachedQueryHandler(handler, QueryCache(redis, beta=0, tag_version_ttl=0), tags=user_tags)
+        rename = InvalidatingCommandHandler(RenameUserHandler(users), QueryCache(redis), tags=user_tags)
+        await reader.ask(UserQuery(user_id=1))
+
+        await rename.execute(RenameUser(user_id=1, name="carol"))
+
+        assert (await reader.ask(UserQuery(user_id=1))).name == "carol"
+        assert handler.calls == 2
+
+    async def test_other_tags_keep_results(self):
+        users = {1: "alice"}
+        cache, handler = QueryCache(beta=0), UserQueryHandler(users)
+        cached = CachedQueryHandler(handler, cache, tags=user_tags)
+        rename = InvalidatingCommandHandler(RenameUserHandler({}), cache, tags=["user:2"])
+        await cached.ask(UserQuery(user_id=1))
+
+        await rename.execute(RenameUser(user_id=2, name="bob"))
+        await cached.ask(UserQuery(user_id=1))
+
+        assert handler.calls == 1
@@ -0,0 +1,139 @@
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table
+from sqlalchemy.dialects import postgresql
+
+from app.infrastructure.db.base import BaseRepository
+from app.infrastructure.db.bulk import MAX_BIND_PARAMS
+
+items = Table(
+    "items",
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("sku", String, nullable=False, unique=True),
+    Column("name", String),
+)
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        compiled = statement.compile(dialect=postgresql.dialect())
+        rows = len([name for name in compiled.params if name.startswith("sku_m")])
+        return FakeResult([(i,) for i in range(rows)])
+
+
+def rows(count, start=0):
+    return [{"sku": f"sku-{i}", "name": f"item {i}"} for i in range(start, start + count)]
+
+
+@pytest.mark.anyio
+class TestBulkWrites:
+    async def test_insert_in_chunks_with_returning(self):
+        session = FakeSession()
+
+        ids = await BaseRepository(session).bulk_insert(items, iter(rows(25)), chunk_size=10, returning=[items.c.id])
+
+        assert len(session.statements) == 3
+        assert len(ids) == 25
+        sql = str(session.statements[0].compile(dialect=postgresql.dialect()))
+        assert sql.startswith("INSERT INTO items (sku, name) VALUES") and sql.endswith("RETURNING items.id")
+
+    async def test_chunk_size_respects_bind_limit(self):
+        session = FakeSession()
+
+        await BaseRepository(session).bulk_insert(items, rows(20_000), chunk_size=None)
+
+        assert [len(statement._multi_values[0]) for statement in session.statements] == [
+            MAX_BIND_PARAMS // 2,
+            20_000 - MAX_BIND_PARAMS // 2,
+        ]
+
+    async def test_upsert_deduplicates_conflict_keys(self):
+        session = FakeSession()
+
+        await BaseRepository(session).bulk_upsert(
+            items, [*rows(3), {"sku": "sku-1", "name": "renamed"}], index_elements=["sku"]
+        )
+
+        statement = session.statements[0]
+        sql = str(statement.compile(dialect=postgresql.dialect()))
+        assert [row["name"] for row in statement._multi_values[0]] == ["item 0", "renamed", "item 2"]
+        assert sql.endswith("ON CONFLICT (sku) DO UPDATE SET name = excluded.name")
+
+    async def test_nothing_to_write(self):
+        session = FakeSession()
+
+        assert await BaseRepository(session).bulk_upsert(items, [], index_elements=["sku"]) == []
+        assert session.statements == []
+
+
+class FakeDriverConnection:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def copy_records_to_table(self, table_name, *, records, columns, schema_name):
+        self.calls.append(("copy", table_name, list(records), columns, schema_name))
+        return "COPY 2"
+
+
+class FakeAdaptedConnection:
+    def __init__(self, calls, started=False):
+        self.calls = calls
+        self._started = started
+        self.driver_connection = FakeDriverConnection(calls)
+
+    async def _start_transaction(self):
+        self.calls.append(("begin",))
+        self._started = True
+
+
+class FakeRawConnection:
+    def __init__(self, adapted):
+        self.dbapi_connection = adapted
+        self.driver_connection = adapted.driver_connection
+
+
+class FakeConnection:
+    def __init__(self, adapted):
+        self.adapted = adapted
+
+    async def get_raw_connection(self):
+        return FakeRawConnection(self.adapted)
+
+
+class FakeCopySession:
+    def __init__(self, started=False):
+        self.calls = []
+        self.adapted = FakeAdaptedConnection(self.calls, started)
+
+    async def connection(self):
+        return FakeConnection(self.adapted)
+
+
+@pytest.mark.anyio
+class TestCopyRecords:
+    async def test_copy_starts_session_transaction(self):
+        session = FakeCopySession()
+
+        copied = await BaseRepository(session).copy_records(items, [("a", "A"), ("b", "B")], columns=("sku", "name"))
+
+        assert copied == 2
+        assert session.calls == [("begin",), ("copy", "items", [("a", "A"), ("b", "B")], ["sku", "name"], None)]
+
+    async def test_copy_joins_started_transaction(self):
+        session = FakeCopySession(started=True)
+
+        await BaseRepository(session).copy_records(items, [("a", "A")], columns=["sku", "name"])
+
+        assert [call[0] for call in session.calls] == ["copy"]
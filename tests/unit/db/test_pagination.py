@@ -0,0 +1,117 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from common.errors import ValidationBusinessError
+from pydantic import ValidationError
+from sqlalchemy import Column, DateTime, Integer, MetaData, Numeric, String, Table, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.common.dto.pagination import MAX_PAGE_SIZE, CursorPaginationQuery
+from app.infrastructure.db.base import BaseRepository
+from app.infrastructure.db.pagination import SortKey, decode_cursor, encode_cursor, paginate_keyset, seek_predicate
+
+orders = Table(
+    "orders",
+    MetaData(),
+    Column("id", UUID(as_uuid=True), primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("number", Integer, nullable=False),
+    Column("title", String),
+    Column("amount", Numeric),
+)
+
+
+def compile_sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self._rows = rows
+
+    def all(self):
+        return self._rows
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.rows[: statement._limit])
+
+
+def test_cursor_restores_column_types():
+    sort_key = [SortKey(orders.c.created_at), SortKey(orders.c.id)]
+    values = [datetime(2024, 1, 2, 3, 4, 5), uuid.uuid4()]
+
+    assert decode_cursor(encode_cursor(values), sort_key) == values
+
+
+@pytest.mark.parametrize(
+    "cursor, column",
+    [
+        ("not a cursor", orders.c.number),
+        (encode_cursor([1, 2, 3]), orders.c.number),
+        (encode_cursor(["not a number"]), orders.c.amount),
+    ],
+)
+def test_invalid_cursor(cursor, column):
+    with pytest.raises(ValidationBusinessError) as error:
+        decode_cursor(cursor, [SortKey(column)])
+
+    assert error.value.status == "400"
+
+
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE_SIZE + 1])
+def test_page_size_is_bounded(limit):
+    with pytest.raises(ValidationError):
+        CursorPaginationQuery(limit=limit)
+
+
+def test_seek_predicate_uses_row_comparison():
+    sort_key = [SortKey(orders.c.created_at, descending=True), SortKey(orders.c.id, descending=True)]
+
+    sql = compile_sql(seek_predicate(sort_key, [datetime(2024, 1, 1), uuid.uuid4()]))
+
+    assert sql == "(orders.created_at, orders.id) < (%(param_1)s, %(param_2)s)"
+
+
+def test_seek_predicate_with_mixed_directions():
+    sort_key = [SortKey(orders.c.number, descending=True), SortKey(orders.c.id)]
+
+    sql = compile_sql(seek_predicate(sort_key, [10, uuid.uuid4()]))
+
+    assert sql == "orders.number < %(param_1)s OR orders.number = %(param_1)s AND orders.id > %(param_2)s"
+
+
+@pytest.mark.anyio
+async def test_paginate_returns_next_cursor():
+    rows = [(f"title-{i}", i) for i in range(3)]
+    session = FakeSession(rows)
+    sort_key = [SortKey(orders.c.number)]
+    statement = select(orders.c.title).order_by(orders.c.title)
+
+    page = await BaseRepository(session).paginate(statement, sort_key, CursorPaginationQuery(limit=2))
+
+    assert page.items == ["title-0", "title-1"]
+    assert decode_cursor(page.next_cursor, sort_key) == [1]
+
+    last = await BaseRepository(FakeSession(rows[2:])).paginate(
+        statement, sort_key, CursorPaginationQuery(limit=2, cursor=page.next_cursor)
+    )
+    assert last.items == ["title-2"]
+    assert last.next_cursor is None
+
+    sql = compile_sql(session.statements[0])
+    assert "ORDER BY orders.number ASC" in sql and "OFFSET" not in sql
+
+
+@pytest.mark.anyio
+async def test_paginate_rejects_empty_page():
+    with pytest.raises(ValidationBusinessError):
+        await paginate_keyset(FakeSession([]), select(orders.c.title), [SortKey(orders.c.number)], limit=0)
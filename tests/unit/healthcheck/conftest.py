@@ -1,3 +1,4 @@
+import asyncio
 import random
 from typing import Type
 
@@ -27,6 +28,20 @@ class FailedMockCommand(BaseCommand):
         )
 
 
+class SlowMockCommand(BaseCommand):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.cancelled = False
+
+    async def execute(self) -> CommandResult:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return CommandResult(status=Status.HEALTHY, duration=self.delay)
+
+
 @pytest.fixture()
 def successful_mock_command() -> SuccessfulMockCommand:
     return SuccessfulMockCommand()
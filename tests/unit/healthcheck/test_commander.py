@@ -1,6 +1,54 @@
 import pytest
 
+from app.infrastructure.config import HealthCheckConfig
+from app.web.healthcheck.commander import HealthCheckCommander
+from app.web.healthcheck.status import Status
+from tests.unit.healthcheck.conftest import SlowMockCommand
+
 
 @pytest.mark.asyncio
 async def test_commander():
     ...
+
+
+def make_commander(command_handler, **config) -> HealthCheckCommander:
+    return HealthCheckCommander(
+        liveness_handler=command_handler,
+        readiness_handler=command_handler,
+        monitor_handler=command_handler,
+        healthcheck_config=HealthCheckConfig(**config),
+    )
+
+
+@pytest.mark.anyio
+class TestHealthCheckCommander:
+    async def test_commands_run_concurrently(self, command_handler):
+        for name in ("first", "second", "third"):
+            command_handler.add_healthcheck_command(name, SlowMockCommand(delay=0.1))
+
+        result = await make_commander(command_handler).run_readiness_route()
+
+        assert result.status == Status.HEALTHY
+        assert result.total_duration < 0.25
+
+    async def test_timed_out_command_is_unhealthy(self, command_handler, successful_mock_command):
+        command_handler.add_healthcheck_command("fast", successful_mock_command)
+        command_handler.add_healthcheck_command("hung", SlowMockCommand(delay=10))
+
+        result = await make_commander(command_handler, COMMAND_TIMEOUT=0.05).run_monitor_route()
+
+        assert result.status == Status.UNHEALTHY
+        assert result.entries["fast"]["status"] == Status.HEALTHY
+        assert result.entries["hung"]["status"] == Status.UNHEALTHY
+        assert result.entries["hung"]["description"] == "Healthcheck command timed out"
+        assert result.total_duration < 1
+
+    async def test_overall_deadline(self, command_handler):
+        command = SlowMockCommand(delay=10)
+        command_handler.add_healthcheck_command("hung", command)
+
+        result = await make_commander(command_handler, COMMAND_TIMEOUT=5, TOTAL_TIMEOUT=0.05).run_liveness_route()
+
+        assert result.entries["hung"]["description"] == "Overall healthcheck deadline exceeded"
+        assert result.total_duration < 1
+        assert command.cancelled
@@ -0,0 +1,73 @@
+import pytest
+
+from app.infrastructure.config import HealthCheckConfig
+from app.web.healthcheck.commander import HealthCheckCommander
+from app.web.healthcheck.scheduler import HealthCheckScheduler
+from app.web.healthcheck.status import Status
+from tests.unit.healthcheck.conftest import SuccessfulMockCommand
+from tests.utils.clock import FakeClock
+
+
+class CountingMockCommand(SuccessfulMockCommand):
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self):
+        self.calls += 1
+        return await super().execute()
+
+
+@pytest.mark.anyio
+class TestHealthCheckScheduler:
+    @pytest.fixture()
+    def command(self) -> CountingMockCommand:
+        return CountingMockCommand()
+
+    @pytest.fixture()
+    def clock(self) -> FakeClock:
+        return FakeClock()
+
+    @pytest.fixture()
+    async def scheduler(self, command_handler, command, clock):
+        command_handler.add_healthcheck_command("service", command)
+        commander = HealthCheckCommander(
+            liveness_handler=command_handler,
+            readiness_handler=command_handler,
+            monitor_handler=command_handler,
+            healthcheck_config=HealthCheckConfig(),
+        )
+        scheduler = HealthCheckScheduler(commander, interval=3600, max_age=30, clock=clock)
+        yield scheduler
+        await scheduler.stop()
+
+    async def test_inline_run_when_not_started(self, scheduler, command):
+        await scheduler.readiness()
+        await scheduler.readiness()
+
+        assert command.calls == 2
+
+    async def test_snapshot_is_served_while_running(self, scheduler, command):
+        await scheduler.start()
+        first = await scheduler.readiness()
+        calls = command.calls
+
+        assert await scheduler.readiness() is first
+        assert command.calls == calls
+
+    async def test_stale_snapshot_is_unhealthy(self, scheduler, clock):
+        await scheduler.start()
+        assert (await scheduler.liveness()).status == Status.HEALTHY
+
+        clock.now = 31
+        result = await scheduler.liveness()
+
+        assert result.status == Status.UNHEALTHY
+        assert "scheduler" in result.entries
+
+    async def test_stop_waits_for_refresh_task(self, scheduler):
+        await scheduler.start()
+        task = scheduler._task
+
+        await scheduler.stop()
+
+        assert task.done() and not scheduler.is_running
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+from app.infrastructure.http.cache import CachedResponse, InMemoryResponseCacheBackend, ResponseCache
+from app.infrastructure.http.services import SimpleJsonHTTPService
+from app.utils.single_flight import SingleFlight
+from tests.utils.clock import FakeClock
+
+
+class CachedService(SimpleJsonHTTPService):
+    CACHE_RESPONSES = True
+
+
+class Upstream:
+    def __init__(self, cache_control: str, etag: str = '"v1"', **headers: str):
+        self.requests: list[Request] = []
+        self._headers = {"Cache-Control": cache_control, "ETag": etag, **headers}
+
+    def __call__(self, request: Request) -> Response:
+        self.requests.append(request)
+        if request.headers.get("If-None-Match") == self._headers["ETag"]:
+            return Response(304, headers=self._headers)
+        return Response(200, json={"version": len(self.requests)}, headers=self._headers)
+
+
+def create_service(upstream: Upstream, clock: FakeClock) -> tuple[CachedService, ResponseCache]:
+    cache = ResponseCache(InMemoryResponseCacheBackend(maxsize=10, clock=clock), clock=clock)
+    client = PredicateClient(
+        lambda response: response.status_code >= 500,
+        client=AsyncClient(transport=MockTransport(upstream), base_url="http://reference.local"),
+        backoff_option=lambda: Constant(interval=0),
+        attempts=1,
+    )
+    return CachedService(retry_client=client, single_flight=SingleFlight(), response_cache=cache), cache
+
+
+@pytest.mark.anyio
+class TestResponseCache:
+    async def test_fresh_response_is_served_from_cache(self):
+        clock, upstream = FakeClock(1000.0), Upstream("max-age=60")
+        service, cache = create_service(upstream, clock)
+
+        assert await service.request(method="GET", url="/countries") == {"version": 1}
+        clock.now += 59
+        assert await service.request(method="GET", url="/countries") == {"version": 1}
+
+        assert len(upstream.requests) == 1
+        assert cache.hit_ratio("CachedService") == 0.5
+
+    async def test_stale_response_is_revalidated_with_etag(self):
+        clock, upstream = FakeClock(1000.0), Upstream("max-age=60")
+        service, cache = create_service(upstream, clock)
+
+        await service.request(method="GET", url="/countries")
+        clock.now += 61
+
+        assert await service.request(method="GET", url="/countries") == {"version": 1}
+        assert upstream.requests[-1].headers["If-None-Match"] == '"v1"'
+        assert cache.revalidated["CachedService"] == 1
+
+        # после 304 ответ снова свежий
+        await service.request(method="GET", url="/countries")
+        assert len(upstream.requests) == 2
+
+    async def test_stale_while_revalidate_serves_stale_and_refreshes_in_background(self):
+        clock, upstream = FakeClock(1000.0), Upstream("max-age=60, stale-while-revalidate=30", etag='"v2"')
+        service, cache = create_service(upstream, clock)
+
+        await service.request(method="GET", url="/countries")
+        clock.now += 70
+
+        assert await service.request(method="GET", url="/countries") == {"version": 1}
+        await asyncio.sleep(0.01)
+
+        assert len(upstream.requests) == 2
+        assert cache.revalidated["CachedService"] == 1
+
+    async def test_no_store_response_is_not_cached(self):
+        clock, upstream = FakeClock(1000.0), Upstream("no-store")
+        service, _ = create_service(upstream, clock)
+
+        await service.request(method="GET", url="/countries")
+        await service.request(method="GET", url="/countries")
+
+        assert len(upstream.requests) == 2
+
+    @pytest.mark.parametrize("headers", [{"Cache-Control": "private, max-age=60"}, {"Vary": "*"}])
+    async def test_private_and_vary_all_responses_are_not_cached(self, headers):
+        clock, upstream = FakeClock(1000.0), Upstream("max-age=60", **headers)
+        service, _ = create_service(upstream, clock)
+
+        await service.request(method="GET", url="/countries")
+        await service.request(method="GET", url="/countries")
+
+        assert len(upstream.requests) == 2
+
+    async def test_vary_headers_select_the_entry(self):
+        clock, upstream = FakeClock(1000.0), Upstream("max-age=60", Vary="X-Region")
+        service, _ = create_service(upstream, clock)
+
+        first = await service.request(method="GET", url="/countries", headers={"X-Region": "eu"})
+        other_region = await service.request(method="GET", url="/countries", headers={"X-Region": "us"})
+        same_region = await service.request(method="GET", url="/countries", headers={"X-Region": "us"})
+
+        assert (first, other_region, same_region) == ({"version": 1}, {"version": 2}, {"version": 2})
+        # без записи для этих заголовков запрос не условный
+        assert "If-None-Match" not in upstream.requests[1].headers
+
+    async def test_not_modified_without_entry_is_an_error(self):
+        clock = FakeClock(1000.0)
+        service, _ = create_service(lambda request: Response(304), clock)
+
+        with pytest.raises(Exception) as error:
+            await service.request(method="GET", url="/countries")
+
+        assert type(error.value).__name__ == "ValidationBusinessError"
+
+
+class TestCachedResponse:
+    def test_serialization_roundtrip(self):
+        response = Response(200, json={"a": 1}, headers={"Cache-Control": "max-age=10, no-transform", "Age": "4"})
+        entry = CachedResponse.from_response(response, now=100)
+
+        restored = CachedResponse.loads(entry.dumps())
+
+        assert restored.to_response().json() == {"a": 1}
+        assert (restored.max_age, restored.is_fresh(105), restored.is_fresh(106)) == (6, True, False)
+
+    def test_revalidated_entry_subtracts_age(self):
+        entry = CachedResponse.from_response(Response(200, headers={"Cache-Control": "max-age=10", "ETag": '"a"'}), 100)
+
+        revalidated = entry.revalidated(Response(304, headers={"Cache-Control": "max-age=10", "Age": "4"}), now=200)
+
+        assert revalidated.max_age == 6
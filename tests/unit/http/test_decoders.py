@@ -0,0 +1,65 @@
+from typing import Optional
+
+import orjson
+import pytest
+from httpx import Response
+from pydantic import ValidationError
+
+from app.common.dto.base import CustomModel
+from app.infrastructure.http.decoders import JsonDecoder, ModelDecoder
+from app.infrastructure.http.services import SimpleJsonHTTPService
+
+
+class Region(CustomModel):
+    region_code: str
+
+
+class Country(CustomModel):
+    country_id: int
+    regions: list[Region]
+    capital: Optional[Region] = None
+
+
+PAYLOAD = orjson.dumps(
+    [
+        {"countryId": 1, "regions": [{"regionCode": "77"}], "capital": {"regionCode": "77"}},
+        {"countryId": 2, "regions": []},
+    ]
+)
+
+
+class TestDecoders:
+    def test_json_decoder(self):
+        assert JsonDecoder().decode(PAYLOAD)[1] == {"countryId": 2, "regions": []}
+        assert JsonDecoder().decode(b"") is None
+
+    @pytest.mark.parametrize("validate", [True, False])
+    def test_model_decoder_builds_nested_models(self, validate):
+        countries = ModelDecoder(list[Country], validate=validate).decode(PAYLOAD)
+
+        assert countries[0].country_id == 1
+        assert countries[0].regions[0].region_code == "77"
+        assert isinstance(countries[0].capital, Region)
+        assert countries[1].capital is None
+
+    def test_construct_mode_skips_validation(self):
+        content = orjson.dumps({"countryId": "not a number", "regions": []})
+
+        with pytest.raises(ValidationError):
+            ModelDecoder(Country).decode(content)
+        assert ModelDecoder(Country, validate=False).decode(content).country_id == "not a number"
+
+
+@pytest.mark.anyio
+class TestTypedService:
+    async def test_invalid_response_raises_validation_business_error(self):
+        class CountryService(SimpleJsonHTTPService):
+            DECODER = ModelDecoder(Country)
+
+        service = CountryService(retry_client=None, single_flight=None, response_cache=None)
+
+        with pytest.raises(Exception) as error:
+            await service._process_response(Response(200, json={"countryId": "x"}))
+
+        assert type(error.value).__name__ == "ValidationBusinessError"
+        assert error.value.detail == CountryService.RESPONSE_DETAIL
@@ -0,0 +1,27 @@
+import pytest
+
+from app.infrastructure.http.pool import HTTPClientPool, init_http_client_pool
+
+
+@pytest.mark.anyio
+class TestHTTPClientPool:
+    async def test_one_client_per_base_url(self):
+        pool = HTTPClientPool()
+
+        assert pool.get("http://first.local") is pool.get("http://first.local")
+        assert pool.get("http://first.local") is not pool.get("http://second.local")
+        assert pool.get() is pool.get("")
+
+        await pool.aclose()
+
+    async def test_resource_closes_clients(self):
+        pool = HTTPClientPool()
+        resource = init_http_client_pool(pool)
+        client = (await resource.__anext__()).get("http://first.local")
+
+        with pytest.raises(StopAsyncIteration):
+            await resource.__anext__()
+
+        assert client.is_closed
+        assert pool.get("http://first.local") is not client
+        await pool.aclose()
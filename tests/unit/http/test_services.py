@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+from app.infrastructure.config import config
+from app.infrastructure.http.services import SimpleJsonHTTPService
+from app.infrastructure.ioc.gateways import Gateways
+from app.utils.single_flight import SingleFlight
+
+
+def create_service(calls: list[Request]) -> SimpleJsonHTTPService:
+    async def handler(request: Request) -> Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        return Response(200, json={"items": []})
+
+    client = PredicateClient(
+        lambda response: response.status_code >= 500,
+        client=AsyncClient(transport=MockTransport(handler), base_url="http://service.local"),
+        backoff_option=lambda: Constant(interval=0),
+        attempts=1,
+    )
+    return SimpleJsonHTTPService(retry_client=client, single_flight=SingleFlight())
+
+
+@pytest.mark.anyio
+class TestRequestCoalescing:
+    async def test_identical_gets_share_one_upstream_call(self):
+        calls = []
+        service = create_service(calls)
+
+        results = await asyncio.gather(
+            *(service.request(method="GET", url="/items", params={"page": 1}) for _ in range(10))
+        )
+
+        assert len(calls) == 1
+        assert results == [{"items": []}] * 10
+        # каждый получает свой разобранный ответ
+        assert results[0] is not results[1]
+
+    @pytest.mark.parametrize(
+        "first, second",
+        [
+            ({"method": "GET", "params": {"page": 1}}, {"method": "GET", "params": {"page": 2}}),
+            (
+                {"method": "GET", "headers": {"Authorization": "a"}},
+                {"method": "GET", "headers": {"Authorization": "b"}},
+            ),
+            ({"method": "POST"}, {"method": "POST"}),
+            ({"method": "GET", "content": b"a"}, {"method": "GET", "content": b"b"}),
+            ({"method": "GET", "cookies": {"session": "a"}}, {"method": "GET", "cookies": {"session": "b"}}),
+            ({"method": "GET"}, {"method": "GET", "follow_redirects": True}),
+        ],
+    )
+    async def test_different_requests_are_not_coalesced(self, first, second):
+        calls = []
+        service = create_service(calls)
+
+        await asyncio.gather(service.request(url="/items", **first), service.request(url="/items", **second))
+
+        assert len(calls) == 2
+
+
+@pytest.mark.anyio
+async def test_service_gets_pool_client_for_its_base_url():
+    class CountryService(SimpleJsonHTTPService):
+        BASE_URL = "http://countries.local"
+
+    gateways = Gateways()
+    gateways.config.from_pydantic(config)
+    service = CountryService(single_flight=None, response_cache=None, retry_client_factory=gateways.retry_client)
+    pool = gateways.http_client_pool()
+
+    assert service._retry_client.client is pool.get("http://countries.local")
+    assert gateways.retry_client().client is pool.get("")
+    await pool.aclose()
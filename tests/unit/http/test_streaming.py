@@ -0,0 +1,119 @@
+from contextlib import aclosing
+
+import orjson
+import pytest
+from httpx import AsyncByteStream, AsyncClient, MockTransport, Request, Response
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_predicate import PredicateClient
+from pydantic import BaseModel
+
+from app.infrastructure.http.decoders import ModelDecoder
+from app.infrastructure.http.services import SimpleJsonHTTPService
+
+
+class Record(BaseModel):
+    id: int
+
+
+class RecordStream(AsyncByteStream):
+    """
+    NDJSON body generated on demand, records are split across chunks
+    """
+
+    def __init__(self, records: int):
+        self.records = records
+        self.produced = 0
+        self.closed = False
+
+    async def __aiter__(self):
+        for i in range(self.records):
+            self.produced += 1
+            line = orjson.dumps({"id": i}) + b"\n"
+            yield line[:3]
+            yield line[3:]
+
+    async def aclose(self) -> None:
+        self.closed = True
+
+
+def create_service(handler) -> SimpleJsonHTTPService:
+    client = PredicateClient(
+        lambda response: response.status_code >= 500,
+        client=AsyncClient(transport=MockTransport(handler), base_url="http://export.local"),
+        backoff_option=lambda: Constant(interval=0),
+        attempts=3,
+    )
+    return SimpleJsonHTTPService(retry_client=client, single_flight=None, response_cache=None)
+
+
+@pytest.mark.anyio
+class TestStreaming:
+    async def test_records_are_decoded_lazily(self):
+        body = RecordStream(records=1000)
+        service = create_service(lambda request: Response(200, stream=body))
+
+        async with aclosing(service.stream_records(url="/export")) as records:
+            async for record in records:
+                if record["id"] == 9:
+                    break
+
+        # записи дальше прочитанных не запрашивались у сервиса
+        assert body.produced <= 11
+        assert body.closed
+
+    async def test_all_records_are_read(self):
+        service = create_service(lambda request: Response(200, stream=RecordStream(records=100)))
+
+        records = [record async for record in service.stream_records(url="/export")]
+
+        assert [record["id"] for record in records] == list(range(100))
+
+    async def test_failed_response_is_retried_and_closed_before_streaming(self):
+        bodies = [RecordStream(records=1), RecordStream(records=2)]
+        calls = []
+
+        def handler(request: Request) -> Response:
+            calls.append(request)
+            return Response(503 if len(calls) == 1 else 200, stream=bodies[len(calls) - 1])
+
+        service = create_service(handler)
+
+        chunks = [chunk async for chunk in service.stream(url="/export")]
+
+        assert b"".join(chunks) == b'{"id":0}\n{"id":1}\n'
+        assert bodies[0].closed and bodies[1].closed
+
+    async def test_error_response_raises(self):
+        service = create_service(
+            lambda request: Response(500, json={"status": "500", "detail": "export failed", "error_type": ""})
+        )
+
+        with pytest.raises(Exception) as error:
+            async for _ in service.stream(url="/export"):
+                pass
+
+        assert error.value.detail == "export failed"
+
+    async def test_invalid_record_raises_validation_business_error(self):
+        content = b'{"id": 1}\n{"id": "x"}\n'
+        service = create_service(lambda request: Response(200, content=content))
+
+        with pytest.raises(Exception) as error:
+            async for _ in service.stream_records(url="/export", decoder=ModelDecoder(Record)):
+                pass
+
+        assert type(error.value).__name__ == "ValidationBusinessError"
+        assert error.value.detail == SimpleJsonHTTPService.RESPONSE_DETAIL
+
+    async def test_record_split_into_many_chunks(self):
+        line = orjson.dumps({"id": 1, "name": "x" * 1000}) + b"\n"
+        chunks = [line[i : i + 10] for i in range(0, len(line), 10)]
+
+        class ChunkStream(AsyncByteStream):
+            async def __aiter__(self):
+                for chunk in chunks:
+                    yield chunk
+
+        service = create_service(lambda request: Response(200, stream=ChunkStream()))
+
+        assert [record async for record in service.stream_records(url="/export")] == [orjson.loads(line)]
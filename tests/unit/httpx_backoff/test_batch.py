@@ -0,0 +1,130 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.batch import BatchExecutor, BatchLoader, RequestSpec
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+
+class InFlight:
+    def __init__(self):
+        self.current = Counter()
+        self.peak = Counter()
+
+    async def __call__(self, request: Request) -> Response:
+        host = request.url.host
+        self.current[host] += 1
+        self.current["total"] += 1
+        self.peak[host] = max(self.peak[host], self.current[host])
+        self.peak["total"] = max(self.peak["total"], self.current["total"])
+        # later requests finish first
+        await asyncio.sleep(0.02 / int(request.url.path.strip("/")))
+        self.current[host] -= 1
+        self.current["total"] -= 1
+        if request.url.path == "/3":
+            raise ValueError("boom")
+        return Response(200)
+
+
+def create_client(transport: MockTransport) -> PredicateClient:
+    return PredicateClient(
+        lambda response: response.status_code >= 500,
+        client=AsyncClient(transport=transport),
+        backoff_option=lambda: Constant(interval=0),
+        attempts=1,
+    )
+
+
+@pytest.mark.anyio
+class TestBatchExecutor:
+    async def test_concurrency_and_per_host_limits(self):
+        in_flight = InFlight()
+        executor = BatchExecutor.for_client(create_client(MockTransport(in_flight)), concurrency=4, per_host=2)
+        specs = (RequestSpec(f"http://{host}.local/{i}") for i in range(1, 11) for host in ("a", "b", "c"))
+
+        results = [result async for result in executor.run(specs)]
+
+        assert len(results) == 30
+        assert in_flight.peak["total"] == 4
+        assert max(in_flight.peak[host] for host in ("a.local", "b.local", "c.local")) == 2
+
+    async def test_errors_are_captured_and_order_is_kept(self):
+        executor = BatchExecutor.for_client(create_client(MockTransport(InFlight())), concurrency=5)
+        specs = [RequestSpec(f"http://a.local/{i}") for i in range(1, 6)]
+
+        results = [result async for result in executor.run(specs, ordered=True)]
+
+        assert [result.index for result in results] == [0, 1, 2, 3, 4]
+        assert [result.ok for result in results] == [True, True, False, True, True]
+        assert isinstance(results[2].error, ValueError)
+        assert results[0].unwrap().status_code == 200
+
+    @pytest.mark.parametrize("ordered", [False, True])
+    async def test_slow_consumer_or_head_holds_back_requests(self, ordered):
+        started, head = [], asyncio.Event()
+
+        async def send(spec):
+            started.append(spec.url)
+            if spec.url == "0" and ordered:
+                await head.wait()
+            return spec.url
+
+        executor = BatchExecutor(send, concurrency=2)
+        results = executor.run((RequestSpec(str(i)) for i in range(100)), ordered=ordered)
+
+        if ordered:
+            consumed = asyncio.ensure_future(results.__anext__())
+            await asyncio.sleep(0.01)
+            # the slow first request and one finished request fill the window
+            assert len(started) == 2
+            head.set()
+            assert (await consumed).result == "0"
+        else:
+            assert (await results.__anext__()).result == "0"
+            await asyncio.sleep(0.01)
+            # running workers, a full queue and the yielded result
+            assert len(started) <= 5
+
+        assert len([result async for result in results]) == 99
+
+    async def test_requests_iterable_error_is_raised(self):
+        def specs():
+            yield RequestSpec("0")
+            raise RuntimeError("broken source")
+
+        async def send(spec):
+            return spec.url
+
+        with pytest.raises(RuntimeError):
+            async for _ in BatchExecutor(send, concurrency=2).run(specs()):
+                pass
+
+
+@pytest.mark.anyio
+class TestBatchLoader:
+    async def test_loads_are_merged_into_batches(self):
+        batches = []
+
+        async def load_batch(keys):
+            batches.append(sorted(keys))
+            return {key: key * 10 for key in keys if key != 4}
+
+        loader = BatchLoader(load_batch, max_batch_size=3)
+
+        results = await asyncio.gather(*(loader.load(key) for key in [1, 2, 1, 3, 4, 5]), return_exceptions=True)
+
+        assert results[:4] == [10, 20, 10, 30]
+        assert isinstance(results[4], KeyError)
+        assert results[5] == 50
+        assert batches == [[1, 2, 3], [4, 5]]
+
+    async def test_batch_error_fails_every_load(self):
+        async def load_batch(keys):
+            raise ConnectionError("down")
+
+        loader = BatchLoader(load_batch)
+
+        with pytest.raises(ConnectionError):
+            await loader.load_many([1, 2])
@@ -0,0 +1,111 @@
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerClient,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    CircuitState,
+)
+from httpx_backoff.clients.on_predicate import PredicateClient
+
+from tests.utils.clock import FakeClock
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture()
+def breaker(clock) -> CircuitBreaker:
+    return CircuitBreaker(
+        "service",
+        failure_rate_threshold=0.5,
+        minimum_calls=4,
+        window=10,
+        open_timeout=5,
+        half_open_calls=2,
+        clock=clock,
+    )
+
+
+def open_circuit(breaker: CircuitBreaker) -> None:
+    for _ in range(4):
+        breaker.record_failure()
+
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_rate(self, breaker):
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert not breaker.allow_request()
+
+    def test_old_outcomes_leave_the_window(self, breaker, clock):
+        for _ in range(3):
+            breaker.record_failure()
+
+        clock.now = 11
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+        assert breaker.failure_rate == 1.0
+
+    def test_half_open_closes_after_successful_probes(self, breaker, clock):
+        open_circuit(breaker)
+        clock.now = 5
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request()
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        breaker.record_success()
+        breaker.record_success()
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_failure_opens_again(self, breaker, clock):
+        open_circuit(breaker)
+        clock.now = 5
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        clock.now = 9
+        assert breaker.state == CircuitState.OPEN
+        clock.now = 10
+        assert breaker.state == CircuitState.HALF_OPEN
+
+
+@pytest.mark.anyio
+class TestCircuitBreakerClient:
+    async def test_open_circuit_rejects_without_calling_host(self, clock):
+        calls = []
+        transport = MockTransport(lambda request: calls.append(request) or Response(503))
+        client = CircuitBreakerClient(
+            PredicateClient(
+                lambda response: response.status_code == 503,
+                client=AsyncClient(transport=transport),
+                backoff_option=lambda: Constant(interval=0),
+                attempts=1,
+            ),
+            registry=CircuitBreakerRegistry(minimum_calls=2, clock=clock),
+        )
+
+        for _ in range(2):
+            assert (await client.get("http://service.local/")).status_code == 503
+
+        with pytest.raises(CircuitOpenError):
+            await client.get("http://service.local/")
+
+        assert len(calls) == 2
+        assert [breaker.state for breaker in client.registry] == [CircuitState.OPEN]
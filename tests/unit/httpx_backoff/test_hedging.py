@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.hedging import HedgePolicy, HedgingClient
+from httpx_backoff.hooks import RetryHooks, RetryOutcome
+from httpx_backoff.rate_limit import HostRateLimiter
+from httpx_backoff.retry_budget import RetryBudget
+
+
+def delayed_transport(delays: list[float], calls: list[str], statuses: list[int] = ()) -> MockTransport:
+    """
+    The n-th request responds after delays[n] seconds with statuses[n] (200 by default)
+    and the "X-Call" header set to n
+    """
+
+    async def handler(request: Request) -> Response:
+        call = len(calls)
+        calls.append(request.method)
+        await asyncio.sleep(delays[call])
+        return Response(statuses[call] if call < len(statuses) else 200, headers={"X-Call": str(call)})
+
+    return MockTransport(handler)
+
+
+class RecordingHooks(RetryHooks):
+    def __init__(self):
+        self.finished = []
+
+    def on_finish(self, key, attempts, waited, elapsed, outcome, error=None):
+        self.finished.append((key, attempts, outcome))
+
+
+class RecordingRateLimiter(HostRateLimiter):
+    def __init__(self):
+        super().__init__()
+        self.acquired = []
+
+    async def acquire(self, key):
+        self.acquired.append(key)
+        await super().acquire(key)
+
+
+def hedging_client(
+    transport: MockTransport, policy: HedgePolicy, enabled: bool = True, attempts: int = 1, **options
+) -> HedgingClient:
+    return HedgingClient(
+        PredicateClient(
+            lambda response: response.status_code >= 500,
+            client=AsyncClient(transport=transport, base_url="http://service.local"),
+            backoff_option=lambda: Constant(interval=0),
+            attempts=attempts,
+            **options,
+        ),
+        policy=policy,
+        enabled=enabled,
+    )
+
+
+@pytest.mark.anyio
+class TestHedgingClient:
+    async def test_slow_request_is_hedged_and_hedge_wins(self):
+        calls = []
+        policy = HedgePolicy(delay=0.01, quantile=None)
+        client = hedging_client(delayed_transport([1, 0], calls), policy)
+
+        response = await client.get("/")
+
+        assert response.headers["X-Call"] == "1"
+        assert calls == ["GET", "GET"]
+        assert policy.hedged["service.local"] == 1
+        assert policy.wins["service.local"] == 1
+
+    async def test_primary_wins_after_hedge_was_sent(self):
+        calls = []
+        policy = HedgePolicy(delay=0.01, quantile=None)
+        client = hedging_client(delayed_transport([0.05, 1], calls), policy)
+
+        response = await client.get("/")
+
+        assert response.headers["X-Call"] == "0"
+        assert policy.losses["service.local"] == 1
+
+    async def test_retryable_hedge_response_does_not_win(self):
+        calls = []
+        policy = HedgePolicy(delay=0.01, quantile=None)
+        client = hedging_client(delayed_transport([0.05, 0], calls, statuses=[200, 503]), policy)
+
+        response = await client.get("/")
+
+        assert (response.status_code, response.headers["X-Call"]) == (200, "0")
+        assert policy.losses["service.local"] == 1
+
+    async def test_hedge_is_not_retried(self):
+        calls = []
+        policy = HedgePolicy(delay=0.01, quantile=None)
+        transport = delayed_transport([0.05, 0, 0, 0, 0], calls, statuses=[503] * 5)
+        client = hedging_client(transport, policy, attempts=3)
+
+        response = await client.get("/")
+
+        assert response.status_code == 503
+        # three attempts of the primary and a single hedge
+        assert len(calls) == 4
+
+    async def test_fast_request_is_not_hedged(self):
+        calls = []
+        policy = HedgePolicy(delay=0.5, quantile=None)
+        client = hedging_client(delayed_transport([0], calls), policy)
+
+        await client.get("/")
+
+        assert calls == ["GET"]
+        assert not policy.hedged
+
+    @pytest.mark.parametrize(
+        "method, enabled, hedge", [("POST", True, None), ("GET", False, None), ("GET", True, False)]
+    )
+    async def test_hedging_is_opt_in_and_limited_to_idempotent_methods(self, method, enabled, hedge):
+        calls = []
+        policy = HedgePolicy(delay=0.01, quantile=None)
+        client = hedging_client(delayed_transport([0.05], calls), policy, enabled=enabled)
+
+        await client.request("/", method=method, hedge=hedge)
+
+        assert calls == [method]
+
+    async def test_budget_limits_hedges(self):
+        calls = []
+        policy = HedgePolicy(delay=0.01, quantile=None, budget=RetryBudget(ratio=0.1, max_tokens=1))
+        client = hedging_client(delayed_transport([0.05] * 4, calls), policy)
+
+        await client.get("/")
+        await client.get("/")
+
+        assert len(calls) == 3
+        assert policy.budget.suppressed["service.local"] == 1
+
+    async def test_hedge_goes_through_rate_limiter_and_hooks(self):
+        calls = []
+        hooks = RecordingHooks()
+        rate_limiter = RecordingRateLimiter()
+        policy = HedgePolicy(delay=0.01, quantile=None)
+        client = hedging_client(delayed_transport([1, 0], calls), policy, hooks=hooks, rate_limiter=rate_limiter)
+
+        await client.get("/")
+
+        assert rate_limiter.acquired == ["service.local", "service.local"]
+        # the primary is cancelled by the winning hedge and doesn't finish
+        assert hooks.finished == [("service.local", 1, RetryOutcome.SUCCESS)]
+
+    async def test_hedge_spends_retry_budget(self):
+        calls = []
+        retry_budget = RetryBudget(ratio=0, max_tokens=1)
+        policy = HedgePolicy(delay=0.01, quantile=None)
+        client = hedging_client(delayed_transport([0.05] * 3, calls), policy, retry_budget=retry_budget)
+
+        await client.get("/")
+        await client.get("/")
+
+        assert len(calls) == 3
+        assert retry_budget.suppressed["service.local"] == 1
+        assert policy.hedged["service.local"] == 1
+
+
+class TestHedgePolicy:
+    def test_delay_follows_latency_quantile(self):
+        policy = HedgePolicy(delay=1, quantile=0.9, window=20, min_samples=10)
+
+        for latency in range(1, 10):
+            policy.record_latency("host", latency / 100)
+        assert policy.delay("host") == 1
+
+        policy.record_latency("host", 0.1)
+        assert policy.delay("host") == 0.1
+        assert policy.delay("other") == 1
@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime
+
+import pytest
+from httpx import AsyncClient, MockTransport, Request, Response
+from httpx_backoff.backoff_options import Adaptive
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.rate_limit import HostRateLimiter, parse_retry_after, retry_after
+
+from tests.utils.clock import FakeClock
+
+NOW = 1_700_000_000.0
+
+
+class TestRetryAfter:
+    def test_seconds_and_http_date(self):
+        date = format_datetime(datetime.fromtimestamp(NOW + 30, tz=timezone.utc), usegmt=True)
+
+        assert parse_retry_after("120", NOW) == 120
+        assert parse_retry_after(date, NOW) == 30
+        assert parse_retry_after("soon", NOW) is None
+
+    def test_retry_after_only_on_429_and_503(self):
+        assert retry_after(Response(429, headers={"Retry-After": "5"}), NOW) == 5
+        assert retry_after(Response(503, headers={"Retry-After": "5"}), NOW) == 5
+        assert retry_after(Response(500, headers={"Retry-After": "5"}), NOW) is None
+
+    def test_exhausted_rate_limit(self):
+        epoch = Response(200, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(NOW + 12))})
+        delta = Response(429, headers={"RateLimit-Remaining": "0", "RateLimit-Reset": "7"})
+        left = Response(200, headers={"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": "7"})
+
+        assert retry_after(epoch, NOW) == 12
+        assert retry_after(delta, NOW) == 7
+        assert retry_after(left, NOW) is None
+
+
+class TestAdaptive:
+    def test_server_wait_and_fallback(self):
+        option = Adaptive(factor=1, max_value=4, clock=lambda: NOW)
+
+        assert option.send(Response(429, headers={"Retry-After": "3"})) == 3
+        waits = [option.send(Response(502)) for _ in range(4)]
+
+        assert all(0 <= wait <= limit for wait, limit in zip(waits, [1, 2, 4, 4]))
+
+    def test_too_long_server_wait_stops_retrying(self):
+        option = Adaptive(max_wait=10, clock=lambda: NOW)
+
+        with pytest.raises(StopIteration):
+            option.send(Response(503, headers={"Retry-After": "60"}))
+
+
+@pytest.mark.anyio
+class TestHostRateLimiter:
+    async def test_retry_after_pauses_every_request_to_host(self):
+        clock = FakeClock()
+        limiter = HostRateLimiter(clock=clock, wall_clock=lambda: NOW, sleep=clock.sleep)
+
+        limiter.update("a", Response(429, headers={"Retry-After": "5"}))
+        await limiter.acquire("a")
+        await limiter.acquire("b")
+
+        assert clock.sleeps == [5]
+        assert limiter.delay("a") == 0
+
+    async def test_few_remaining_requests_are_paced(self):
+        clock = FakeClock()
+        limiter = HostRateLimiter(clock=clock, wall_clock=lambda: NOW, sleep=clock.sleep)
+        headers = {"X-RateLimit-Limit": "100", "X-RateLimit-Remaining": "5", "X-RateLimit-Reset": "10"}
+
+        limiter.update("a", Response(200, headers=headers))
+        for _ in range(3):
+            await limiter.acquire("a")
+
+        assert clock.sleeps == [2, 2]
+
+    async def test_max_wait_caps_pause(self):
+        clock = FakeClock()
+        limiter = HostRateLimiter(max_wait=30, clock=clock, wall_clock=lambda: NOW, sleep=clock.sleep)
+
+        limiter.update("a", Response(503, headers={"Retry-After": "3600"}))
+
+        assert limiter.delay("a") == 30
+
+
+@pytest.mark.anyio
+async def test_client_waits_as_server_asks():
+    calls = []
+
+    def handler(request: Request) -> Response:
+        calls.append(request.url.path)
+        if len(calls) == 1:
+            return Response(429, headers={"Retry-After": "2"})
+        return Response(200)
+
+    clock = FakeClock()
+    limiter = HostRateLimiter(clock=clock, wall_clock=lambda: NOW, sleep=clock.sleep)
+    client = PredicateClient(
+        lambda response: response.status_code == 429,
+        client=AsyncClient(transport=MockTransport(handler), base_url="http://test"),
+        backoff_option=lambda: Adaptive(clock=lambda: NOW),
+        rate_limiter=limiter,
+    )
+    client.retry_engine._sleep = clock.sleep
+
+    response = await client.get("/")
+
+    assert response.status_code == 200
+    # the retry sleeps exactly Retry-After without jitter, the limiter doesn't add to it
+    assert clock.sleeps == [2]
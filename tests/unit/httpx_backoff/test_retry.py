@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient, ConnectError, MockTransport, Request, Response
+from httpx_backoff.backoff_options import Expo
+from httpx_backoff.clients.on_exception import ExceptionClient
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.hooks import RetryHooks, RetryOutcome
+from httpx_backoff.retry_budget import RetryBudget
+
+
+class RecordingSleep:
+    def __init__(self):
+        self.waits: dict[str, list[float]] = {}
+
+    async def __call__(self, seconds: float) -> None:
+        self.waits.setdefault(asyncio.current_task().get_name(), []).append(seconds)
+        await asyncio.sleep(0)
+
+
+def failing_transport(failures: int, exception: Exception = None) -> MockTransport:
+    calls: dict[str, int] = {}
+
+    def handler(request: Request) -> Response:
+        key = request.url.path
+        calls[key] = calls.get(key, 0) + 1
+        if calls[key] <= failures:
+            if exception is not None:
+                raise exception
+            return Response(503)
+        return Response(200)
+
+    return MockTransport(handler)
+
+
+class RecordingHooks(RetryHooks):
+    def __init__(self):
+        self.retries = []
+        self.finished = []
+
+    def on_retry(self, key, attempt, wait, outcome):
+        self.retries.append((key, attempt, wait, getattr(outcome, "status_code", type(outcome))))
+
+    def on_finish(self, key, attempts, waited, elapsed, outcome, error=None):
+        self.finished.append((key, attempts, waited, outcome, type(error) if error else None))
+
+
+async def run_named(coroutines: dict[str, object]) -> None:
+    await asyncio.gather(*(asyncio.create_task(coroutine, name=name) for name, coroutine in coroutines.items()))
+
+
+@pytest.mark.anyio
+class TestRetryEngine:
+    async def test_concurrent_requests_have_independent_backoff(self, monkeypatch):
+        client = PredicateClient(
+            lambda response: response.status_code == 503,
+            client=AsyncClient(transport=failing_transport(failures=3), base_url="http://test"),
+            backoff_option=Expo(factor=1),
+            jitter=None,
+        )
+        sleep = RecordingSleep()
+        monkeypatch.setattr(client.retry_engine, "_sleep", sleep)
+
+        await run_named({f"request-{i}": client.get(f"/{i}") for i in range(5)})
+
+        assert sleep.waits == {f"request-{i}": [1, 2, 4] for i in range(5)}
+
+    async def test_sequential_requests_start_from_first_wait(self, monkeypatch):
+        client = PredicateClient(
+            lambda response: response.status_code == 503,
+            client=AsyncClient(transport=failing_transport(failures=2), base_url="http://test"),
+            backoff_option=lambda: Expo(factor=1),
+            jitter=None,
+        )
+        sleep = RecordingSleep()
+        monkeypatch.setattr(client.retry_engine, "_sleep", sleep)
+
+        await run_named({"first": client.get("/first")})
+        await run_named({"second": client.get("/second")})
+
+        assert sleep.waits == {"first": [1, 2], "second": [1, 2]}
+
+    async def test_exception_client_raises_last_exception(self, monkeypatch):
+        client = ExceptionClient(
+            ConnectError,
+            client=AsyncClient(transport=failing_transport(10, ConnectError("down")), base_url="http://test"),
+            backoff_option=Expo,
+            attempts=3,
+            jitter=None,
+        )
+        sleep = RecordingSleep()
+        monkeypatch.setattr(client.retry_engine, "_sleep", sleep)
+
+        with pytest.raises(ConnectError):
+            await run_named({"request": client.get("/")})
+
+        assert sleep.waits == {"request": [1, 2]}
+
+    async def test_hooks_report_retries_and_outcome(self, monkeypatch):
+        hooks = RecordingHooks()
+        client = PredicateClient(
+            lambda response: response.status_code == 503,
+            client=AsyncClient(transport=failing_transport(failures=2), base_url="http://test"),
+            backoff_option=Expo,
+            jitter=None,
+            hooks=hooks,
+        )
+        monkeypatch.setattr(client.retry_engine, "_sleep", RecordingSleep())
+
+        await client.get("/")
+
+        assert hooks.retries == [("test", 1, 1, 503), ("test", 2, 2, 503)]
+        assert hooks.finished == [("test", 3, 3, RetryOutcome.SUCCESS, None)]
+
+    async def test_hooks_report_why_retrying_stopped(self, monkeypatch):
+        hooks = RecordingHooks()
+        budget = RetryBudget(ratio=0, max_tokens=1)
+        client = ExceptionClient(
+            ConnectError,
+            client=AsyncClient(transport=failing_transport(10, ConnectError("down")), base_url="http://test"),
+            backoff_option=Expo,
+            attempts=2,
+            jitter=None,
+            retry_budget=budget,
+            hooks=hooks,
+        )
+        monkeypatch.setattr(client.retry_engine, "_sleep", RecordingSleep())
+
+        for path in ("/first", "/second"):
+            with pytest.raises(ConnectError):
+                await client.get(path)
+
+        assert hooks.finished == [
+            ("test", 2, 1, RetryOutcome.ATTEMPTS_EXHAUSTED, ConnectError),
+            ("test", 1, 0, RetryOutcome.BUDGET_EXHAUSTED, ConnectError),
+        ]
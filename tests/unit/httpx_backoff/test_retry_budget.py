@@ -0,0 +1,48 @@
+import pytest
+from httpx import AsyncClient, MockTransport, Response
+from httpx_backoff.backoff_options import Constant
+from httpx_backoff.clients.on_predicate import PredicateClient
+from httpx_backoff.retry_budget import RetryBudget
+
+
+class TestRetryBudget:
+    def test_retries_are_limited_to_share_of_successes(self):
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+
+        assert budget.try_acquire("host")
+        assert budget.try_acquire("host")
+        assert not budget.try_acquire("host")
+
+        budget.on_success("host")
+        budget.on_success("host")
+
+        assert budget.try_acquire("host")
+        assert (budget.depletions["host"], budget.suppressed["host"]) == (2, 1)
+
+    def test_buckets_are_per_host(self):
+        budget = RetryBudget(ratio=0.1, max_tokens=1)
+
+        assert budget.try_acquire("first")
+        assert budget.try_acquire("second")
+        assert not budget.try_acquire("first")
+
+
+@pytest.mark.anyio
+class TestPredicateClientRetryBudget:
+    async def test_request_fails_fast_when_budget_is_empty(self):
+        calls = []
+        transport = MockTransport(lambda request: calls.append(request) or Response(503))
+        client = PredicateClient(
+            lambda response: response.status_code == 503,
+            client=AsyncClient(transport=transport),
+            backoff_option=lambda: Constant(interval=0),
+            attempts=5,
+            retry_budget=RetryBudget(ratio=0.1, max_tokens=2),
+        )
+
+        response = await client.get("http://service.local/")
+        assert response.status_code == 503
+        assert len(calls) == 3
+
+        await client.get("http://service.local/")
+        assert len(calls) == 4
@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import JWTError, jwk, jwt
+
+from app.infrastructure.keycloak.keys import JWKSKeyProvider, StaticKeyProvider
+from tests.utils.clock import FakeClock
+
+
+def generate_private_pem() -> bytes:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption(),
+    )
+
+
+def to_public_jwk(private_pem: bytes, kid: str) -> dict:
+    public_jwk = jwk.construct(private_pem, "RS256").public_key().to_dict()
+    return {**public_jwk, "kid": kid, "use": "sig", "alg": "RS256"}
+
+
+@pytest.fixture()
+def private_pems() -> dict[str, bytes]:
+    return {"first": generate_private_pem(), "second": generate_private_pem()}
+
+
+@pytest.fixture()
+def jwks_file(tmp_path, private_pems):
+    path = tmp_path / "certs.json"
+    path.write_text(json.dumps({"keys": [to_public_jwk(private_pems["first"], "first")]}))
+    return path
+
+
+@pytest.fixture()
+def loader_calls() -> list:
+    return []
+
+
+@pytest.fixture()
+def loader(jwks_file, loader_calls):
+    async def load() -> dict:
+        loader_calls.append(1)
+        await asyncio.sleep(0)
+        return json.loads(jwks_file.read_text())
+
+    return load
+
+
+@pytest.mark.anyio
+class TestJWKSKeyProvider:
+    async def test_key_verifies_token(self, loader, private_pems):
+        provider = JWKSKeyProvider(loader)
+        token = jwt.encode({"sub": "user"}, private_pems["first"], algorithm="RS256", headers={"kid": "first"})
+
+        key = await provider.get_key(jwt.get_unverified_header(token)["kid"])
+
+        assert jwt.decode(token, key, algorithms=["RS256"]) == {"sub": "user"}
+        await provider.aclose()
+
+    async def test_concurrent_loads_are_single_flight(self, loader, loader_calls):
+        provider = JWKSKeyProvider(loader)
+
+        await asyncio.gather(*(provider.get_key("first") for _ in range(10)))
+
+        assert len(loader_calls) == 1
+        await provider.aclose()
+
+    async def test_close_awaits_background_refresh(self, loader):
+        provider = JWKSKeyProvider(loader)
+        await provider.get_key("first")
+        task = provider._background_task
+
+        await provider.aclose()
+
+        assert task is not None and task.cancelled()
+        assert provider._background_task is None
+
+    async def test_unknown_kid_triggers_rotation(self, loader, loader_calls, jwks_file, private_pems):
+        clock = FakeClock()
+        provider = JWKSKeyProvider(loader, min_refresh_interval=30, clock=clock)
+        await provider.get_key("first")
+
+        jwks_file.write_text(json.dumps({"keys": [to_public_jwk(private_pems["second"], "second")]}))
+
+        with pytest.raises(JWTError):
+            await provider.get_key("second")
+        assert len(loader_calls) == 1
+
+        clock.now = 30
+        await provider.get_key("second")
+
+        assert len(loader_calls) == 2
+        assert provider.kids == frozenset({"second"})
+        await provider.aclose()
+
+    async def test_first_load_failure_is_unavailable(self):
+        async def load() -> dict:
+            raise ConnectionError("keycloak is down")
+
+        provider = JWKSKeyProvider(load)
+
+        with pytest.raises(Exception) as error:
+            await provider.get_key("first")
+
+        assert type(error.value).__name__ == "KeyProviderUnavailableError"
+        assert error.value.status == "503"
+        await provider.aclose()
+
+    async def test_refresh_failure_with_stale_keys_is_unknown_key(self, loader, loader_calls):
+        clock = FakeClock()
+        provider = JWKSKeyProvider(loader, min_refresh_interval=30, clock=clock)
+        await provider.get_key("first")
+
+        async def load() -> dict:
+            raise ConnectionError("keycloak is down")
+
+        provider._loader = load
+        clock.now = 30
+
+        with pytest.raises(JWTError):
+            await provider.get_key("second")
+        assert await provider.get_key("first") is not None
+        await provider.aclose()
+
+
+@pytest.mark.anyio
+async def test_static_key_supports_every_configured_algorithm(private_pems):
+    public_pem = jwk.construct(private_pems["first"], "RS256").public_key().to_pem().decode()
+    provider = StaticKeyProvider(public_pem, ["RS256", "RS384"])
+
+    for algorithm in ("RS256", "RS384"):
+        token = jwt.encode({"sub": "user"}, private_pems["first"], algorithm=algorithm)
+        key = await provider.get_key(None, algorithm)
+
+        assert jwt.decode(token, key, algorithms=["RS256", "RS384"]) == {"sub": "user"}
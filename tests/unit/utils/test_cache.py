@@ -0,0 +1,44 @@
+from app.utils.cache import TTLCache
+from tests.utils.clock import FakeClock
+
+
+class TestTTLCache:
+    def test_expired_entry_is_not_served(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=60, clock=clock)
+
+        cache.set("key", "value", expires_at=10)
+        assert cache.get("key") == "value"
+
+        clock.now = 10
+        assert cache.get("key") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_ttl_bounds_expires_at(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl=5, clock=clock)
+
+        cache.set("key", "value", expires_at=100)
+        clock.now = 5
+
+        assert cache.get("key") is None
+
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+    def test_zero_maxsize_disables_cache(self):
+        cache = TTLCache(maxsize=0)
+
+        cache.set("a", 1)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
@@ -0,0 +1,45 @@
+from typing import Optional, Union
+
+import pytest
+
+from app.common.dto.base import CustomModel
+from app.utils.models import construct
+
+
+class Region(CustomModel):
+    region_code: str
+
+
+class Country(CustomModel):
+    country_id: int
+    regions: list[Optional[Region]]
+    neighbours: dict[str, Optional[Region]] = {}
+
+
+class TestConstruct:
+    @pytest.mark.parametrize("model", [Optional[Region], Union[Region, None], Region | None])
+    def test_optional_model(self, model):
+        assert construct(model, {"regionCode": "77"}) == Region(region_code="77")
+        assert construct(model, None) is None
+
+    def test_optional_items(self):
+        assert construct(list[Optional[Region]], [{"regionCode": "77"}, None]) == [Region(region_code="77"), None]
+        assert construct(dict[str, Optional[Region]], {"a": {"regionCode": "77"}, "b": None}) == {
+            "a": Region(region_code="77"),
+            "b": None,
+        }
+
+    def test_optional_nested_fields(self):
+        country = construct(
+            Optional[Country],
+            {"countryId": 1, "regions": [{"regionCode": "77"}, None], "neighbours": {"a": {"regionCode": "50"}}},
+        )
+
+        assert country.regions == [Region(region_code="77"), None]
+        assert country.neighbours == {"a": Region(region_code="50")}
+
+    def test_union_picks_argument_by_shape(self):
+        regions = construct(Union[Region, list[Region]], [{"regionCode": "77"}])
+
+        assert regions == [Region(region_code="77")]
+        assert construct(Union[int, Region], 5) == 5
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from app.utils.single_flight import SingleFlight
+
+
+class Upstream:
+    def __init__(self, error: Exception = None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self._error = error
+
+    async def __call__(self) -> dict:
+        self.calls += 1
+        await self.release.wait()
+        if self._error is not None:
+            raise self._error
+        return {"value": self.calls}
+
+
+@pytest.mark.anyio
+class TestSingleFlight:
+    async def test_concurrent_calls_share_one_call(self):
+        single_flight, upstream = SingleFlight(), Upstream()
+
+        waiters = [asyncio.create_task(single_flight.do("key", upstream)) for _ in range(10)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+
+        assert await asyncio.gather(*waiters) == [{"value": 1}] * 10
+        assert (upstream.calls, single_flight.shared) == (1, 9)
+
+    async def test_result_is_not_kept_after_completion(self):
+        single_flight, upstream = SingleFlight(), Upstream()
+        upstream.release.set()
+
+        assert await single_flight.do("key", upstream) == {"value": 1}
+        assert await single_flight.do("key", upstream) == {"value": 2}
+        assert len(single_flight) == 0
+
+    async def test_every_waiter_gets_the_exception(self):
+        single_flight, upstream = SingleFlight(), Upstream(error=ValueError("boom"))
+
+        waiters = [asyncio.create_task(single_flight.do("key", upstream)) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert upstream.calls == 1
+
+    async def test_cancelled_waiter_does_not_cancel_others(self):
+        single_flight, upstream = SingleFlight(), Upstream()
+
+        first = asyncio.create_task(single_flight.do("key", upstream))
+        second = asyncio.create_task(single_flight.do("key", upstream))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        upstream.release.set()
+
+        assert await second == {"value": 1}
+        assert first.cancelled()
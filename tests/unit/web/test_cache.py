@@ -0,0 +1,110 @@
+import pytest
+from fastapi import FastAPI, Header, Security
+from fastapi.responses import ORJSONResponse
+from fastapi.security import HTTPBearer
+from httpx import ASGITransport, AsyncClient
+
+from app.web.cache import ResponseCacheMiddleware, api_cache, etag_matches
+from tests.utils.clock import FakeClock
+
+
+@pytest.fixture()
+def calls() -> list:
+    return []
+
+
+@pytest.fixture()
+def clock() -> FakeClock:
+    return FakeClock(1000.0)
+
+
+@pytest.fixture()
+def client(calls, clock):
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    @api_cache(expire=60)
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int, authorization: str = Header("")):
+        calls.append(item_id)
+        return {"itemId": item_id, "user": authorization}
+
+    @app.get("/uncached")
+    async def uncached():
+        calls.append("uncached")
+        return {}
+
+    @api_cache(expire=60, vary=())
+    @app.get("/missing")
+    async def missing():
+        calls.append("missing")
+        return ORJSONResponse({}, status_code=404)
+
+    @api_cache(expire=60)
+    @app.get("/secured")
+    async def secured(credentials=Security(HTTPBearer())):
+        calls.append("secured")
+        return {}
+
+    app.add_middleware(ResponseCacheMiddleware, clock=clock)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.anyio
+class TestResponseCacheMiddleware:
+    async def test_repeated_request_is_served_from_cache(self, client, calls):
+        first = await client.get("/items/1", headers={"Authorization": "Bearer a"})
+        second = await client.get("/items/1", headers={"Authorization": "Bearer a"})
+
+        assert calls == [1]
+        assert second.content == first.content
+        assert second.json() == {"itemId": 1, "user": "Bearer a"}
+        assert second.headers["etag"] == first.headers["etag"]
+        assert second.headers["cache-control"] == "private, max-age=60"
+        assert second.headers["vary"] == "authorization"
+
+    async def test_not_modified_skips_handler(self, client, calls):
+        etag = (await client.get("/items/1")).headers["etag"]
+
+        response = await client.get("/items/1", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+        assert calls == [1]
+
+    async def test_not_modified_after_expiry_runs_handler(self, client, calls, clock):
+        etag = (await client.get("/items/1")).headers["etag"]
+        clock.now += 61
+
+        response = await client.get("/items/1", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert calls == [1, 1]
+
+    async def test_vary_headers_and_query_are_part_of_key(self, client, calls):
+        await client.get("/items/1", headers={"Authorization": "Bearer a"})
+        other_user = await client.get("/items/1", headers={"Authorization": "Bearer b"})
+        await client.get("/items/1?page=2", headers={"Authorization": "Bearer a"})
+
+        assert other_user.json()["user"] == "Bearer b"
+        assert calls == [1, 1, 1]
+
+    async def test_unmarked_routes_and_errors_are_not_cached(self, client, calls):
+        for _ in range(2):
+            await client.get("/uncached")
+            assert (await client.get("/missing")).status_code == 404
+
+        assert calls == ["uncached", "missing", "uncached", "missing"]
+
+    async def test_routes_with_security_dependencies_are_not_cached(self, client, calls):
+        for _ in range(2):
+            assert (await client.get("/secured", headers={"Authorization": "Bearer a"})).status_code == 200
+
+        assert calls == ["secured", "secured"]
+
+
+def test_etag_matches():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
@@ -0,0 +1,127 @@
+import time
+import uuid
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from jose import jwt
+from starlette.requests import Request
+from structlog.contextvars import get_contextvars
+
+from app.infrastructure.config import config
+from app.infrastructure.keycloak.keys import JWKSKeyProvider
+from app.web.middlewares import CorrelationIdMiddleware, RolesKeycloakMiddleware, VerifiedTokenCache
+
+
+def make_request(token: str) -> Request:
+    return Request({"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())]})
+
+
+@pytest.fixture()
+def token_payload() -> dict:
+    return {
+        "exp": time.time() + 60,
+        "sub": str(uuid.uuid4()),
+        "email_verified": True,
+        "realm_access": {"roles": ["admin"]},
+    }
+
+
+@pytest.mark.anyio
+class TestRolesKeycloakMiddlewareTokenCache:
+    @pytest.fixture()
+    def decode_calls(self) -> list:
+        return []
+
+    @pytest.fixture()
+    def middleware_factory(self, monkeypatch, decode_calls):
+        def factory(payload: dict, cache: VerifiedTokenCache, **kwargs) -> RolesKeycloakMiddleware:
+            middleware = RolesKeycloakMiddleware(roles=["admin"], token_cache=cache, **kwargs)
+
+            async def receive_token_payload(token: str) -> dict:
+                decode_calls.append(token)
+                return payload
+
+            monkeypatch.setattr(middleware, "_receive_token_payload", receive_token_payload)
+            return middleware
+
+        return factory
+
+    async def test_hit_skips_verification(self, middleware_factory, decode_calls, token_payload):
+        cache = VerifiedTokenCache(maxsize=10, ttl=60)
+        middleware = middleware_factory(token_payload, cache)
+
+        first, second = make_request("token"), make_request("token")
+        await middleware(first)
+        await middleware(second)
+
+        assert decode_calls == ["token"]
+        assert second.state.user is first.state.user
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    async def test_cache_is_not_shared_between_clients(self, middleware_factory, decode_calls, token_payload):
+        cache = VerifiedTokenCache(maxsize=10, ttl=60)
+        default = middleware_factory(token_payload, cache)
+        other_client = middleware_factory(
+            token_payload, cache, keycloak_config=config.KEYCLOAK_CONFIG.copy(update={"CLIENT_ID": "other"})
+        )
+
+        await default(make_request("token"))
+        await other_client(make_request("token"))
+        await default(make_request("token"))
+
+        assert decode_calls == ["token", "token"]
+
+    async def test_expired_token_is_not_served(self, middleware_factory, decode_calls, token_payload):
+        token_payload["exp"] = time.time() - 1
+        middleware = middleware_factory(token_payload, VerifiedTokenCache(maxsize=10, ttl=60))
+
+        await middleware(make_request("token"))
+        await middleware(make_request("token"))
+
+        assert decode_calls == ["token", "token"]
+
+
+@pytest.mark.anyio
+async def test_unavailable_keys_are_service_unavailable():
+    async def load() -> dict:
+        raise ConnectionError("keycloak is down")
+
+    key_provider = JWKSKeyProvider(load)
+    middleware = RolesKeycloakMiddleware(
+        roles=["admin"], token_cache=VerifiedTokenCache(maxsize=0), key_provider=key_provider
+    )
+    token = jwt.encode({"sub": "user"}, "secret", headers={"kid": "first"})
+
+    with pytest.raises(Exception) as error:
+        await middleware(make_request(token))
+
+    assert type(error.value).__name__ == "HTTPCustomError"
+    assert error.value.status_code == 503
+    await key_provider.aclose()
+
+
+@pytest.mark.anyio
+class TestCorrelationIdMiddleware:
+    @pytest.fixture()
+    def client(self):
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": get_contextvars()["x_correlation_id"].encode()})
+
+        return AsyncClient(transport=ASGITransport(app=CorrelationIdMiddleware(app)), base_url="http://test")
+
+    async def test_incoming_correlation_id_is_reused(self, client):
+        response = await client.get("/", headers={"X-Correlation-ID": "request-1"})
+
+        assert response.headers["X-Correlation-ID"] == response.text == "request-1"
+
+    async def test_trace_id_is_taken_from_traceparent(self, client):
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        response = await client.get("/", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+
+        assert response.headers["X-Correlation-ID"] == trace_id
+
+    async def test_new_correlation_id_for_invalid_header(self, client):
+        response = await client.get("/", headers={"X-Correlation-ID": "bad value\tinjected"})
+
+        assert uuid.UUID(response.headers["X-Correlation-ID"])
@@ -0,0 +1,138 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+import orjson
+import pytest
+from fastapi import APIRouter, FastAPI, Response
+from fastapi.encoders import jsonable_encoder
+from httpx import ASGITransport, AsyncClient
+from pydantic import BaseModel, Field
+
+from app.common.dto import BaseResult
+from app.common.dto.pagination import PageInfo, PaginationResult
+from app.web.responses import ModelORJSONResponse, TrustedModelRoute, dumps, is_plain_model
+
+
+class Tag(BaseResult):
+    tag_name: str
+
+
+class Item(BaseResult):
+    item_id: UUID
+    created_at: datetime
+    price: Decimal
+    tags: list[Tag]
+    parent_tag: Optional[Tag] = None
+
+
+class WithSecret(BaseResult):
+    some_field: int
+    secret: str = Field("", exclude=True)
+
+
+class Stamped(BaseResult):
+    ts: datetime
+
+    class Config:
+        json_encoders = {datetime: lambda value: str(value.year)}
+
+
+class Numbers(BaseModel):
+    __root__: list[int]
+
+
+class StampedWrapper(BaseResult):
+    stamped: Stamped
+
+
+SPECIAL_MODELS = {
+    "/secret": WithSecret(some_field=1, secret="x"),
+    "/stamped": Stamped(ts=datetime(2020, 1, 1)),
+    "/root": Numbers(__root__=[1, 2]),
+    "/wrapper": StampedWrapper(stamped=Stamped(ts=datetime(2020, 1, 1))),
+}
+
+
+def create_page(count: int) -> PaginationResult[Item]:
+    return PaginationResult[Item](
+        items=[
+            Item(
+                item_id=UUID(int=i),
+                created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+                price=Decimal("9.99"),
+                tags=[Tag(tag_name="new")],
+                parent_tag=Tag(tag_name="root") if i % 2 else None,
+            )
+            for i in range(count)
+        ],
+        total_count=count,
+        page=PageInfo(page_number=1, page_size=count),
+    )
+
+
+def test_dumps_matches_fastapi_encoding():
+    page = create_page(3)
+
+    assert orjson.loads(dumps(page)) == jsonable_encoder(page, by_alias=True)
+    assert orjson.loads(dumps(page))["page"] == {"pageNumber": 1, "pageSize": 3}
+
+
+@pytest.mark.parametrize("model", SPECIAL_MODELS.values(), ids=SPECIAL_MODELS.keys())
+def test_dumps_matches_fastapi_for_special_models(model):
+    assert not is_plain_model(type(model))
+    assert orjson.loads(dumps(model)) == jsonable_encoder(model, by_alias=True)
+
+
+def test_dumps_passes_through_plain_content():
+    assert dumps({"a": [1, {2: "b"}]}) == b'{"a":[1,{"2":"b"}]}'
+
+
+@pytest.mark.anyio
+class TestTrustedModelRoute:
+    @pytest.fixture()
+    def client(self):
+        router = APIRouter(route_class=TrustedModelRoute)
+
+        @router.get("/page", status_code=201)
+        async def page() -> PaginationResult[Item]:
+            # без валидации response_model модель, собранная через construct, отдается как есть
+            return PaginationResult[Item].construct(
+                items=[], total_count="many", page=PageInfo.construct(page_number="first", page_size=0)
+            )
+
+        @router.get("/validated", response_model_exclude_none=True)
+        async def validated() -> Tag:
+            return Tag(tag_name="tag")
+
+        @router.get("/sub-response")
+        def sub_response(response: Response) -> Tag:
+            response.headers["x-custom"] = "1"
+            return Tag(tag_name="tag")
+
+        for path, model in SPECIAL_MODELS.items():
+            router.add_api_route(path, lambda model=model: model, response_model=type(model))
+
+        app = FastAPI(default_response_class=ModelORJSONResponse)
+        app.include_router(router)
+        return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+    async def test_result_is_not_revalidated(self, client):
+        response = await client.get("/page")
+
+        assert response.status_code == 201
+        assert response.json() == {"items": [], "totalCount": "many", "page": {"pageNumber": "first", "pageSize": 0}}
+
+    async def test_routes_with_response_options_use_fastapi_path(self, client):
+        validated = await client.get("/validated")
+        sub_response = await client.get("/sub-response")
+
+        assert validated.json() == sub_response.json() == {"tagName": "tag"}
+        assert sub_response.headers["x-custom"] == "1"
+
+    @pytest.mark.parametrize("path", SPECIAL_MODELS)
+    async def test_special_models_match_fastapi(self, client, path):
+        response = await client.get(path)
+
+        assert response.json() == jsonable_encoder(SPECIAL_MODELS[path], by_alias=True)
@@ -0,0 +1,33 @@
+from app.web.roles import AllOf, AnyOf, UserRoles, compile_roles
+
+TOKEN_PAYLOAD = {
+    "realm_access": {"roles": ["offline_access"]},
+    "resource_access": {
+        "service": {"roles": ["read", "write"]},
+        "billing": {"roles": ["invoice"]},
+        "broken": None,
+    },
+}
+
+
+class TestRoleExpressions:
+    def test_roles_are_extracted_once_per_token(self):
+        roles = UserRoles.from_token_payload(TOKEN_PAYLOAD, "service")
+
+        assert roles.effective == frozenset({"offline_access", "read", "write"})
+        assert roles.of("billing") == frozenset({"invoice"})
+        assert roles.of("broken") == frozenset()
+
+    def test_list_is_compiled_to_all_of(self):
+        roles = UserRoles.from_token_payload(TOKEN_PAYLOAD, "service")
+
+        assert compile_roles(["read", "offline_access"]).matches(roles)
+        assert not compile_roles(["read", "admin"]).matches(roles)
+
+    def test_per_client_and_combined_expressions(self):
+        roles = UserRoles.from_token_payload(TOKEN_PAYLOAD, "service")
+
+        assert AnyOf("admin", "invoice", client="billing").matches(roles)
+        assert not AllOf("invoice", client="service").matches(roles)
+        assert (AllOf("read") & AnyOf("invoice", client="billing")).matches(roles)
+        assert (AllOf("admin") | AllOf("write")).matches(roles)
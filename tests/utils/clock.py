@@ -0,0 +1,15 @@
+class FakeClock:
+    """
+    Управляемый источник времени для clock= параметров
+    """
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds